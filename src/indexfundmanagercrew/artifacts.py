@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from indexfundmanagercrew.memory_store import _to_jsonable
+
+logger = logging.getLogger(__name__)
+
+
+def digest(value):
+    """Stable hash of a JSON-serializable value."""
+    payload = json.dumps(value, sort_keys=True, default=_to_jsonable)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def file_digest(*paths):
+    """Hash of the contents of one or more files; missing files hash as empty."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(str(path).encode())
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    h.update(chunk)
+        except FileNotFoundError:
+            pass
+    return h.hexdigest()
+
+
+def output_payload(result):
+    """
+    JSON form of a stage result. Crew outputs keep their raw text next to any
+    structured output, which CrewOutput.to_dict() alone would drop.
+    """
+    if isinstance(result, dict):
+        return result
+    payload = {}
+    structured = _to_jsonable(result)
+    if isinstance(structured, dict):
+        payload.update(structured)
+    payload.setdefault('raw', getattr(result, 'raw', None) or str(result))
+    return payload
+
+
+@dataclass
+class Artifact:
+    stage: str
+    key: str  # Digest of the stage's declared inputs
+    digest: str  # Digest of the output, for downstream stages to declare as an input
+    created_at: float
+    output: object
+    reused: bool = False
+
+
+class ArtifactStore:
+    """
+    Stage outputs on disk, keyed by a digest of each stage's declared inputs.
+
+    A stage is run through run(): when an artifact for the same inputs exists
+    it is returned instead of recomputing the stage. Downstream stages declare
+    their upstream's output digest as an input, so a change anywhere upstream
+    invalidates everything after it and nothing else. Only successful outputs
+    are stored; a stage that raises is retried in full on the next run.
+    """
+
+    def __init__(self, root=None, keep=30):
+        self.root = root or os.path.join(os.path.dirname(__file__), '.cache', 'artifacts')
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _path(self, stage, name):
+        return os.path.join(self.root, stage, name)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, default=_to_jsonable)
+        os.replace(tmp, path)
+
+    def get(self, stage, key):
+        try:
+            with open(self._path(stage, f"{key}.json")) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return Artifact(stage, key, data['digest'], data['created_at'], data['output'])
+
+    def latest(self, stage):
+        """Most recently produced (or reused) artifact of a stage."""
+        try:
+            with open(self._path(stage, 'latest')) as f:
+                key = f.read().strip()
+        except OSError:
+            return None
+        return self.get(stage, key)
+
+    def put(self, stage, key, inputs, output):
+        artifact = Artifact(stage, key, digest(output), time.time(), output)
+        with self._lock:
+            self._write(self._path(stage, f"{key}.json"), {
+                'stage': stage,
+                'inputs': inputs,
+                'digest': artifact.digest,
+                'created_at': artifact.created_at,
+                'output': output,
+            })
+            self._set_latest(stage, key)
+            self._prune(stage)
+        return artifact
+
+    def _set_latest(self, stage, key):
+        path = self._path(stage, 'latest')
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(key)
+        os.replace(tmp, path)
+
+    def _prune(self, stage):
+        stage_dir = os.path.join(self.root, stage)
+        files = [os.path.join(stage_dir, name) for name in os.listdir(stage_dir) if name.endswith('.json')]
+        files.sort(key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.keep)]:
+            os.remove(path)
+
+    def run(self, stage, inputs, compute, force=False):
+        """
+        Return the stage's artifact for these inputs, computing it only when needed.
+
+        Args:
+            stage: Stage name
+            inputs: JSON-serializable dict of everything the output depends on
+            compute: Callable producing the output; its result is stored via output_payload()
+            force: Recompute even when an artifact for these inputs exists
+
+        Returns:
+            Artifact, with reused=True when it came from the store
+        """
+        key = digest(inputs)
+        if not force:
+            artifact = self.get(stage, key)
+            if artifact is not None:
+                artifact.reused = True
+                with self._lock:
+                    self._set_latest(stage, key)
+                    # Keep reused artifacts from being pruned as old
+                    os.utime(self._path(stage, f"{key}.json"))
+                logger.info(f"Stage {stage} inputs unchanged, reusing artifact {key[:12]}")
+                return artifact
+        return self.put(stage, key, inputs, output_payload(compute()))
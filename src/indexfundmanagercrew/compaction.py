@@ -0,0 +1,271 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field, asdict, replace
+
+logger = logging.getLogger(__name__)
+
+# Bump when the summarizer changes, so cached summaries are rebuilt
+SUMMARIZER_VERSION = 1
+
+# Rough chars-per-token ratio for prompt budgeting
+CHARS_PER_TOKEN = 4
+
+# Words that mark a sentence as decision-relevant
+KEY_TERMS = {
+    'index', 'include', 'inclusion', 'exclude', 'weight', 'risk', 'red', 'flag', 'warning', 'concern',
+    'bullish', 'bearish', 'neutral', 'buy', 'sell', 'recommend', 'recommendation', 'liquidity', 'tvl',
+    'mindshare', 'holders', 'volume', 'decision', 'sentiment', 'growth', 'drop', 'pump', 'rug',
+}
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'for', 'with', 'is', 'are', 'was',
+    'were', 'be', 'been', 'it', 'its', 'this', 'that', 'these', 'those', 'we', 'our', 'they', 'their',
+    'as', 'at', 'by', 'from', 'has', 'have', 'had', 'not', 'no', 'so', 'if', 'than', 'then', 'there',
+    'which', 'what', 'who', 'about', 'into', 'more', 'most', 'very', 'can', 'will', 'would', 'should',
+}
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+_WORD = re.compile(r"[A-Za-z$][A-Za-z0-9$'-]*")
+_NUMBER = re.compile(r'\d')
+_TICKER = re.compile(r'\$[A-Za-z][A-Za-z0-9]{1,9}\b')
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
+
+def report_text(value):
+    """Text of a stored daily report, which may be a string or structured output."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        for key in ('daily_discussion', 'discussion', 'raw'):
+            if isinstance(value.get(key), str) and value[key].strip():
+                return value[key]
+    return json.dumps(value, indent=2, default=str)
+
+
+def split_sentences(text):
+    sentences = []
+    for part in _SENTENCE_SPLIT.split(text):
+        part = part.strip().lstrip('-*#>• ').strip()
+        if len(part) > 3:
+            sentences.append(part)
+    return sentences
+
+
+def rank_sentences(sentences):
+    """
+    Deterministic extractive ranking: frequency of a sentence's content words
+    across the report, plus bonuses for figures and decision terms.
+
+    Returns:
+        Sentence indices, best first (ties by position)
+    """
+    words = [[w.lower() for w in _WORD.findall(s)] for s in sentences]
+    frequency = Counter(w for ws in words for w in ws if w not in STOPWORDS)
+    top = max(frequency.values()) if frequency else 1
+    scores = []
+    for i, (sentence, ws) in enumerate(zip(sentences, words)):
+        content = [w for w in ws if w not in STOPWORDS]
+        score = sum(frequency[w] / top for w in content) / (len(content) ** 0.5 if content else 1)
+        score += 0.5 * bool(_NUMBER.search(sentence))
+        score += 0.3 * len(KEY_TERMS.intersection(content))
+        scores.append((-score, i))
+    return [i for _, i in sorted(scores)]
+
+
+def _content_words(sentence):
+    # Figures are left out, so sentences differing only in numbers count as repeats
+    return {w.lower() for w in _WORD.findall(sentence)} - STOPWORDS
+
+
+def extract_summary(sentences, max_tokens, max_overlap=0.6):
+    """
+    Highest-ranked sentences within max_tokens, kept in their original order.
+    Sentences sharing more than max_overlap of their content words with one
+    already chosen are skipped as repeats.
+    """
+    chosen, chosen_words, used = [], [], 0
+    for i in rank_sentences(sentences):
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        words = _content_words(sentences[i])
+        if any(len(words & other) / max(1, len(words | other)) > max_overlap for other in chosen_words):
+            continue
+        chosen.append(i)
+        chosen_words.append(words)
+        used += cost
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def find_tokens(sentences, known_tokens=()):
+    """Token name or $TICKER -> indices of the sentences mentioning it."""
+    mentions = {}
+    names = {name.lower(): name for name in known_tokens if len(name) > 2}
+    # One alternation, longest names first, instead of a pattern per token
+    pattern = re.compile(
+        r'(?<![\w$])(' + '|'.join(re.escape(n) for n in sorted(names, key=len, reverse=True)) + r')(?!\w)',
+        re.IGNORECASE
+    ) if names else None
+    for i, sentence in enumerate(sentences):
+        found = {ticker.upper() for ticker in _TICKER.findall(sentence)}
+        if pattern is not None:
+            found.update(names[match.lower()] for match in pattern.findall(sentence))
+        for token in found:
+            mentions.setdefault(token, []).append(i)
+    return mentions
+
+
+@dataclass
+class DaySummary:
+    date: str
+    content_hash: str
+    summary: str
+    tokens: dict = field(default_factory=dict)  # token -> short summary of that day's mentions
+    raw_tokens: int = 0
+
+
+class SummaryCache:
+    """Summaries on disk keyed by a hash of the report text, so each day is summarized once."""
+
+    def __init__(self, root=None):
+        self.root = root or os.path.join(os.path.dirname(__file__), '.cache', 'summaries')
+
+    def _path(self, content_hash):
+        return os.path.join(self.root, f"{content_hash}.json")
+
+    def get(self, content_hash):
+        try:
+            with open(self._path(content_hash)) as f:
+                return DaySummary(**json.load(f))
+        except (OSError, json.JSONDecodeError, TypeError):
+            return None
+
+    def put(self, summary):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(summary.content_hash)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(asdict(summary), f)
+        os.replace(tmp, path)
+
+
+def content_hash(text):
+    payload = json.dumps([SUMMARIZER_VERSION, text])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def summarize_report(text, date, known_tokens=(), cache=None, day_tokens=250, token_tokens=60):
+    """
+    Per-day and per-token extractive summaries of one daily report, cached by content.
+
+    Summaries are built once, when the report is stored; later calls for the
+    same text return the cached summary whatever known_tokens is passed.
+
+    Args:
+        text: Report text
+        date: Report date (YYYY-MM-DD)
+        known_tokens: Token names to track besides $TICKERs, e.g. from the token dataset
+        cache: SummaryCache; the default one under .cache/summaries
+        day_tokens: Budget for the day summary
+        token_tokens: Budget for each token's summary
+
+    Returns:
+        DaySummary
+    """
+    cache = cache or SummaryCache()
+    key = content_hash(text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    sentences = split_sentences(text)
+    tokens = {}
+    for token, indices in find_tokens(sentences, known_tokens).items():
+        tokens[token] = extract_summary([sentences[i] for i in indices], token_tokens)
+    summary = DaySummary(date, key, extract_summary(sentences, day_tokens), tokens, estimate_tokens(text))
+    cache.put(summary)
+    return summary
+
+
+def _render(days, token_rollup, notes_per_token):
+    lines = ["Daily summaries (newest first):"]
+    for day in days:
+        lines.append(f"- {day.date}: {day.summary}")
+    if token_rollup:
+        lines += ["", "Tokens discussed this week (most mentioned first):"]
+        for token, entries in token_rollup:
+            notes = " | ".join(f"{date}: {note}" for date, note in entries[:notes_per_token])
+            lines.append(f"- {token} ({len(entries)} days): {notes}")
+    lines += ["", "These are extracts. Use get_report_detail with a date (and optionally a token) for the full report."]
+    return "\n".join(lines)
+
+
+def weekly_context(entries, budget_tokens=3000, known_tokens=(), cache=None):
+    """
+    Assemble the weekly prompt context from cached per-day and per-token summaries.
+
+    Only the latest report of each day is used. Content is then dropped in this
+    order until it fits the budget: per-token notes beyond the first, the least
+    mentioned tokens, then the oldest days.
+
+    Args:
+        entries: MemoryStore history entries ({'timestamp', 'value'}), oldest first
+        budget_tokens: Approximate token budget for the returned text
+        known_tokens: Token names to track besides $TICKERs
+        cache: SummaryCache
+
+    Returns:
+        Context text
+    """
+    if not entries:
+        return "No daily reports recorded this week."
+    # A re-run day has several entries; later ones replace earlier ones
+    latest = {e['timestamp'][:10]: e for e in entries}
+    days = [
+        # The date comes from the entry, as identical text may have been summarized on another day
+        replace(summarize_report(report_text(e['value']), date, known_tokens, cache), date=date)
+        for date, e in reversed(latest.items())
+    ]
+
+    rollup = {}
+    for day in days:
+        for token, note in day.tokens.items():
+            rollup.setdefault(token, []).append((day.date, note))
+    tokens = sorted(rollup.items(), key=lambda item: (-len(item[1]), item[0]))
+
+    for per_token in (3, 2, 1):
+        text = _render(days, tokens, per_token)
+        if estimate_tokens(text) <= budget_tokens:
+            break
+    while estimate_tokens(text) > budget_tokens and tokens:
+        tokens = tokens[:-1]
+        text = _render(days, tokens, 1)
+    while estimate_tokens(text) > budget_tokens and len(days) > 1:
+        days = days[:-1]
+        text = _render(days, tokens, 1)
+
+    raw = sum(day.raw_tokens for day in days)
+    logger.info(f"Weekly context: ~{estimate_tokens(text)} tokens from ~{raw} tokens of reports ({len(days)} days, {len(tokens)} tokens)")
+    return text
+
+
+def report_detail(entries, date, token=None):
+    """Full report(s) for a date, or only the passages mentioning a token."""
+    reports = [report_text(e['value']) for e in entries if e['timestamp'][:10] == date]
+    if not reports:
+        return f"No daily report recorded on {date}."
+    if token is None:
+        return "\n\n".join(reports)
+    sentences = [s for text in reports for s in split_sentences(text)]
+    mentions = find_tokens(sentences, [token.lstrip('$')])
+    indices = sorted({i for name, found in mentions.items() if name.lower().lstrip('$') == token.lower().lstrip('$') for i in found})
+    if not indices:
+        return f"The {date} report does not mention {token}."
+    return "\n".join(sentences[i] for i in indices)
@@ -1,14 +1,58 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task, before_kickoff
-from indexfundmanagercrew.tools.research_tools.cookie_tool import CookieFilterTool, AgentDetailTool, TweetSearchTool
-from indexfundmanagercrew.tools.research_tools.defillama_tool import PriceFetcherAgent, ProtocolInfoTool, TVLMetricsTool
-from indexfundmanagercrew.tools.api.Cookie import CookieAPI, create_production_instance, CookieAPIError
+from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
+from indexfundmanagercrew.tools.registry import get_tools
+from indexfundmanagercrew.tools.api.health import HealthChecker, STATUS_OK
+from indexfundmanagercrew.tools.prefetch import TokenDataset
+from indexfundmanagercrew.tools.run_cache import start_run, end_run
+from indexfundmanagercrew.memory_store import MemoryStore
+from indexfundmanagercrew.compaction import weekly_context
+from indexfundmanagercrew.tracing import CrewTracer, start_span, end_span, tracing_enabled
 import os
 import logging
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+def llm_config():
+	return {
+		"provider": "google",
+		"model": "gemini-1.5-pro",
+		"api_key": os.getenv("GEMINI_API_KEY"),
+		"config": {
+			"temperature": 0.7,
+			"top_p": 0.9
+		}
+	}
+
+# What each task needs when run on its own (lean mode): the tools its agent
+# gets, whether crew memory is worth the embedding calls, and whether the
+# manager should delegate. Routine tasks run with a single agent and no manager.
+TASK_PROFILES = {
+	'research_task': {
+		'tools': [
+			'lookup_token_dataset', 'get_universe_changes', 'get_token_features', 'screen_red_flags',
+			'filter_cookie_data', 'get_agent_details', 'search_tweets'
+		],
+		'memory': False, 'hierarchical': False
+	},
+	'reporting_task': {'tools': ['lookup_token_dataset'], 'memory': False, 'hierarchical': False},
+	'data_gathering_task': {
+		'tools': [
+			'lookup_token_dataset', 'get_agent_details', 'search_tweets', 'fetch_defi_prices',
+			'get_tvl_metrics', 'get_holder_distribution', 'check_fill_capacity'
+		],
+		'memory': False, 'hierarchical': False
+	},
+	'daily_analysis_task': {
+		'tools': ['lookup_token_dataset', 'get_universe_changes', 'get_token_features', 'screen_red_flags'],
+		'memory': True, 'hierarchical': False
+	},
+	'publish_website_task': {'tools': [], 'memory': False, 'hierarchical': False},
+	'publish_twitter_task': {'tools': [], 'memory': False, 'hierarchical': False},
+	# The index decision is the one place where the team debate is the point
+	'weekly_decision_task': {'tools': ['get_report_detail'], 'memory': True, 'hierarchical': True},
+}
+
 # If you want to run a snippet of code before or after the crew starts, 
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -17,39 +61,152 @@ logger = logging.getLogger(__name__)
 class Indexfundmanagercrew():
 	"""Indexfundmanagercrew crew"""
 
+	health_report = None
+	tool_cache_stats = None
+	# LLM response cache mode ('replay', 'record', 'strict', 'off'); None defers to LLM_CACHE_MODE
+	llm_cache_mode = None
+	_agent_llm = None
+	_embedder = None
+
+	_kickoff_span = None
+	_tracer = None
+
+	def agent_llm(self):
+		"""One LLM shared by this crew's agents; None (crewAI's default) unless the response cache or tracing is on."""
+		if self._agent_llm is None:
+			# The cache (and through it crewAI's LLM plumbing) is only loaded once agents are built
+			from indexfundmanagercrew.llm_cache import build_llm
+			self._agent_llm = build_llm(self.llm_cache_mode)
+		return self._agent_llm
+
+	def crew_embedder(self):
+		"""Embedder for crew memory, behind the local embedding cache (see EMBEDDER_MODE)."""
+		if self._embedder is None:
+			# numpy and chromadb's EmbeddingFunction are only loaded once crew memory is built
+			from indexfundmanagercrew.embeddings import build_embedder
+			self._embedder = build_embedder()
+		return self._embedder
+
+	@before_kickoff
+	def start_trace(self, inputs):
+		"""Open the kickoff span; tasks, agent steps, tools and LLM calls nest under it."""
+		if not tracing_enabled():
+			return inputs
+		if self._kickoff_span is not None:
+			# The previous kickoff raised before its after_kickoff hook ran
+			self._finish_trace(error='kickoff did not complete')
+		self._kickoff_span = start_span('crew.kickoff', kind='crew', inputs=sorted((inputs or {}).keys()))
+		self._tracer = CrewTracer(self._kickoff_span)
+		return inputs
+
+	@after_kickoff
+	def end_trace(self, result):
+		"""Close the kickoff span with the exact token usage reported by crewAI."""
+		self._finish_trace(usage=getattr(result, 'token_usage', None))
+		return result
+
+	def _finish_trace(self, usage=None, error=None):
+		if self._kickoff_span is None:
+			return
+		self._tracer.close()
+		if usage is not None:
+			for field in ('successful_requests', 'total_tokens', 'prompt_tokens', 'completion_tokens'):
+				self._kickoff_span.set_attribute(field, getattr(usage, field, 0))
+		if error:
+			self._kickoff_span.set_status('error', error)
+		end_span(self._kickoff_span)
+		self._kickoff_span = self._tracer = None
+
+	def _trace_task(self, output):
+		if self._tracer is not None:
+			self._tracer.task_callback(output)
+
+	def _trace_step(self, step):
+		if self._tracer is not None:
+			self._tracer.step_callback(step)
+
+	def _trace_callbacks(self):
+		"""Crew task/step callbacks feeding the tracer, or none when tracing is off."""
+		if not tracing_enabled():
+			return {}
+		return {'task_callback': self._trace_task, 'step_callback': self._trace_step}
+
+	@before_kickoff
+	def start_tool_cache(self, inputs):
+		"""Memoize identical tool calls for the duration of this kickoff."""
+		start_run()
+		return inputs
+
+	@after_kickoff
+	def report_tool_cache(self, result):
+		"""Log how many tool calls were answered by the run cache."""
+		cache = end_run()
+		if cache is not None:
+			self.tool_cache_stats = {'hits': cache.hits, 'misses': cache.misses, 'tools': cache.stats}
+			per_tool = ", ".join(f"{name} {s['hits']}/{s['hits'] + s['misses']}" for name, s in cache.stats.items())
+			logger.info(f"Tool run cache: {cache.hits} hits, {cache.misses} misses ({per_tool or 'no tool calls'})")
+		if self._agent_llm is not None and self._agent_llm.cache_mode != 'off':
+			logger.info(f"LLM response cache ({self._agent_llm.cache_mode}): {self._agent_llm.cache_stats}")
+		return result
+
 	@before_kickoff
 	def check_api_status(self, inputs):
 		"""Check the status of required APIs before starting the crew."""
 		logger.info("Checking API status before starting the crew...")
 
-		# Check Cookie API status with a test agent lookup
+		# Probes run concurrently and are cached across processes; tools skip
+		# upstreams reported down instead of waiting for them to time out
 		try:
-			cookie_api = create_production_instance()
-			# Test with get_agents_paged which should always work
-			test_response = cookie_api.get_agents_paged(interval="_3Days", page=1, page_size=1)
-			if test_response and 'data' in test_response:
-				logger.info("Cookie API Status: OK (Agents listing working)")
-				logger.info(f"Total agents available: {test_response.get('totalCount', 'unknown')}")
-			else:
-				logger.warning("Cookie API Status: Response format unexpected")
-			logger.info("Note: Twitter search functionality might be limited")
-		except CookieAPIError as e:
-			logger.warning(f"Cookie API Status: Error - {str(e)}")
+			self.health_report = HealthChecker().check()
 		except Exception as e:
-			logger.warning(f"Cookie API Status: Unexpected Error - {str(e)}")
+			logger.warning(f"API health check failed: {str(e)}")
+			return inputs
 
-		# Check DefiLlama API status with a simple price check
-		try:
-			price_fetcher = PriceFetcherAgent()
-			# Test with ETH price check
-			test_price = price_fetcher._run("ethereum", "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
-			if "Error" not in test_price:
-				logger.info(f"DefiLlama API Status: OK - {test_price}")
+		for name, probe in self.health_report.probes.items():
+			source = " (cached)" if self.health_report.from_cache.get(name) else ""
+			message = f"{name} API Status: {probe.status.upper()}{source} - {probe.detail}"
+			if probe.status == STATUS_OK:
+				logger.info(message)
 			else:
-				logger.warning(f"DefiLlama API Status: {test_price}")
+				logger.warning(message)
+
+		return inputs
+
+	@before_kickoff
+	def load_weekly_reports(self, inputs):
+		"""
+		Provide the last 7 days of daily analysis results to the weekly decision task,
+		compacted into cached per-day and per-token summaries under a token budget
+		(WEEKLY_CONTEXT_TOKENS, default 3000). Agents drill down with get_report_detail.
+		"""
+		inputs = inputs if inputs is not None else {}
+		if 'weekly_reports' in inputs:
+			return inputs
+
+		try:
+			history = MemoryStore().get_recent_history('daily_analysis_result', days=7, latest_per_day=True)
 		except Exception as e:
-			logger.warning(f"DefiLlama API Status: Error - {str(e)}")
+			logger.warning(f"Could not load daily report history: {str(e)}")
+			history = []
 
+		dataset = TokenDataset.load()
+		known_tokens = sorted({t.name for t in dataset.tokens}) if dataset else ()
+		budget = int(os.getenv('WEEKLY_CONTEXT_TOKENS', '3000'))
+		inputs['weekly_reports'] = weekly_context(history, budget, known_tokens)
+		return inputs
+
+	@before_kickoff
+	def load_token_dataset(self, inputs):
+		"""Inject the pre-fetched token dataset so agents need not collect it tool call by tool call."""
+		inputs = inputs if inputs is not None else {}
+		if 'token_dataset' in inputs:
+			return inputs
+
+		dataset = TokenDataset.load()
+		if dataset is None:
+			inputs['token_dataset'] = "No pre-fetched dataset available; collect data with the research tools."
+		else:
+			inputs['token_dataset'] = dataset.summary()
 		return inputs
 
 	# Learn more about YAML configuration files here:
@@ -62,25 +219,16 @@ class Indexfundmanagercrew():
 	# https://docs.crewai.com/concepts/agents#agent-tools
 	@agent
 	def researcher(self) -> Agent:
-		cookie_filter = CookieFilterTool()
-		agent_detail = AgentDetailTool()
-		tweet_search = TweetSearchTool()
-		price_fetcher = PriceFetcherAgent()
-		protocol_info = ProtocolInfoTool()
-		tvl_metrics = TVLMetricsTool()
 		return Agent(
 			config=self.agents_config['researcher'],
 			verbose=True,
-			tools=[cookie_filter, agent_detail, tweet_search, price_fetcher, protocol_info, tvl_metrics],
-			llm_config={
-				"provider": "google",
-				"model": "gemini-1.5-pro",
-				"api_key": os.getenv("GEMINI_API_KEY"),
-				"config": {
-					"temperature": 0.7,
-					"top_p": 0.9
-				}
-			}
+			tools=get_tools(
+				'lookup_token_dataset', 'get_universe_changes', 'get_token_features', 'screen_red_flags',
+				'filter_cookie_data', 'get_agent_details', 'search_tweets', 'fetch_defi_prices', 'get_protocol_info',
+				'get_tvl_metrics', 'get_holder_distribution', 'check_fill_capacity'
+			),
+			llm=self.agent_llm(),
+			llm_config=llm_config()
 		)
 
 	@agent
@@ -88,15 +236,12 @@ class Indexfundmanagercrew():
 		return Agent(
 			config=self.agents_config['reporting_analyst'],
 			verbose=True,
-			llm_config={
-				"provider": "google",
-				"model": "gemini-1.5-pro",
-				"api_key": os.getenv("GEMINI_API_KEY"),
-				"config": {
-					"temperature": 0.7,
-					"top_p": 0.9
-				}
-			}
+			tools=get_tools(
+				'lookup_token_dataset', 'get_universe_changes', 'get_token_features', 'screen_red_flags',
+				'optimize_index_weights', 'backtest_index_compositions', 'simulate_portfolio_risk', 'get_report_detail'
+			),
+			llm=self.agent_llm(),
+			llm_config=llm_config()
 		)
 
 	@agent
@@ -104,15 +249,8 @@ class Indexfundmanagercrew():
 		return Agent(
 			config=self.agents_config['manager'],
 			verbose=True,
-			llm_config={
-				"provider": "google",
-				"model": "gemini-1.5-pro",
-				"api_key": os.getenv("GEMINI_API_KEY"),
-				"config": {
-					"temperature": 0.7,
-					"top_p": 0.9
-				}
-			}
+			llm=self.agent_llm(),
+			llm_config=llm_config()
 		)
 
 	# To learn more about structured task outputs, 
@@ -177,13 +315,123 @@ class Indexfundmanagercrew():
 			process=Process.hierarchical,
 			verbose=True,
 			memory=True,
-			llm_config={
-				"provider": "google",
-				"model": "gemini-1.5-pro",
-				"api_key": os.getenv("GEMINI_API_KEY"),
-				"config": {
-					"temperature": 0.7,
-					"top_p": 0.9
-				}
-			}
+			embedder=self.crew_embedder(),
+			llm_config=llm_config(),
+			**self._trace_callbacks()
+		)
+
+	def _kickoff_hooks(self, marker):
+		"""Bound @before_kickoff / @after_kickoff methods, for crews not built by @crew."""
+		hooks = {}
+		for klass in reversed(type(self).__mro__):
+			for name, func in vars(klass).items():
+				if getattr(func, marker, False):
+					hooks[name] = getattr(self, name)
+		return list(hooks.values())
+
+	def task_crew(self, task_name: str, lean: bool = True) -> Crew:
+		"""
+		Crew that runs a single task.
+
+		Args:
+			task_name: Name of a @task method, e.g. 'data_gathering_task'
+			lean: Use the task's profile (one agent with only the tools it needs, memory and
+				manager per TASK_PROFILES). Otherwise run it under the full hierarchical crew.
+
+		Returns:
+			Crew with the kickoff hooks of this class attached
+		"""
+		if task_name not in TASK_PROFILES:
+			raise ValueError(f"Unknown task: {task_name}")
+		profile = TASK_PROFILES[task_name]
+		hooks = {
+			'before_kickoff_callbacks': self._kickoff_hooks('is_before_kickoff'),
+			'after_kickoff_callbacks': self._kickoff_hooks('is_after_kickoff'),
+			**self._trace_callbacks()
+		}
+
+		if not lean or profile['hierarchical']:
+			return Crew(
+				agents=[self.researcher(), self.reporting_analyst()],
+				tasks=[getattr(self, task_name)()],
+				manager_agent=self.manager(),
+				process=Process.hierarchical,
+				verbose=True,
+				memory=profile['memory'] if lean else True,
+				embedder=self.crew_embedder() if profile['memory'] or not lean else None,
+				llm_config=llm_config(),
+				**hooks
+			)
+
+		# A copy so the shared agent keeps its full tool set
+		task_agent = self.tasks_config[task_name]['agent']
+		if isinstance(task_agent, str):
+			task_agent = getattr(self, task_agent)()
+		lean_agent = task_agent.copy()
+		lean_agent.tools = get_tools(*profile['tools'])
+		return Crew(
+			agents=[lean_agent],
+			tasks=[Task(config=self.tasks_config[task_name], agent=lean_agent)],
+			process=Process.sequential,
+			verbose=True,
+			memory=profile['memory'],
+			embedder=self.crew_embedder() if profile['memory'] else None,
+			llm_config=llm_config(),
+			**hooks
+		)
+
+	def run_task(self, task_name: str, inputs=None, lean=None):
+		"""
+		Kick off a single task and record its LLM usage.
+
+		Lean mode is the default; set CREW_LEAN_MODE=0 to run tasks under the
+		hierarchical crew. Usage of both modes is kept in MemoryStore history, so
+		lean runs report the calls and tokens saved against the hierarchical ones.
+
+		Args:
+			task_name: Name of a @task method
+			inputs: Kickoff inputs
+			lean: Override CREW_LEAN_MODE
+
+		Returns:
+			The crew output
+		"""
+		if lean is None:
+			lean = os.getenv('CREW_LEAN_MODE', '1').lower() not in ('0', 'false', 'no')
+		crew = self.task_crew(task_name, lean=lean)
+		try:
+			result = crew.kickoff(inputs=inputs)
+		except Exception as e:
+			self._finish_trace(error=f"{type(e).__name__}: {e}")
+			raise
+		try:
+			self._record_usage(task_name, 'lean' if lean else 'hierarchical', getattr(result, 'token_usage', None) or crew.usage_metrics)
+		except Exception as e:
+			logger.warning(f"Could not record LLM usage for {task_name}: {str(e)}")
+		return result
+
+	def _record_usage(self, task_name, mode, usage):
+		"""Store this run's LLM usage and log the savings against recorded hierarchical runs."""
+		metrics = {
+			'llm_calls': getattr(usage, 'successful_requests', 0),
+			'total_tokens': getattr(usage, 'total_tokens', 0),
+			'prompt_tokens': getattr(usage, 'prompt_tokens', 0),
+			'completion_tokens': getattr(usage, 'completion_tokens', 0),
+		}
+		store = MemoryStore()
+		store.update_memory(f'llm_usage_{task_name}_{mode}', metrics)
+		if mode != 'lean':
+			logger.info(f"{task_name} ({mode}): {metrics['llm_calls']} LLM calls, {metrics['total_tokens']} tokens")
+			return
+
+		baseline = [entry['value'] for entry in store.get_history(f'llm_usage_{task_name}_hierarchical', limit=10)]
+		if not baseline:
+			logger.info(f"{task_name} (lean): {metrics['llm_calls']} LLM calls, {metrics['total_tokens']} tokens (no hierarchical runs recorded to compare)")
+			return
+		calls = sum(b['llm_calls'] for b in baseline) / len(baseline)
+		tokens = sum(b['total_tokens'] for b in baseline) / len(baseline)
+		logger.info(
+			f"{task_name} (lean): {metrics['llm_calls']} LLM calls, {metrics['total_tokens']} tokens; "
+			f"saved {calls - metrics['llm_calls']:.1f} calls and {tokens - metrics['total_tokens']:.0f} tokens "
+			f"against the average of {len(baseline)} hierarchical runs"
 		)
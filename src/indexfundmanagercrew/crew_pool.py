@@ -0,0 +1,96 @@
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from indexfundmanagercrew.crew import Indexfundmanagercrew
+from indexfundmanagercrew.tools import registry
+
+logger = logging.getLogger(__name__)
+
+
+class CrewPool:
+    """
+    Warm pool of crew instances for a long-running process such as the scheduler.
+
+    Building an Indexfundmanagercrew parses agents.yaml/tasks.yaml and creates
+    every agent; tools and API clients come from the process-wide registry.
+    The pool keeps idle instances around between jobs and leases one per job,
+    so overlapping jobs never share agent or task state. When either config
+    file changes on disk, idle instances are discarded and rebuilt on demand.
+    """
+
+    def __init__(self, crew_class=Indexfundmanagercrew, max_idle=2):
+        self.crew_class = crew_class
+        self.max_idle = max_idle
+        self.config_files = [
+            Path(__file__).parent / 'config' / 'agents.yaml',
+            Path(__file__).parent / 'config' / 'tasks.yaml',
+        ]
+        self._lock = threading.Lock()
+        self._idle = []
+        self._config = self._config_version()
+        self._generation = 0
+        self.stats = {'builds': 0, 'reuses': 0, 'refreshes': 0}
+
+    def _config_version(self):
+        return tuple(os.stat(path).st_mtime_ns for path in self.config_files if path.exists())
+
+    def _check_config(self):
+        """Refresh if a config file changed since the pool was last built. Caller holds the lock."""
+        config = self._config_version()
+        if config != self._config:
+            logger.info("Crew config changed on disk, refreshing crew pool")
+            self._config = config
+            self._invalidate()
+
+    def _invalidate(self):
+        """Forget idle instances; leased ones are dropped when returned. Caller holds the lock."""
+        self._idle.clear()
+        self._generation += 1
+        self.stats['refreshes'] += 1
+
+    def _build(self):
+        instance = self.crew_class()
+        # Create the agents now so their tools are instantiated before the job starts
+        for name in ('researcher', 'reporting_analyst', 'manager'):
+            getattr(instance, name)()
+        self.stats['builds'] += 1
+        return instance
+
+    @contextmanager
+    def lease(self):
+        """Borrow a warm crew instance for the duration of one job."""
+        with self._lock:
+            self._check_config()
+            instance = self._idle.pop() if self._idle else None
+            generation = self._generation
+            if instance is not None:
+                self.stats['reuses'] += 1
+        if instance is None:
+            instance = self._build()
+
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                if generation == self._generation and len(self._idle) < self.max_idle:
+                    self._idle.append(instance)
+
+    def warm_up(self):
+        """Build one instance ahead of the first job."""
+        with self.lease():
+            pass
+
+    def refresh(self, tools=False):
+        """
+        Drop idle crew instances; with tools=True also recreate tools and API clients.
+
+        Args:
+            tools: Whether to reset the tool and client registry as well
+        """
+        with self._lock:
+            self._config = self._config_version()
+            self._invalidate()
+        if tools:
+            registry.reset()
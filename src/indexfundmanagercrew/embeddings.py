@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from chromadb import EmbeddingFunction
+
+logger = logging.getLogger(__name__)
+
+# crewAI's embedder when none is configured
+DEFAULT_MODEL = 'openai/text-embedding-3-small'
+
+
+def embedding_key(model, text):
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Embeddings of one model in a float32 memory-mapped matrix, with an SQLite
+    index from key to row.
+
+    Rows are reused least recently used first once the store holds `capacity`
+    vectors. Each row also records a fingerprint of its key, checked on read,
+    so a reader never returns a row that another process has just reused.
+    """
+
+    def __init__(self, directory, capacity=20_000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.capacity = capacity
+        self.dim = None
+        self._vectors = None
+        self._fingerprints = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        if row is not None:
+            self._open(row[0])
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _open(self, dim):
+        vectors_file = os.path.join(self.directory, 'vectors.f32')
+        fingerprints_file = os.path.join(self.directory, 'fingerprints.u64')
+        mode = 'r+' if os.path.exists(vectors_file) else 'w+'
+        self._vectors = np.memmap(vectors_file, dtype=np.float32, mode=mode, shape=(self.capacity, dim))
+        self._fingerprints = np.memmap(fingerprints_file, dtype=np.uint64, mode=mode, shape=(self.capacity,))
+        self.dim = dim
+
+    @staticmethod
+    def _fingerprint(key):
+        return np.uint64(int(key[:16], 16))
+
+    def get_many(self, keys):
+        """Stored vectors for the keys found, as a dict of key -> float32 array."""
+        if self._vectors is None or not keys:
+            return {}
+        conn = self._connection()
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, slot in rows:
+                if self._fingerprints[slot] == self._fingerprint(key):
+                    found[key] = np.array(self._vectors[slot])
+        if found:
+            now = time.time()
+            conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def put_many(self, items):
+        """Store vectors (dict of key -> vector), evicting least recently used rows when full."""
+        if not items:
+            return
+        with self._lock:
+            if self._vectors is None:
+                dim = len(next(iter(items.values())))
+                conn = self._connection()
+                conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)", (dim,))
+                self._open(conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()[0])
+
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                keys = list(items)
+                existing = {}
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    existing.update(conn.execute(
+                        f"SELECT key, slot FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall())
+                new_keys = [key for key in items if key not in existing]
+                (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+                free = list(range(count, min(self.capacity, count + len(new_keys))))
+                if len(free) < len(new_keys):
+                    evicted = conn.execute(
+                        "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (len(new_keys) - len(free),)
+                    ).fetchall()
+                    conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in evicted])
+                    free += [slot for _, slot in evicted]
+                slots = dict(existing, **dict(zip(new_keys, free)))
+
+                now = time.time()
+                for key, vector in items.items():
+                    if key not in slots:
+                        continue  # More new vectors than the whole store holds
+                    self._vectors[slots[key]] = vector
+                    self._fingerprints[slots[key]] = self._fingerprint(key)
+                self._vectors.flush()
+                self._fingerprints.flush()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                    [(key, slot, now) for key, slot in slots.items()]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+
+def default_store(model, capacity=20_000):
+    safe_model = re.sub(r'[^A-Za-z0-9_.-]+', '_', model)
+    return EmbeddingStore(os.path.join(os.path.dirname(__file__), '.cache', 'embeddings', safe_model), capacity)
+
+
+class CachedEmbedder(EmbeddingFunction):
+    """
+    Embedding function for crewAI memory that serves texts embedded before
+    from an EmbeddingStore and only sends the rest to the wrapped embedder.
+    """
+
+    def __init__(self, embedder, model, store=None):
+        self.embedder = embedder
+        self.model = model
+        self.store = store or default_store(model)
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def __call__(self, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        keys = [embedding_key(self.model, text) for text in texts]
+        found = self.store.get_many(list(dict.fromkeys(keys)))
+        missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in found))
+        self.stats['hits'] += len(texts) - len(missing)
+        self.stats['misses'] += len(missing)
+        if missing:
+            embedded = self.embedder(missing)
+            new = {embedding_key(self.model, text): np.asarray(vector, dtype=np.float32)
+                   for text, vector in zip(missing, embedded)}
+            self.store.put_many(new)
+            found.update(new)
+        return [found[key].tolist() for key in keys]
+
+
+class HashingEmbedder(EmbeddingFunction):
+    """
+    Deterministic local embedder: signed feature hashing of word unigrams and
+    bigrams, L2-normalized. No network calls, so memory works offline and
+    tests get identical vectors on every run.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def embed(self, text):
+        words = re.findall(r'\w+', text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'little')
+            vector[h % self.dim] += 1.0 if h >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def __call__(self, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        return [self.embed(text).tolist() for text in texts]
+
+
+def build_embedder(config=None, mode=None):
+    """
+    crewAI `embedder` setting for crews with memory.
+
+    Args:
+        config: crewAI embedder config to wrap ({'provider', 'config'}); crewAI's default when None
+        mode: 'cached' (default) wraps the configured embedder in the local cache,
+            'hashing' uses the deterministic HashingEmbedder, 'off' leaves crewAI's
+            default; defaults to the EMBEDDER_MODE environment variable
+
+    Returns:
+        Embedder config dict for Crew(embedder=...), or None for crewAI's default
+    """
+    mode = (mode or os.getenv('EMBEDDER_MODE', 'cached')).lower()
+    if mode == 'off':
+        return config
+    if mode == 'hashing':
+        return {'provider': 'custom', 'config': {'embedder': HashingEmbedder()}}
+    if mode != 'cached':
+        raise ValueError(f"Unknown embedder mode '{mode}', expected 'cached', 'hashing' or 'off'")
+
+    from crewai.utilities.embedding_configurator import EmbeddingConfigurator
+    inner = EmbeddingConfigurator().configure_embedder(config)
+    if config:
+        model = f"{config.get('provider')}/{config.get('config', {}).get('model', 'default')}"
+    else:
+        model = DEFAULT_MODEL
+    return {'provider': 'custom', 'config': {'embedder': CachedEmbedder(inner, model)}}
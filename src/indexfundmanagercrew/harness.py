@@ -0,0 +1,191 @@
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _run_iteration(args):
+    """
+    Run one test or train iteration in an isolated namespace (process-pool entry point).
+
+    Each iteration gets its own working directory, so MemoryStore files land
+    there, its own crewAI storage directory for crew memory, and freshly
+    created pooled tools. HTTP and LLM response caches on disk stay shared so
+    iterations reuse each other's responses. The working directory and
+    environment are restored afterwards, since pool workers run several
+    iterations and serial runs use the calling process.
+    """
+    index, mode, inputs, seed, run_dir, eval_llm, start_delay, train_file = args
+    time.sleep(start_delay)
+
+    iteration_dir = os.path.join(run_dir, f"iteration-{index}")
+    os.makedirs(iteration_dir, exist_ok=True)
+    previous_cwd = os.getcwd()
+    previous_storage = os.environ.get('CREWAI_STORAGE_DIR')
+    os.chdir(iteration_dir)
+    os.environ['CREWAI_STORAGE_DIR'] = f"indexfundmanagercrew-{os.path.basename(run_dir)}-{index}"
+    try:
+        return _iteration(index, mode, inputs, seed, iteration_dir, eval_llm, train_file)
+    finally:
+        os.chdir(previous_cwd)
+        if previous_storage is None:
+            os.environ.pop('CREWAI_STORAGE_DIR', None)
+        else:
+            os.environ['CREWAI_STORAGE_DIR'] = previous_storage
+
+
+def _iteration(index, mode, inputs, seed, iteration_dir, eval_llm, train_file):
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+
+    # Import here so every worker builds its crew after its namespace is set
+    from indexfundmanagercrew.crew import Indexfundmanagercrew
+    from indexfundmanagercrew.tools import registry
+    # Tools pooled by an earlier iteration in this process hold its state (ledgers, clients)
+    registry.reset()
+
+    inputs = dict(inputs, iteration=str(index), seed=str(seed))
+    started = time.perf_counter()
+    record = {'iteration': index, 'seed': seed, 'scores': {}, 'task_times': {}, 'error': None}
+    try:
+        crew = Indexfundmanagercrew().crew()
+        if mode == 'train':
+            crew.train(n_iterations=1, filename=os.path.join(iteration_dir, train_file), inputs=inputs)
+        else:
+            evaluator = None
+            try:
+                from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+                evaluator = CrewEvaluator(crew, eval_llm)
+                evaluator.set_iteration(1)
+            except Exception as e:
+                logger.warning(f"Crew evaluator unavailable, recording timings only: {e}")
+            crew.kickoff(inputs=inputs)
+            if evaluator is not None:
+                record['scores'] = {str(task): [float(s) for s in scores] for task, scores in evaluator.tasks_scores.items()}
+                record['task_times'] = {str(task): [float(t) for t in times] for task, times in evaluator.run_execution_times.items()}
+    except Exception as e:
+        record['error'] = str(e)
+    record['seconds'] = time.perf_counter() - started
+    return record
+
+
+def summarize(records):
+    """Aggregate per-iteration scores and timings into one report."""
+    completed = [r for r in records if r['error'] is None]
+    scores = {}
+    for record in completed:
+        for task, values in record['scores'].items():
+            scores.setdefault(task, []).extend(values)
+    seconds = np.array([r['seconds'] for r in completed]) if completed else np.zeros(0)
+    return {
+        'iterations': len(records),
+        'completed': len(completed),
+        'failed': [{'iteration': r['iteration'], 'error': r['error']} for r in records if r['error'] is not None],
+        'scores': {
+            task: {'mean': float(np.mean(values)), 'std': float(np.std(values)), 'n': len(values)}
+            for task, values in scores.items()
+        },
+        'overall_score': float(np.mean([v for values in scores.values() for v in values])) if scores else None,
+        'iteration_seconds': {
+            'mean': float(seconds.mean()) if seconds.size else None,
+            'max': float(seconds.max()) if seconds.size else None,
+        },
+    }
+
+
+def run_iterations(
+    n_iterations,
+    mode='test',
+    inputs=None,
+    max_workers=3,
+    eval_llm='gpt-4o-mini',
+    seed=0,
+    start_interval=5.0,
+    output_dir='harness_runs',
+    train_file='trained_agents_data.pkl'
+):
+    """
+    Run independent crew test (or train) iterations across a process pool.
+
+    Args:
+        n_iterations: Number of iterations
+        mode: 'test' scores each kickoff with crewAI's CrewEvaluator; 'train' runs crew.train per iteration
+        inputs: Kickoff inputs shared by all iterations; each also gets 'iteration' and 'seed'
+        max_workers: Concurrent iterations. Keep this low; every iteration hits Cookie, DeFi Llama and the LLM
+        eval_llm: Model used by the evaluator in test mode
+        seed: Base seed; iteration seeds are spawned from it, so reruns get the same inputs
+        start_interval: Seconds between the first iteration starts, so workers do not burst upstream APIs together
+        output_dir: Directory for per-iteration namespaces and the report
+        train_file: Training data filename written inside each iteration directory
+
+    Returns:
+        Report dict, also written to <output_dir>/<run id>/report.json
+    """
+    if mode not in ('test', 'train'):
+        raise ValueError(f"Unknown harness mode '{mode}', expected 'test' or 'train'")
+    if mode == 'train':
+        # crewAI collects training feedback from a human on stdin, one prompt at a time
+        max_workers = 1
+
+    run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+    run_dir = os.path.abspath(os.path.join(output_dir, run_id))
+    os.makedirs(run_dir, exist_ok=True)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_iterations)]
+    workers = max(1, min(max_workers, n_iterations))
+    jobs = [
+        (i + 1, mode, inputs or {}, seeds[i], run_dir, eval_llm,
+         start_interval * i if i < workers else 0.0, train_file)
+        for i in range(n_iterations)
+    ]
+
+    started = time.perf_counter()
+    records = []
+    if workers == 1:
+        for job in jobs:
+            records.append(_run_iteration(job))
+    else:
+        # Spawned workers start clean instead of inheriting this process's threads and clients
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_run_iteration, job) for job in jobs]
+            for future in as_completed(futures):
+                record = future.result()
+                logger.info(f"Iteration {record['iteration']} finished in {record['seconds']:.0f}s"
+                            + (f" with error: {record['error']}" if record['error'] else ""))
+                records.append(record)
+
+    records.sort(key=lambda r: r['iteration'])
+    report = summarize(records)
+    report.update({
+        'run_id': run_id,
+        'mode': mode,
+        'workers': workers,
+        'wall_seconds': time.perf_counter() - started,
+        'records': records,
+    })
+    with open(os.path.join(run_dir, 'report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def format_report(report):
+    lines = [
+        f"Run {report['run_id']} ({report['mode']}): {report['completed']}/{report['iterations']} iterations completed "
+        f"in {report['wall_seconds']:.0f}s on {report['workers']} workers"
+    ]
+    if report['iteration_seconds']['mean'] is not None:
+        lines.append(f"Iteration time: mean {report['iteration_seconds']['mean']:.0f}s, max {report['iteration_seconds']['max']:.0f}s")
+    for task, score in report['scores'].items():
+        lines.append(f"  {task}: {score['mean']:.2f} ± {score['std']:.2f} (n={score['n']})")
+    if report['overall_score'] is not None:
+        lines.append(f"Overall score: {report['overall_score']:.2f}")
+    for failure in report['failed']:
+        lines.append(f"  Iteration {failure['iteration']} failed: {failure['error']}")
+    return "\n".join(lines)
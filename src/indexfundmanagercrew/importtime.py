@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Import-time regression check for the CLI entry points.
+
+Each module is imported in a fresh interpreter under `python -X importtime`.
+The check fails when a module pulls in a dependency it should only load on
+first use, or when its cumulative import time exceeds its budget.
+
+Usage: importtime_check [--top N] [--runs N]
+(tests/test_importtime.py runs the same checks under pytest)
+"""
+import os
+import re
+import subprocess
+import sys
+
+# Module -> (dependencies that must stay unloaded, budget in ms or None)
+CHECKS = {
+    'indexfundmanagercrew.main': (('crewai', 'web3', 'defillama', 'requests', 'dotenv', 'numpy'), 150),
+    'indexfundmanagercrew.tools.registry': (('crewai', 'web3', 'defillama', 'requests', 'numpy'), 100),
+    'indexfundmanagercrew.tools.prefetch': (('web3', 'defillama', 'requests'), 100),
+    # crewAI itself is needed to define the crew; the web3 tools, LLM cache and embeddings are not
+    'indexfundmanagercrew.crew': (('web3', 'indexfundmanagercrew.llm_cache', 'indexfundmanagercrew.embeddings'), None),
+}
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+
+def measure(module):
+    """
+    Import a module in a fresh interpreter and parse the -X importtime report.
+
+    Returns:
+        Dict with cumulative_ms of the module, the set of loaded modules,
+        (self_ms, name) for every import, heaviest first, and an error string
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [src_dir, os.environ.get('PYTHONPATH')])))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env
+    )
+    loaded, by_self, cumulative = set(), [], None
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = int(match.group(1)), int(match.group(2)), match.group(3)
+        loaded.add(name)
+        by_self.append((self_us / 1000, name))
+        if name == module:
+            cumulative = cumulative_us / 1000
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+    return {'cumulative_ms': cumulative, 'loaded': loaded, 'by_self': sorted(by_self, reverse=True), 'error': error}
+
+
+def check(module, forbidden, budget_ms, runs=3):
+    """Measure a module (best of `runs`) and list any regressions."""
+    results = [measure(module) for _ in range(runs)]
+    best = min(results, key=lambda r: r['cumulative_ms'] if r['cumulative_ms'] is not None else float('inf'))
+    failures = []
+    if best['error']:
+        failures.append(f"import failed: {best['error']}")
+    leaked = sorted(dep for dep in forbidden if dep in best['loaded'])
+    if leaked:
+        failures.append(f"eagerly imports {', '.join(leaked)}")
+    if budget_ms is not None and best['cumulative_ms'] is not None and best['cumulative_ms'] > budget_ms:
+        failures.append(f"took {best['cumulative_ms']:.0f}ms, budget {budget_ms}ms")
+    return best, failures
+
+
+def main():
+    args = sys.argv[1:]
+    top = int(args[args.index('--top') + 1]) if '--top' in args else 5
+    runs = int(args[args.index('--runs') + 1]) if '--runs' in args else 3
+
+    failed = False
+    for module, (forbidden, budget_ms) in CHECKS.items():
+        best, failures = check(module, forbidden, budget_ms, runs)
+        took = f"{best['cumulative_ms']:.0f}ms" if best['cumulative_ms'] is not None else "n/a"
+        print(f"{'FAIL' if failures else 'ok  '} {module}: {took}" + (f" (budget {budget_ms}ms)" if budget_ms else ""))
+        for failure in failures:
+            print(f"     - {failure}")
+        for ms, name in best['by_self'][:top]:
+            print(f"     {ms:8.1f}ms  {name}")
+        failed = failed or bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class _JobNode:
+    def __init__(self, name, func, after, max_age, when):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.max_age = max_age
+        self.when = when
+        self.lock = threading.Lock()
+        self.done = None  # threading.Event of the run in progress
+        self.succeeded = False  # Outcome of the last finished run
+        self.last_success = None
+
+
+class JobGraph:
+    """
+    Dependency graph of scheduler jobs.
+
+    Triggering a job first makes sure every upstream job has succeeded within
+    its max_age (joining a run already in progress, or running it inline),
+    then runs the job. As soon as it succeeds, every downstream job whose
+    upstreams are all satisfied is started concurrently on a thread pool, so
+    publishing starts the moment analysis finishes instead of at a guessed
+    clock time. A job triggered while it is already running joins that run.
+
+    Coroutine jobs run on one shared event loop in a background thread, so
+    async clients (e.g. Twitter) keep their state between runs.
+
+    Jobs signal failure by returning False or raising; downstream jobs of a
+    failed job are skipped.
+    """
+
+    def __init__(self, max_workers=4):
+        self._nodes = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name='job-loop', daemon=True)
+        self._loop_thread.start()
+
+    def add_job(self, name, func, after=(), max_age=timedelta(hours=12), when=None):
+        """
+        Register a job.
+
+        Args:
+            name: Job name
+            func: Callable or coroutine function taking no arguments
+            after: Names of jobs whose output this job consumes
+            max_age: How long a successful run satisfies downstream jobs
+            when: Optional predicate on datetime.now(); when it returns False the
+                job is not started automatically after its upstreams
+        """
+        unknown = [dep for dep in after if dep not in self._nodes]
+        if unknown:
+            # Dependencies must be added first, which also rules out cycles
+            raise ValueError(f"Job '{name}' depends on unknown jobs: {', '.join(unknown)}")
+        self._nodes[name] = _JobNode(name, func, after, max_age, when)
+
+    def record_success(self, name, when):
+        """Seed the last successful run, e.g. from MemoryStore after a restart."""
+        if when:
+            self._nodes[name].last_success = datetime.fromisoformat(when) if isinstance(when, str) else when
+
+    def downstream(self, name):
+        return [node.name for node in self._nodes.values() if name in node.after]
+
+    def _is_fresh(self, node):
+        return node.last_success is not None and datetime.now() - node.last_success <= node.max_age
+
+    def _call(self, node):
+        if inspect.iscoroutinefunction(node.func):
+            return asyncio.run_coroutine_threadsafe(node.func(), self._loop).result()
+        return node.func()
+
+    def _run(self, name):
+        """
+        Run a job in the calling thread, or wait for the run already in progress.
+
+        Returns:
+            Tuple of (succeeded, whether this call ran the job)
+        """
+        node = self._nodes[name]
+        with node.lock:
+            running = node.done
+            if running is None:
+                node.done = threading.Event()
+        if running is not None:
+            logger.info(f"Job '{name}' already running, waiting for it")
+            running.wait()
+            return node.succeeded, False
+
+        succeeded = False
+        try:
+            for dep in node.after:
+                if not self._ensure(dep):
+                    logger.warning(f"Skipping job '{name}': upstream job '{dep}' failed")
+                    return False, True
+            started = datetime.now()
+            succeeded = self._call(node) is not False
+            logger.info(f"Job '{name}' {'finished' if succeeded else 'failed'} in {(datetime.now() - started).total_seconds():.1f}s")
+            return succeeded, True
+        except Exception as e:
+            logger.exception(f"Job '{name}' raised: {e}")
+            return False, True
+        finally:
+            with node.lock:
+                node.succeeded = succeeded
+                if succeeded:
+                    node.last_success = datetime.now()
+                node.done.set()
+                node.done = None
+
+    def _ensure(self, name):
+        """Make sure an upstream job has fresh output, running it if needed."""
+        node = self._nodes[name]
+        with node.lock:
+            running = node.done
+        if running is None and self._is_fresh(node):
+            return True
+        return self._run(name)[0]
+
+    def _run_and_propagate(self, name):
+        succeeded, ran = self._run(name)
+        # Whoever ran the job starts its downstream jobs, not those who joined
+        if not (succeeded and ran):
+            return
+        now = datetime.now()
+        for child in self.downstream(name):
+            node = self._nodes[child]
+            if node.when is not None and not node.when(now):
+                continue
+            # Upstreams of the child other than this job must already be fresh
+            if all(dep == name or self._is_fresh(self._nodes[dep]) for dep in node.after):
+                self._executor.submit(self._run_and_propagate, child)
+
+    def trigger(self, name, downstream=True):
+        """
+        Run a job now (from a scheduler thread), then start its ready downstream jobs.
+
+        Args:
+            name: Job name
+            downstream: Whether to start downstream jobs after it succeeds
+        """
+        if downstream:
+            self._run_and_propagate(name)
+        else:
+            self._run(name)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
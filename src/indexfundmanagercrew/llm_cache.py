@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from crewai import LLM
+from crewai.utilities.llm_utils import create_llm
+from indexfundmanagercrew.tracing import span, tracing_enabled
+
+logger = logging.getLogger(__name__)
+
+# replay: serve exact matches, call and store on a miss
+# record: always call the model and (re)store the response
+# strict: serve exact matches only, fail on a miss (offline regression runs)
+# off:    no caching
+CACHE_MODES = ('replay', 'record', 'strict', 'off')
+
+# Parameters that change the completion, and so belong in the cache key
+KEY_PARAMS = (
+    'temperature', 'top_p', 'n', 'stop', 'max_tokens', 'max_completion_tokens',
+    'presence_penalty', 'frequency_penalty', 'logit_bias', 'response_format', 'seed'
+)
+# Settings copied from crewAI's default LLM onto the caching wrapper
+MIRRORED_PARAMS = ('api_key', 'base_url', 'api_base', 'api_version', 'timeout') + KEY_PARAMS
+
+
+class LLMCacheMiss(Exception):
+    """Raised in strict mode when a prompt has no recorded response."""
+
+
+class LLMResponseCache:
+    """
+    Content-addressed store of LLM responses in SQLite.
+
+    Entries are keyed by a hash of the model, the sampling parameters and the
+    full message list. When the store grows past max_entries, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, filename=None, max_entries=20_000):
+        if filename is None:
+            filename = os.path.join(os.path.dirname(__file__), '.cache', 'llm', 'responses.db')
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.filename = filename
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(model, params, messages):
+        payload = json.dumps({'model': model, 'params': params, 'messages': messages}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, model, response):
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(response, default=str), now, now)
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+
+class CachingLLM(LLM):
+    """
+    crewAI LLM that answers repeated prompts from an LLMResponseCache.
+
+    Meant for test, train and replay runs over unchanged prompts. Calls that
+    let the model execute functions are never cached, since replaying them
+    would skip the function's side effects.
+    """
+
+    def __init__(self, *args, cache_mode='replay', cache=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{cache_mode}', expected one of {', '.join(CACHE_MODES)}")
+        self.cache_mode = cache_mode
+        # Tracing-only instances ('off') never touch the store
+        self.cache = cache or (LLMResponseCache() if cache_mode != 'off' else None)
+        self.cache_stats = {'hits': 0, 'misses': 0}
+
+    def _cache_key(self, messages, tools):
+        params = {name: getattr(self, name, None) for name in KEY_PARAMS}
+        params['tools'] = tools
+        return self.cache.make_key(self.model, params, messages)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        with span('llm.call', kind='llm', model=self.model, cache_mode=self.cache_mode) as llm_span:
+            hits = self.cache_stats['hits']
+            response = self._cached_call(messages, tools, callbacks, available_functions)
+            llm_span.set_attribute('cache_hit', self.cache_stats['hits'] > hits)
+            # crewAI's call() returns only the text, so per-call counts are a
+            # characters/4 estimate, named as such; the exact totals crewAI
+            # reports are on the kickoff span
+            prompt_tokens = len(messages if isinstance(messages, str) else json.dumps(messages, default=str)) // 4
+            completion_tokens = len(response) // 4 if isinstance(response, str) else 0
+            llm_span.set_attribute('estimated_prompt_tokens', prompt_tokens)
+            llm_span.set_attribute('estimated_completion_tokens', completion_tokens)
+            llm_span.set_attribute('estimated_total_tokens', prompt_tokens + completion_tokens)
+            return response
+
+    def _cached_call(self, messages, tools, callbacks, available_functions):
+        if self.cache_mode == 'off' or available_functions:
+            return super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+
+        key = self._cache_key(messages, tools)
+        if self.cache_mode in ('replay', 'strict'):
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache_stats['hits'] += 1
+                return cached
+            self.cache_stats['misses'] += 1
+            if self.cache_mode == 'strict':
+                raise LLMCacheMiss(f"No recorded response for this prompt ({self.model}, key {key[:12]})")
+
+        response = super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+        if isinstance(response, str) and response:
+            self.cache.put(key, self.model, response)
+        return response
+
+
+def build_llm(cache_mode=None):
+    """
+    LLM for the agents, wrapped in the response cache when enabled.
+
+    The wrapper copies the model, key, endpoint and sampling settings of the
+    LLM crewAI resolves for an agent without one (from MODEL, OPENAI_API_KEY,
+    OPENAI_API_BASE, ...), so turning on the cache or tracing never changes
+    which model the crew runs on. With tracing on, a CachingLLM in 'off'
+    mode is returned so every call is still recorded as an LLM span.
+
+    Args:
+        cache_mode: 'replay', 'record', 'strict' or 'off'; defaults to the LLM_CACHE_MODE environment variable
+
+    Returns:
+        A CachingLLM, or None when caching and tracing are both off so agents keep
+        crewAI's default LLM resolution
+    """
+    cache_mode = (cache_mode or os.getenv('LLM_CACHE_MODE', 'off')).lower()
+    if cache_mode == 'off' and not tracing_enabled():
+        return None
+    default = create_llm(None)
+    settings = {name: getattr(default, name, None) for name in MIRRORED_PARAMS}
+    return CachingLLM(
+        model=default.model,
+        cache_mode=cache_mode,
+        **{name: value for name, value in settings.items() if value is not None}
+    )
@@ -3,8 +3,7 @@ import sys
 import warnings
 import logging
 from datetime import datetime
-
-from indexfundmanagercrew.crew import Indexfundmanagercrew
+from indexfundmanagercrew.profiling import profiled
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -14,15 +13,21 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+# The crew (crewAI and the tool clients) is imported inside each command, so
+# `import indexfundmanagercrew.main` stays cheap for cron-style invocations.
+
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+@profiled()
 def run():
     """
     Run the crew.
     """
+    from indexfundmanagercrew.crew import Indexfundmanagercrew
+
     inputs = {
         'topic': 'Index Funds and Cryptocurrency',
         'current_day': str(datetime.now().day)
@@ -34,10 +39,13 @@ def run():
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+@profiled()
 def train():
     """
     Train the crew for a given number of iterations.
     """
+    from indexfundmanagercrew.crew import Indexfundmanagercrew
+
     inputs = {
         "topic": "Index Funds and Cryptocurrency"
     }
@@ -47,20 +55,26 @@ def train():
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
 
+@profiled()
 def replay():
     """
     Replay the crew execution from a specific task.
     """
+    from indexfundmanagercrew.crew import Indexfundmanagercrew
+
     try:
         Indexfundmanagercrew().crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
+@profiled()
 def test():
     """
     Test the crew execution and returns the results.
     """
+    from indexfundmanagercrew.crew import Indexfundmanagercrew
+
     inputs = {
         "topic": "Index Funds and Cryptocurrency"
     }
@@ -68,3 +82,28 @@ def test():
         Indexfundmanagercrew().crew().test(n_iterations=int(sys.argv[1]), inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+
+
+@profiled()
+def test_parallel():
+    """
+    Run independent test iterations across a process pool and print one report.
+    Usage: test_parallel <n_iterations> [max_workers] [eval_llm]
+    """
+    from indexfundmanagercrew.harness import run_iterations, format_report
+
+    inputs = {
+        "topic": "Index Funds and Cryptocurrency",
+        "current_day": str(datetime.now().day)
+    }
+    try:
+        report = run_iterations(
+            n_iterations=int(sys.argv[1]),
+            mode='test',
+            inputs=inputs,
+            max_workers=int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+            eval_llm=sys.argv[3] if len(sys.argv) > 3 else 'gpt-4o-mini'
+        )
+        print(format_report(report))
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
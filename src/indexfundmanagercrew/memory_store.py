@@ -1,30 +1,312 @@
 import json
 import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+
+def _to_timestamp(value):
+    """Accept datetimes, ISO strings or epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def _to_jsonable(value):
+    """Fallback serializer for crew results and other non-JSON values."""
+    for attr in ('to_dict', 'model_dump'):
+        method = getattr(value, attr, None)
+        if callable(method):
+            try:
+                return method()
+            except Exception:
+                pass
+    return str(value)
+
+
+class _SharedStore:
+    """
+    Process-wide state for one store file, shared by all MemoryStore instances:
+    one SQLite connection per thread and a read cache.
+
+    The cache is valid for one value of the store's change counter (the
+    `meta` table), which every committed write increments. Unlike PRAGMA
+    data_version, the counter is comparable across connections and
+    processes, so a new instance or thread starts from the warm cache.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.values = {}
+        self.version = None
+        self.generation = 0
+        self.initialized = False
+        self.last_maintenance = 0
+
 
 class MemoryStore:
-    def __init__(self, filename='memory_store.json'):
-        self.filename = filename
-        # Initialize the memory file if it does not exist
-        if not os.path.exists(self.filename):
-            with open(self.filename, 'w') as f:
-                json.dump({}, f)
+    """
+    Key-value memory for scheduler jobs, backed by SQLite in WAL mode.
+
+    Every update is a single-row upsert committed atomically, so a crash can
+    never truncate the store, and overlapping jobs (threads or processes) can
+    read while another writes. Reads go through an in-process cache that is
+    invalidated whenever any connection commits a change.
+
+    Every update is also appended to a timestamp-indexed history. Entries
+    older than compact_after_days are packed into zlib-compressed per-day
+    segments, and anything older than retention_days is dropped.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, filename='memory_store.db', retention_days=90, compact_after_days=7):
+        self.filename = os.path.abspath(filename)
+        self.retention_days = retention_days
+        self.compact_after_days = compact_after_days
+        with MemoryStore._shared_lock:
+            self._store = MemoryStore._shared.setdefault(self.filename, _SharedStore())
+            if self._store.initialized:
+                return
+            self._create_schema()
+            self._migrate_legacy_json()
+            self._store.initialized = True
+
+    def _create_schema(self):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                "key TEXT NOT NULL, ts REAL NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (key, ts)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history_segments ("
+                "key TEXT NOT NULL, start_ts REAL NOT NULL, end_ts REAL NOT NULL, "
+                "count INTEGER NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (key, start_ts)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO meta (id, version) VALUES (0, 0)")
+
+    def _connection(self):
+        """This thread's connection to the store file, opened on first use and shared by every instance."""
+        conn = getattr(self._store.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._store.local.conn = conn
+        return conn
+
+    @staticmethod
+    def _bump_version(conn):
+        """Increment the change counter inside the caller's write transaction and return the new value."""
+        conn.execute("UPDATE meta SET version = version + 1 WHERE id = 0")
+        return conn.execute("SELECT version FROM meta WHERE id = 0").fetchone()[0]
+
+    def _sync_cache(self, conn):
+        """Drop the read cache if any connection has committed a change since it was filled."""
+        version = conn.execute("SELECT version FROM meta WHERE id = 0").fetchone()[0]
+        with self._store.lock:
+            if version != self._store.version:
+                self._store.values.clear()
+                self._store.version = version
+                self._store.generation += 1
+
+    def _migrate_legacy_json(self):
+        """Import the old memory_store.json once, if it sits next to a fresh database."""
+        legacy = os.path.splitext(self.filename)[0] + '.json'
+        if not os.path.exists(legacy):
+            return
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM memory LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO memory (key, value, updated_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(value, default=_to_jsonable), now) for key, value in data.items()]
+            )
+            self._bump_version(conn)
+        os.replace(legacy, legacy + '.migrated')
 
     def load_memory(self):
-        with open(self.filename, 'r') as f:
-            data = json.load(f)
-        return data
+        conn = self._connection()
+        rows = conn.execute("SELECT key, value FROM memory").fetchall()
+        return {key: json.loads(value) for key, value in rows}
 
-    def update_memory(self, key, value):
-        memory = self.load_memory()
-        memory[key] = value
-        with open(self.filename, 'w') as f:
-            json.dump(memory, f, indent=4)
+    def update_memory(self, key, value, timestamp=None):
+        encoded = json.dumps(value, default=_to_jsonable)
+        ts = _to_timestamp(timestamp)
+        ts = time.time() if ts is None else ts
+        conn = self._connection()
+        version = None
+        with conn:
+            # A backfilled (older) timestamp only goes into the history, not over a newer current value
+            changed = conn.execute(
+                "INSERT INTO memory (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at "
+                "WHERE excluded.updated_at >= memory.updated_at",
+                (key, encoded, ts)
+            ).rowcount
+            conn.execute(
+                "INSERT OR REPLACE INTO history (key, ts, value) VALUES (?, ?, ?)",
+                (key, ts, encoded)
+            )
+            if changed:
+                version = self._bump_version(conn)
+        if version is not None:
+            with self._store.lock:
+                if self._store.version == version - 1:
+                    # Ours is the only change since the cache was filled
+                    self._store.values[key] = encoded
+                else:
+                    self._store.values.clear()
+                self._store.version = version
+                self._store.generation += 1
+
+        # Compaction and retention run at most once an hour per store file
+        with self._store.lock:
+            due = time.time() - self._store.last_maintenance > 3600
+            if due:
+                self._store.last_maintenance = time.time()
+        if due:
+            self.maintain()
 
     def get_memory(self, key):
-        memory = self.load_memory()
-        return memory.get(key, None)
+        conn = self._connection()
+        self._sync_cache(conn)
+        with self._store.lock:
+            encoded = self._store.values.get(key)
+            generation = self._store.generation
+        if encoded is not None:
+            # Cached as JSON text so callers never share mutable state
+            return json.loads(encoded)
+
+        row = conn.execute("SELECT value FROM memory WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self._store.lock:
+            # Only fill if no write happened while we were reading
+            if self._store.generation == generation:
+                self._store.values[key] = row[0]
+        return json.loads(row[0])
+
+    def get_history(self, key, since=None, until=None, limit=None, latest_per_day=False):
+        """
+        Versions of a key within a time range, oldest first.
+
+        Args:
+            key: Memory key
+            since: Range start (datetime, ISO string or epoch seconds), inclusive
+            until: Range end, inclusive
+            limit: Keep only the most recent `limit` entries
+            latest_per_day: Keep only the last version of each (local) day, e.g. when
+                a job re-ran and wrote the key twice
+
+        Returns:
+            List of {'timestamp': ISO string, 'value': value}
+        """
+        since_ts = _to_timestamp(since)
+        since_ts = float('-inf') if since_ts is None else since_ts
+        until_ts = _to_timestamp(until)
+        until_ts = float('inf') if until_ts is None else until_ts
+        conn = self._connection()
+
+        entries = []
+        segments = conn.execute(
+            "SELECT data FROM history_segments WHERE key = ? AND end_ts >= ? AND start_ts <= ? ORDER BY start_ts",
+            (key, since_ts, until_ts)
+        ).fetchall()
+        for (data,) in segments:
+            for ts, encoded in json.loads(zlib.decompress(data)):
+                if since_ts <= ts <= until_ts:
+                    entries.append((ts, encoded))
+
+        entries.extend(conn.execute(
+            "SELECT ts, value FROM history WHERE key = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (key, since_ts, until_ts)
+        ).fetchall())
+
+        entries.sort(key=lambda entry: entry[0])
+        if latest_per_day:
+            entries = list({datetime.fromtimestamp(ts).date(): (ts, encoded) for ts, encoded in entries}.values())
+        if limit is not None:
+            entries = entries[-limit:]
+        return [
+            {'timestamp': datetime.fromtimestamp(ts).isoformat(), 'value': json.loads(encoded)}
+            for ts, encoded in entries
+        ]
+
+    def get_recent_history(self, key, days=7, latest_per_day=False):
+        """All versions of a key from the last `days` days, oldest first."""
+        return self.get_history(key, since=datetime.now() - timedelta(days=days), latest_per_day=latest_per_day)
+
+    def maintain(self):
+        """Compact old history into compressed per-day segments and apply the retention policy."""
+        conn = self._connection()
+        now = time.time()
+        compact_before = now - self.compact_after_days * 86400
+        retain_after = now - self.retention_days * 86400
+
+        with conn:
+            conn.execute("DELETE FROM history WHERE ts < ?", (retain_after,))
+            conn.execute("DELETE FROM history_segments WHERE end_ts < ?", (retain_after,))
+
+            rows = conn.execute(
+                "SELECT key, ts, value FROM history WHERE ts < ? ORDER BY key, ts",
+                (compact_before,)
+            ).fetchall()
+            segments = {}
+            for key, ts, encoded in rows:
+                day = datetime.fromtimestamp(ts).date().isoformat()
+                segments.setdefault((key, day), []).append([ts, encoded])
+
+            for (key, _), entries in segments.items():
+                # Merge with an existing segment for the same day, if any
+                start = datetime.fromtimestamp(entries[0][0]).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+                existing = conn.execute(
+                    "SELECT data FROM history_segments WHERE key = ? AND start_ts = ?",
+                    (key, start)
+                ).fetchone()
+                if existing:
+                    entries = json.loads(zlib.decompress(existing[0])) + entries
+                conn.execute(
+                    "INSERT OR REPLACE INTO history_segments (key, start_ts, end_ts, count, data) VALUES (?, ?, ?, ?, ?)",
+                    (key, start, max(e[0] for e in entries), len(entries),
+                     zlib.compress(json.dumps(entries).encode(), 6))
+                )
+            conn.execute("DELETE FROM history WHERE ts < ?", (compact_before,))
+
+    def close(self):
+        """Close this thread's shared connection; the next call on any instance reopens it."""
+        conn = getattr(self._store.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._store.local.conn = None
 
 # Example usage:
 # store = MemoryStore()
 # store.update_memory('last_run', '2023-10-05')
-# print(store.get_memory('last_run')) 
\ No newline at end of file
+# print(store.get_memory('last_run'))
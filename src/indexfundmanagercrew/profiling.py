@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+"""
+Opt-in CPU and memory profiles for scheduler jobs and CLI entry points.
+
+Profiling is off unless PROFILE_ENABLED=1 (or PROFILE_DIR is set); profiled()
+then returns the function unchanged. When on, each profiled call writes a
+directory under .cache/profiles (or PROFILE_DIR) with:
+
+    cpu.folded   sampled stacks in collapsed format (flamegraph.pl, speedscope)
+    memory.txt   tracemalloc top allocators and growth over the call
+    meta.json    duration, sample count, peak traced memory, max RSS
+
+Only the newest PROFILE_KEEP runs (default 50) are kept.
+
+Settings: PROFILE_INTERVAL (sampling interval in seconds, default 0.01),
+PROFILE_MEMORY (0 to skip tracemalloc), PROFILE_TOP (allocators listed, default 25).
+"""
+import functools
+import inspect
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Frames kept per tracemalloc traceback; deeper is more precise and slower
+TRACEMALLOC_FRAMES = 10
+
+
+def profiling_enabled():
+    return os.getenv('PROFILE_ENABLED', '').lower() in ('1', 'true', 'yes') or bool(os.getenv('PROFILE_DIR'))
+
+
+def profile_dir():
+    return os.getenv('PROFILE_DIR') or os.path.join(os.path.dirname(__file__), '.cache', 'profiles')
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of the profiled thread, and of threads started while
+    it runs, into collapsed-stack counts.
+
+    Threads that already existed when sampling started (the scheduler's own
+    workers) are ignored, except the profiled thread itself.
+    """
+
+    def __init__(self, thread_id, interval=0.01):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._ignored = {t.ident for t in threading.enumerate()} - {thread_id}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or thread_id in self._ignored:
+                    continue
+                self.stacks[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        names.append(thread_name)
+        return ";".join(reversed(names))
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _acquire_tracemalloc():
+    """Start tracemalloc for the first concurrent profile (graph-mode jobs can overlap)."""
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class JobProfile:
+    """CPU sampling and tracemalloc snapshots around one call."""
+
+    def __init__(self, name):
+        self.name = name
+        self.sampler = None
+        self.memory = os.getenv('PROFILE_MEMORY', '1').lower() not in ('0', 'false', 'no')
+        self.start_snapshot = None
+
+    def start(self):
+        self.started_at = datetime.now()
+        self.start_time = time.perf_counter()
+        if self.memory:
+            _acquire_tracemalloc()
+            tracemalloc.reset_peak()
+            self.start_snapshot = tracemalloc.take_snapshot()
+        self.sampler = StackSampler(threading.get_ident(), float(os.getenv('PROFILE_INTERVAL', '0.01')))
+        self.sampler.start()
+
+    def stop(self, error=None):
+        """Stop sampling, write the profile and return its directory."""
+        seconds = time.perf_counter() - self.start_time
+        self.sampler.stop()
+        memory_report, peak = None, None
+        if self.memory:
+            end_snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            memory_report = self._memory_report(end_snapshot, int(os.getenv('PROFILE_TOP', '25')))
+            _release_tracemalloc()
+
+        run_dir = os.path.join(profile_dir(), f"{self.started_at:%Y%m%d-%H%M%S-%f}-{os.getpid()}-{self.name}")
+        os.makedirs(run_dir, exist_ok=True)
+        with open(os.path.join(run_dir, 'cpu.folded'), 'w') as f:
+            f.write(self.sampler.folded())
+        if memory_report is not None:
+            with open(os.path.join(run_dir, 'memory.txt'), 'w') as f:
+                f.write(memory_report)
+        with open(os.path.join(run_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'name': self.name,
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'seconds': seconds,
+                'samples': self.sampler.samples,
+                'interval': self.sampler.interval,
+                'peak_traced_bytes': peak,
+                'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+                'error': error,
+            }, f, indent=2)
+        prune(int(os.getenv('PROFILE_KEEP', '50')))
+        return run_dir
+
+    def _memory_report(self, end_snapshot, top):
+        # Ignore the profiler's own allocations
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        end_snapshot = end_snapshot.filter_traces(filters)
+        lines = [f"Top {top} allocators at end of {self.name}:"]
+        for stat in end_snapshot.statistics('lineno')[:top]:
+            lines.append(f"  {stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  {stat.traceback[0]}")
+        if self.start_snapshot is not None:
+            lines += ["", f"Top {top} growth over the call (still allocated when it returned):"]
+            diff = end_snapshot.compare_to(self.start_snapshot.filter_traces(filters), 'traceback')
+            for stat in [s for s in diff if s.size_diff > 0][:top]:
+                lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB  {stat.count_diff:+8d} blocks")
+                lines.extend(f"      {line}" for line in stat.traceback.format(limit=TRACEMALLOC_FRAMES))
+        return "\n".join(lines) + "\n"
+
+
+def prune(keep):
+    """Delete all but the newest `keep` profile directories."""
+    root = profile_dir()
+    try:
+        runs = sorted(entry for entry in os.listdir(root) if os.path.isdir(os.path.join(root, entry)))
+    except FileNotFoundError:
+        return
+    for entry in runs[:max(0, len(runs) - keep)]:
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+
+
+_active = threading.local()
+
+
+def profiled(name=None):
+    """Decorator profiling each call; returns the function unchanged when profiling is off."""
+    def decorator(func):
+        if not profiling_enabled():
+            return func
+        job_name = name or func.__name__
+
+        def begin():
+            # Nested profiled calls run inside the outer profile
+            if getattr(_active, 'profile', None) is not None:
+                return None
+            profile = JobProfile(job_name)
+            profile.start()
+            _active.profile = profile
+            return profile
+
+        def finish(profile, error):
+            if profile is None:
+                return
+            _active.profile = None
+            run_dir = profile.stop(error)
+            print(f"[{datetime.now()}] Profile of {job_name} written to {run_dir}")
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                profile, error = begin(), None
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException as e:
+                    error = f"{type(e).__name__}: {e}"
+                    raise
+                finally:
+                    finish(profile, error)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile, error = begin(), None
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                finish(profile, error)
+        return wrapper
+    return decorator
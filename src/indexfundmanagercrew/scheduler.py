@@ -1,38 +1,190 @@
-from datetime import datetime
+from dataclasses import asdict
+from datetime import datetime, timedelta
 import asyncio
+import inspect
+import os
+import signal
+import sys
+from pathlib import Path
 from apscheduler.schedulers.blocking import BlockingScheduler
-from crew import Indexfundmanagercrew
-from memory_store import MemoryStore
+from indexfundmanagercrew.crew_pool import CrewPool
+from indexfundmanagercrew.job_graph import JobGraph
+from indexfundmanagercrew.memory_store import MemoryStore
+from indexfundmanagercrew.artifacts import ArtifactStore, digest, file_digest
+from indexfundmanagercrew.compaction import report_text, summarize_report
+from indexfundmanagercrew.profiling import profiled
+from indexfundmanagercrew.tracing import traced
+from indexfundmanagercrew.tools.api.health import HealthChecker, STATUS_DOWN
+from indexfundmanagercrew.tools.prefetch import TokenDataset, run_prefetch
+from indexfundmanagercrew.tools.snapshots import SnapshotStore
+from indexfundmanagercrew.tools.features import FeatureStore
+from indexfundmanagercrew.tools.warmup import warm_caches, format_coverage
 
+# Crew instances, tools and API clients stay warm between jobs
+crew_pool = CrewPool()
+# Stage outputs keyed by their inputs, so unchanged stages are not recomputed
+artifacts = ArtifactStore()
 
-def run_data_gathering_task():
+CONFIG_DIR = Path(__file__).parent / 'config'
+
+
+def config_digest():
+    """Agent and task prompts; a change invalidates every crew stage."""
+    return file_digest(CONFIG_DIR / 'agents.yaml', CONFIG_DIR / 'tasks.yaml')
+
+
+def dataset_digest():
+    """Token records of the pre-fetched dataset; generated_at changes on every prefetch and is left out."""
+    dataset = TokenDataset.load()
+    return digest([asdict(token) for token in dataset.tokens]) if dataset is not None else None
+
+
+def upstream_digest(stage):
+    artifact = artifacts.latest(stage)
+    return artifact.digest if artifact is not None else None
+
+
+def check_api_health(job):
+    """Run (or reuse the cached) pre-flight health check and record it for the job."""
+    try:
+        report = HealthChecker().check()
+    except Exception as e:
+        print(f"[{datetime.now()}] API health check failed before {job}: {e}")
+        return None
+    status = report.as_dict()
+    status['job'] = job
+    summary = ", ".join(f"{name}={probe.status}" for name, probe in report.probes.items())
+    print(f"[{datetime.now()}] API health before {job}: {report.status} ({summary})")
+    MemoryStore().update_memory('api_health', status)
+    return report
+
+
+@traced(kind='stage')
+def run_prefetch_stage():
+    """Collect the token dataset without the LLM; the crew picks it up from disk."""
+    try:
+        started = datetime.now()
+        dataset = run_prefetch()
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"[{datetime.now()}] Pre-fetched {len(dataset.tokens)} tokens in {elapsed:.1f}s")
+        store = MemoryStore()
+        store.update_memory('prefetch_last_run', dataset.generated_at)
+        store.update_memory('prefetch_stats', {
+            'tokens': len(dataset.tokens),
+            'seconds': elapsed,
+            'errors': dataset.errors
+        })
+        SnapshotStore().record(dataset)
+    except Exception as e:
+        # The crew still runs; agents fall back to the individual tools
+        print(f"[{datetime.now()}] Error in pre-fetch stage: {e}")
+
+
+@traced(kind='stage')
+def refresh_features():
+    """Add today's per-token feature slice, computed from the latest universe snapshot."""
+    try:
+        feature_slice = FeatureStore().update()
+        if feature_slice is not None:
+            MemoryStore().update_memory('features_last_day', feature_slice.day)
+    except Exception as e:
+        print(f"[{datetime.now()}] Error refreshing token features: {e}")
+
+
+@profiled()
+@traced(kind='job')
+def run_data_gathering_task(force=False):
     try:
-        crew_instance = Indexfundmanagercrew()
         inputs = {'topic': 'AI Agent tokens', 'current_day': str(datetime.now().day)}
         print(f"[{datetime.now()}] Starting data gathering task")
-        result = crew_instance.data_gathering_task().kickoff(inputs=inputs)
-        print(f"[{datetime.now()}] Data gathering completed. Result: {result}")
+        health = check_api_health('data_gathering')
+        if health is not None and health.status == STATUS_DOWN:
+            print(f"[{datetime.now()}] All upstream APIs are down, skipping data gathering")
+            return False
+        run_prefetch_stage()
+
+        def gather():
+            with crew_pool.lease() as crew_instance:
+                return crew_instance.run_task('data_gathering_task', inputs=inputs)
+
+        artifact = artifacts.run('data_gathering', {
+            'inputs': inputs,
+            'config': config_digest(),
+            'token_dataset': dataset_digest(),
+        }, gather, force=force)
+        result = artifact.output
         store = MemoryStore()
-        store.update_memory('data_gathering_last_run', datetime.now().isoformat())
-        store.update_memory('data_gathering_result', result)
+        if artifact.reused:
+            print(f"[{datetime.now()}] Data gathering inputs unchanged, reusing the stored result")
+        else:
+            print(f"[{datetime.now()}] Data gathering completed. Result: {result}")
+        # A reused artifact may come from a run that failed before storing it
+        if not artifact.reused or store.get_memory('data_gathering_result') != result:
+            store.update_memory('data_gathering_last_run', datetime.now().isoformat())
+            store.update_memory('data_gathering_result', result)
+        refresh_features()
+        return True
     except Exception as e:
         print(f"[{datetime.now()}] Error in data gathering task: {e}")
+        return False
+
+
+@profiled()
+@traced(kind='job')
+def run_cache_warmup():
+    """Refresh the Cookie cache and token dataset so the evening analysis runs on cache hits."""
+    try:
+        print(f"[{datetime.now()}] Starting cache warm-up")
+        health = check_api_health('cache_warmup')
+        if health is not None and health.status == STATUS_DOWN:
+            print(f"[{datetime.now()}] All upstream APIs are down, skipping cache warm-up")
+            return False
+        stats = warm_caches()
+        print(f"[{datetime.now()}] Cache warm-up completed: {format_coverage(stats)}")
+        store = MemoryStore()
+        store.update_memory('cache_warmup_last_run', datetime.now().isoformat())
+        store.update_memory('cache_warmup_stats', stats)
+        return True
+    except Exception as e:
+        print(f"[{datetime.now()}] Error in cache warm-up: {e}")
+        return False
 
 
-def run_daily_analysis_task():
+@profiled()
+@traced(kind='job')
+def run_daily_analysis_task(force=False):
     try:
-        crew_instance = Indexfundmanagercrew()
         inputs = {'topic': 'AI Agent Tokens', 'current_day': str(datetime.now().day)}
         print(f"[{datetime.now()}] Starting daily analysis task")
-        result = crew_instance.daily_analysis_task().kickoff(inputs=inputs)
-        print(f"[{datetime.now()}] Daily analysis completed. Result: {result}")
+
+        def analyze():
+            check_api_health('daily_analysis')
+            with crew_pool.lease() as crew_instance:
+                return crew_instance.run_task('daily_analysis_task', inputs=inputs)
+
+        artifact = artifacts.run('daily_analysis', {
+            'inputs': inputs,
+            'date': datetime.now().date().isoformat(),
+            'config': config_digest(),
+            'data_gathering': upstream_digest('data_gathering'),
+        }, analyze, force=force)
+        result = artifact.output
+        if artifact.reused:
+            # Still goes through the storage path below: the run that produced
+            # the artifact may have failed before storing or summarizing it
+            print(f"[{datetime.now()}] Daily analysis inputs unchanged, reusing the stored result")
+        else:
+            print(f"[{datetime.now()}] Daily analysis completed. Result: {result}")
         
         # Process the analysis results
         if isinstance(result, dict):
             # Check if we have a discussion field
             discussion = result.get('daily_discussion') or result.get('discussion')
             
-            if not discussion and isinstance(result.get('analysis'), str):
+            if not discussion and not result.get('analysis') and result.get('raw'):
+                # Plain-text crew output
+                result['daily_discussion'] = result['raw']
+            elif not discussion and isinstance(result.get('analysis'), str):
                 # If no explicit discussion field, use the analysis as the discussion
                 result['daily_discussion'] = result['analysis']
             elif not discussion and isinstance(result.get('analysis'), dict):
@@ -59,31 +211,76 @@ def run_daily_analysis_task():
                     result['daily_discussion'] = ". ".join(discussion_parts)
         
         store = MemoryStore()
+        if artifact.reused and store.get_memory('daily_analysis_result') == result:
+            # Already stored; storing again would add a duplicate day to the weekly history
+            summarize_daily_report(result)
+            return True
         store.update_memory('daily_analysis_last_run', datetime.now().isoformat())
         store.update_memory('daily_analysis_result', result)
+        summarize_daily_report(result)
+        return True
     except Exception as e:
         print(f"[{datetime.now()}] Error in daily analysis task: {e}")
+        return False
+
 
+def summarize_daily_report(result):
+    """Summarize today's report once, so the weekly decision reads cached summaries."""
+    try:
+        dataset = TokenDataset.load()
+        known_tokens = sorted({t.name for t in dataset.tokens}) if dataset else ()
+        summary = summarize_report(report_text(result), datetime.now().date().isoformat(), known_tokens)
+        print(f"[{datetime.now()}] Summarized daily report: ~{summary.raw_tokens} tokens, "
+              f"{len(summary.tokens)} tokens mentioned")
+    except Exception as e:
+        # The weekly context summarizes missing days on demand
+        print(f"[{datetime.now()}] Error summarizing daily report: {e}")
 
-def run_publish_website_task():
+
+@profiled()
+@traced(kind='job')
+def run_publish_website_task(force=False):
+    """Publish the stored daily analysis; formatting it needs no crew kickoff."""
     try:
-        crew_instance = Indexfundmanagercrew()
-        inputs = {'topic': 'AI Agent Tokens', 'current_day': str()}
         print(f"[{datetime.now()}] Starting website publication task")
-        result = crew_instance.publish_website_task().kickoff(inputs=inputs)
+        analysis = MemoryStore().get_memory('daily_analysis_result')
+        if not analysis:
+            print(f"[{datetime.now()}] No daily analysis results found for website publication")
+            return False
+
+        def publish():
+            from indexfundmanagercrew.tools.website.website_publisher import WebsitePublisher
+            result = WebsitePublisher().publish(analysis)
+            if result['status'] != 'success':
+                # Not stored, so a re-run publishes again
+                raise RuntimeError(result['error'])
+            return result
+
+        artifact = artifacts.run('publish_website', {
+            'daily_analysis': upstream_digest('daily_analysis'),
+            'date': datetime.now().date().isoformat(),
+        }, publish, force=force)
+        if artifact.reused:
+            print(f"[{datetime.now()}] Today's analysis is already published, nothing to do")
+            return True
+        result = artifact.output
         print(f"[{datetime.now()}] Website publication completed. Result: {result}")
         store = MemoryStore()
         store.update_memory('publish_website_last_run', datetime.now().isoformat())
         store.update_memory('publish_website_result', result)
+        return True
     except Exception as e:
         print(f"[{datetime.now()}] Error in website publication task: {e}")
+        return False
 
 
 def run_twitter_task_wrapper():
     """Wrapper function to run the async Twitter task in the scheduler."""
-    asyncio.run(run_publish_twitter_task())
+    return asyncio.run(run_publish_twitter_task())
 
 
+@profiled()
+@traced(kind='job')
 async def run_publish_twitter_task():
     """Publishes daily analysis to Twitter."""
     try:
@@ -93,9 +290,9 @@ async def run_publish_twitter_task():
         
         if not daily_analysis_result:
             print(f"[{datetime.now()}] No daily analysis results found for Twitter publication")
-            return
+            return False
             
-        from tools.social.twitter_publisher import TwitterPublisher
+        from indexfundmanagercrew.tools.social.twitter_publisher import TwitterPublisher
         publisher = TwitterPublisher()
         result = await publisher.publish_daily_analysis(daily_analysis_result)
         
@@ -104,9 +301,11 @@ async def run_publish_twitter_task():
                   f"Published {result['tweet_count']} tweets.")
             store.update_memory('publish_twitter_last_run', datetime.now().isoformat())
             store.update_memory('publish_twitter_result', result)
+            return True
         else:
             print(f"[{datetime.now()}] Twitter publication failed: {result['error']}")
             store.update_memory('publish_twitter_result', result)
+            return False
             
     except Exception as e:
         error_msg = f"Error in Twitter publication task: {str(e)}"
@@ -116,29 +315,37 @@ async def run_publish_twitter_task():
             "status": "error",
             "error": error_msg
         })
+        return False
 
 
+@profiled()
+@traced(kind='job')
 def run_weekly_decision_task():
     try:
-        crew_instance = Indexfundmanagercrew()
         inputs = {'topic': 'Base Chain AI Agent Tokens', 'current_day': str(datetime.now().day)}
         print(f"[{datetime.now()}] Starting weekly decision task")
-        result = crew_instance.weekly_decision_task().kickoff(inputs=inputs)
+        check_api_health('weekly_decision')
+        with crew_pool.lease() as crew_instance:
+            result = crew_instance.run_task('weekly_decision_task', inputs=inputs)
         print(f"[{datetime.now()}] Weekly decision completed. Result: {result}")
         store = MemoryStore()
         store.update_memory('weekly_decision_last_run', datetime.now().isoformat())
         store.update_memory('weekly_decision_result', result)
+        return True
     except Exception as e:
         print(f"[{datetime.now()}] Error in weekly decision task: {e}")
+        return False
 
 
-if __name__ == '__main__':
-    scheduler = BlockingScheduler()
-
+def schedule_clock_jobs(scheduler):
+    """Every job at a fixed wall-clock time (default mode)."""
     # Schedule data gathering twice a day (e.g., 9:00 AM and 3:00 PM)
     scheduler.add_job(run_data_gathering_task, 'cron', hour=9, minute=0, id='data_gathering_morning')
     scheduler.add_job(run_data_gathering_task, 'cron', hour=15, minute=0, id='data_gathering_afternoon')
 
+    # Warm the API caches ahead of the evening analysis; the 15:00 entries have expired by then
+    scheduler.add_job(run_cache_warmup, 'cron', hour=19, minute=40, id='cache_warmup')
+
     # Schedule daily analysis at 8:00 PM
     scheduler.add_job(run_daily_analysis_task, 'cron', hour=20, minute=0, id='daily_analysis')
 
@@ -149,8 +356,72 @@ if __name__ == '__main__':
     # Schedule weekly decision task (e.g., every Sunday at 8:00 PM)
     scheduler.add_job(run_weekly_decision_task, 'cron', day_of_week='sun', hour=20, minute=0, id='weekly_decision')
 
+
+def build_job_graph():
+    """data gathering -> daily analysis -> {website, twitter, weekly decision on Sundays}"""
+    graph = JobGraph(max_workers=4)
+    graph.add_job('data_gathering', run_data_gathering_task, max_age=timedelta(hours=12))
+    graph.add_job('daily_analysis', run_daily_analysis_task, after=['data_gathering'])
+    graph.add_job('publish_website', run_publish_website_task, after=['daily_analysis'])
+    graph.add_job('publish_twitter', run_publish_twitter_task, after=['daily_analysis'])
+    graph.add_job('weekly_decision', run_weekly_decision_task, after=['daily_analysis'],
+                  when=lambda now: now.weekday() == 6)
+
+    # Pick up where the last process left off, so a restart does not redo fresh work
+    store = MemoryStore()
+    for name in ('data_gathering', 'daily_analysis'):
+        graph.record_success(name, store.get_memory(f'{name}_last_run'))
+    return graph
+
+
+def schedule_job_graph(scheduler, graph):
+    """Only root jobs run on the clock; publishing and the weekly decision follow the analysis."""
+    scheduler.add_job(graph.trigger, 'cron', args=['data_gathering', False], hour=9, minute=0, id='data_gathering_morning')
+    scheduler.add_job(graph.trigger, 'cron', args=['data_gathering', False], hour=15, minute=0, id='data_gathering_afternoon')
+    scheduler.add_job(run_cache_warmup, 'cron', hour=19, minute=40, id='cache_warmup')
+    scheduler.add_job(graph.trigger, 'cron', args=['daily_analysis'], hour=20, minute=0, id='daily_analysis')
+
+
+# Jobs that can be run once from the command line
+MANUAL_JOBS = {
+    'data_gathering': run_data_gathering_task,
+    'daily_analysis': run_daily_analysis_task,
+    'publish_website': run_publish_website_task,
+    'weekly_decision': run_weekly_decision_task,
+}
+
+
+def run_once(job, force=False):
+    """Run one job now. Stages whose inputs are unchanged reuse their stored output unless forced."""
+    func = MANUAL_JOBS[job]
+    return func(force=force) if 'force' in inspect.signature(func).parameters else func()
+
+
+def main():
+    # python -m indexfundmanagercrew.scheduler --run publish_website [--force]
+    if '--run' in sys.argv:
+        job = sys.argv[sys.argv.index('--run') + 1]
+        if job not in MANUAL_JOBS:
+            sys.exit(f"Unknown job '{job}', expected one of {', '.join(MANUAL_JOBS)}")
+        sys.exit(0 if run_once(job, force='--force' in sys.argv) else 1)
+
+    crew_pool.warm_up()
+    # `kill -HUP <pid>` rebuilds crews, tools and API clients without a restart
+    signal.signal(signal.SIGHUP, lambda signum, frame: crew_pool.refresh(tools=True))
+
+    scheduler = BlockingScheduler()
+    if os.getenv('SCHEDULER_MODE', 'clock') == 'graph':
+        graph = build_job_graph()
+        schedule_job_graph(scheduler, graph)
+    else:
+        schedule_clock_jobs(scheduler)
+
     print("Scheduler started. Press Ctrl+C to exit.")
     try:
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
-        print("Scheduler stopped.") 
\ No newline at end of file
+        print("Scheduler stopped.") 
+
+
+if __name__ == '__main__':
+    main()
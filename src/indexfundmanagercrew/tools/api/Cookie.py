@@ -7,6 +7,8 @@ import json
 from enum import Enum
 from dataclasses import dataclass, field
 from pathlib import Path
+from .health import is_upstream_down
+from indexfundmanagercrew.tracing import span
 
 # Filter-related code
 class SortOrder(Enum):
@@ -199,8 +201,16 @@ class CookieAPI:
         self.api_key = api_key
         self.base_url = 'https://api.cookie.fun'
         self.headers = {'x-api-key': self.api_key}
+        # Keep-alive session so repeated calls reuse the same connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
         self.use_cache = use_cache
         self.cache = APICache(cache_duration=cache_duration) if use_cache else None
+        # Skip network calls while the shared health check reports the API down
+        self.fail_fast = True
+        # Optional callable run before every network request (not cache hits),
+        # e.g. to hold background jobs to a share of the rate limit
+        self.throttle = None
 
     def _get_cache_key(self, endpoint: str, params: Optional[Dict] = None) -> str:
         """Generate a cache key for the request"""
@@ -231,16 +241,23 @@ class CookieAPI:
             if cached_data is not None:
                 return cached_data
 
+        if self.fail_fast and is_upstream_down('cookie'):
+            raise CookieAPIError("Cookie API is marked down by the latest health check")
+
+        if self.throttle is not None:
+            self.throttle()
+
         url = f'{self.base_url}{endpoint}'
         
         try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=self.headers,
-                params=params,
-                timeout=30
-            )
+            with span(f'{method} {endpoint}', kind='http', upstream='cookie') as http_span:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    timeout=30
+                )
+                http_span.set_attribute('status_code', response.status_code)
             
             # Store rate limit information
             self.rate_limit = {
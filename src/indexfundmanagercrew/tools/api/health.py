@@ -0,0 +1,212 @@
+from typing import Callable, Dict, Any, Optional
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked (still atomic) cache writes
+    fcntl = None
+
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_DOWN = "down"
+
+def default_cache_file() -> Path:
+    workspace_root = Path(__file__).parent.parent.parent
+    return workspace_root / ".cache" / "health" / "upstreams.json"
+
+@dataclass
+class ProbeResult:
+    name: str
+    status: str
+    latency_ms: float
+    detail: str
+    checked_at: float = field(default_factory=time.time)
+
+@dataclass
+class HealthReport:
+    probes: Dict[str, ProbeResult]
+    from_cache: Dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def status(self) -> str:
+        """Overall status: ok if every upstream is ok, down if every upstream is down."""
+        statuses = {p.status for p in self.probes.values()}
+        if statuses <= {STATUS_OK}:
+            return STATUS_OK
+        if statuses == {STATUS_DOWN}:
+            return STATUS_DOWN
+        return STATUS_DEGRADED
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'checked_at': datetime.now().isoformat(),
+            'upstreams': {
+                name: {**asdict(probe), 'from_cache': self.from_cache.get(name, False)}
+                for name, probe in self.probes.items()
+            }
+        }
+
+class HealthChecker:
+    """
+    Concurrent pre-flight checks for the upstream APIs.
+
+    Probe results are cached in a JSON file shared by every process on the
+    host, so several kickoffs inside the TTL cost no requests. Writes are
+    atomic (temp file + rename) and serialized with a file lock where the
+    platform supports it.
+    """
+
+    def __init__(
+        self,
+        probes: Optional[Dict[str, Callable[[], str]]] = None,
+        ttl: timedelta = timedelta(minutes=15),
+        timeout: float = 10.0,
+        cache_file: Optional[str] = None
+    ):
+        """
+        Initialize the health checker.
+
+        Args:
+            probes: Upstream name -> callable that returns a detail string, or raises when unhealthy.
+                A detail string starting with 'degraded:' marks the upstream as degraded.
+            ttl: How long probe results are reused
+            timeout: Seconds to wait for all probes; slower upstreams are reported down
+            cache_file: Shared cache location
+        """
+        self.probes = probes if probes is not None else default_probes()
+        self.ttl = ttl
+        self.timeout = timeout
+        self.cache_file = Path(cache_file) if cache_file else default_cache_file()
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.cache_file.with_suffix('.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_cache(self) -> Dict[str, ProbeResult]:
+        try:
+            with self.cache_file.open('r') as f:
+                data = json.load(f)
+            return {name: ProbeResult(**probe) for name, probe in data.items()}
+        except (OSError, json.JSONDecodeError, TypeError):
+            return {}
+
+    def _write_cache(self, results: Dict[str, ProbeResult]) -> None:
+        tmp = self.cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        with tmp.open('w') as f:
+            json.dump({name: asdict(probe) for name, probe in results.items()}, f)
+        os.replace(tmp, self.cache_file)
+
+    @staticmethod
+    def _probe(name: str, probe: Callable[[], str]) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            detail = probe()
+            status = STATUS_DEGRADED if detail.startswith('degraded:') else STATUS_OK
+        except Exception as e:
+            detail, status = str(e), STATUS_DOWN
+        return ProbeResult(name=name, status=status, latency_ms=(time.perf_counter() - start) * 1000, detail=detail)
+
+    def check(self, force: bool = False) -> HealthReport:
+        """
+        Run every probe whose cached result is missing or older than the TTL, concurrently.
+
+        Args:
+            force: Ignore cached results
+
+        Returns:
+            HealthReport covering every configured upstream
+        """
+        with self._locked():
+            cached = self._read_cache()
+            now = time.time()
+            fresh = {
+                name: result for name, result in cached.items()
+                if name in self.probes and not force and now - result.checked_at < self.ttl.total_seconds()
+            }
+            stale = [name for name in self.probes if name not in fresh]
+
+            results = dict(fresh)
+            if stale:
+                executor = ThreadPoolExecutor(max_workers=len(stale), thread_name_prefix='health')
+                futures = {executor.submit(self._probe, name, self.probes[name]): name for name in stale}
+                done, not_done = wait(futures, timeout=self.timeout)
+                for future in done:
+                    result = future.result()
+                    results[result.name] = result
+                for future in not_done:
+                    name = futures[future]
+                    results[name] = ProbeResult(name=name, status=STATUS_DOWN, latency_ms=self.timeout * 1000,
+                                                detail=f"timed out after {self.timeout:.0f}s")
+                # Do not block on probes that timed out
+                executor.shutdown(wait=False)
+                self._write_cache({**cached, **results})
+
+        return HealthReport(probes=results, from_cache={name: name in fresh for name in results})
+
+def is_upstream_down(name: str, ttl: timedelta = timedelta(minutes=15), cache_file: Optional[str] = None) -> bool:
+    """
+    Whether the latest shared health check flagged an upstream as down.
+
+    Tools call this before network requests to fail fast instead of waiting
+    for a timeout. Stale results (older than ttl) are ignored.
+    """
+    path = Path(cache_file) if cache_file else default_cache_file()
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    key = (str(path), stat.st_mtime_ns)
+    if _status_cache.get('key') != key:
+        try:
+            with path.open('r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        _status_cache['key'] = key
+        _status_cache['data'] = data
+    probe = _status_cache['data'].get(name)
+    if not probe:
+        return False
+    return probe.get('status') == STATUS_DOWN and time.time() - probe.get('checked_at', 0) < ttl.total_seconds()
+
+_status_cache: Dict[str, Any] = {}
+
+def default_probes() -> Dict[str, Callable[[], str]]:
+    """Cookie API and DeFi Llama probes used before every kickoff."""
+    def cookie() -> str:
+        from .Cookie import create_production_instance
+        api = create_production_instance()
+        api.use_cache = False
+        api.fail_fast = False
+        response = api.get_agents_paged(interval="_3Days", page=1, page_size=1)
+        if not response or 'data' not in response:
+            return "degraded: unexpected response format"
+        return f"agents listing working, {response.get('totalCount', 'unknown')} agents available"
+
+    def defillama() -> str:
+        from defillama import DefiLlama
+        coin = "ethereum:0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+        response = DefiLlama().get_token_current_prices(coins=coin, searchWidth="4h")
+        price = (response or {}).get('coins', {}).get(coin, {}).get('price')
+        if price is None:
+            return "degraded: no ETH price in response"
+        return f"ETH price ${price:,.2f}"
+
+    return {'cookie': cookie, 'defillama': defillama}
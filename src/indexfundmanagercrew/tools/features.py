@@ -0,0 +1,237 @@
+from typing import Dict, List, Optional, Any
+from datetime import date, datetime
+from pathlib import Path
+import logging
+import os
+
+import numpy as np
+
+from .snapshots import Snapshot, SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+# Days of daily returns the volatility is taken over
+VOLATILITY_WINDOW = 7
+# Smoothing of the mindshare baseline momentum is measured against (EMA span in days)
+MINDSHARE_SPAN = 7
+
+# Derived features, in the order they are reported
+FEATURES = (
+    'mindshare_momentum', 'volume_liquidity', 'volatility_7d', 'holder_growth', 'price_return'
+)
+# Raw values carried alongside the features, and the state the next day's slice builds on
+CARRIED = ('price', 'mindshare', 'mindshare_ema', 'volume_24h', 'liquidity', 'holders')
+
+def default_feature_dir() -> Path:
+    workspace_root = Path(__file__).parent.parent
+    return workspace_root / ".cache" / "features"
+
+class FeatureSlice:
+    """Features of every token on one date, rows sorted by key for binary-search lookups."""
+
+    def __init__(self, day: str, keys: np.ndarray, names: np.ndarray, columns: Dict[str, np.ndarray],
+                 returns: np.ndarray):
+        self.day = day
+        self.keys = keys
+        self.names = names
+        self.columns = columns
+        self.returns = returns  # (tokens, VOLATILITY_WINDOW) trailing daily log returns, newest last
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def index(self, keys: np.ndarray) -> np.ndarray:
+        """Row of each key, or -1 for keys not in this slice."""
+        if not len(self.keys):
+            return np.full(len(keys), -1)
+        rows = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[rows] == keys, rows, -1)
+
+    def row(self, i: int) -> Dict[str, Any]:
+        values = {name: self.columns[name][i] for name in FEATURES + CARRIED}
+        return {
+            'date': self.day, 'key': str(self.keys[i]), 'name': str(self.names[i]),
+            **{name: None if np.isnan(v) else round(float(v), 6) for name, v in values.items()}
+        }
+
+def _carry(previous: Optional[FeatureSlice], keys: np.ndarray, name: str) -> np.ndarray:
+    """Previous day's column aligned to `keys`, NaN for tokens that are new today."""
+    out = np.full(len(keys), np.nan)
+    if previous is None:
+        return out
+    rows = previous.index(keys)
+    present = rows >= 0
+    out[present] = previous.columns[name][rows[present]]
+    return out
+
+def compute_slice(snapshot: Snapshot, previous: Optional[FeatureSlice], day: Optional[str] = None) -> FeatureSlice:
+    """
+    Features for one day from that day's snapshot and the previous day's slice.
+
+    Only the new slice is computed; everything it needs from earlier days
+    (yesterday's values, the mindshare EMA, trailing returns) is carried in
+    the previous slice.
+    """
+    day = day or snapshot.taken_at[:10]
+    order = np.argsort(snapshot.keys, kind='stable')
+    keys, names = snapshot.keys[order], snapshot.names[order]
+    m = {name: snapshot.metrics[name][order] for name in ('price', 'mindshare', 'volume_24h', 'liquidity', 'holders')}
+
+    prev_price, prev_holders = _carry(previous, keys, 'price'), _carry(previous, keys, 'holders')
+    prev_ema = _carry(previous, keys, 'mindshare_ema')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_return = np.log(m['price'] / prev_price)
+        price_return[~np.isfinite(price_return)] = np.nan
+        holder_growth = m['holders'] / prev_holders - 1
+        holder_growth[~np.isfinite(holder_growth)] = np.nan
+        volume_liquidity = m['volume_24h'] / m['liquidity']
+        volume_liquidity[~np.isfinite(volume_liquidity)] = np.nan
+
+        alpha = 2 / (MINDSHARE_SPAN + 1)
+        ema = np.where(np.isnan(prev_ema), m['mindshare'], alpha * m['mindshare'] + (1 - alpha) * prev_ema)
+        ema = np.where(np.isnan(m['mindshare']), prev_ema, ema)
+        # Today's mindshare against the baseline before today
+        momentum = m['mindshare'] / prev_ema - 1
+        momentum[~np.isfinite(momentum)] = np.nan
+
+    returns = np.full((len(keys), VOLATILITY_WINDOW), np.nan)
+    if previous is not None:
+        rows = previous.index(keys)
+        present = rows >= 0
+        returns[present, :-1] = previous.returns[rows[present], 1:]
+    returns[:, -1] = price_return
+    # Sample standard deviation over the observed returns, without nanstd's all-NaN warnings
+    observed = ~np.isnan(returns)
+    count = observed.sum(axis=1)
+    mean = np.where(observed, returns, 0).sum(axis=1) / np.maximum(count, 1)
+    variance = np.where(observed, (returns - mean[:, None]) ** 2, 0).sum(axis=1) / np.maximum(count - 1, 1)
+    volatility = np.where(count >= 3, np.sqrt(variance), np.nan)
+
+    columns = {
+        'mindshare_momentum': momentum,
+        'volume_liquidity': volume_liquidity,
+        'volatility_7d': volatility,
+        'holder_growth': holder_growth,
+        'price_return': price_return,
+        'mindshare_ema': ema,
+        **m
+    }
+    return FeatureSlice(day, keys, names, columns, returns)
+
+class FeatureStore:
+    """
+    Per-token features keyed by (token, date), one compressed slice per date.
+
+    update() adds or replaces only the slice for the latest snapshot's date,
+    building on the slice of the day before, so refreshing after each
+    gathering run costs one vectorized pass over the current universe.
+    """
+
+    def __init__(self, root: Optional[str] = None, snapshots: Optional[SnapshotStore] = None):
+        self.root = Path(root) if root else default_feature_dir()
+        self.snapshots = snapshots or SnapshotStore()
+        self._cache: Dict[str, tuple] = {}
+
+    def days(self) -> List[str]:
+        """Dates with a feature slice, oldest first."""
+        if not self.root.exists():
+            return []
+        return sorted(path.stem for path in self.root.glob('*.npz'))
+
+    def load(self, day: str) -> Optional[FeatureSlice]:
+        path = self.root / f"{day}.npz"
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        cached = self._cache.get(day)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with np.load(path, allow_pickle=False) as data:
+            feature_slice = FeatureSlice(
+                day, data['keys'], data['names'],
+                {name: data[name] for name in FEATURES + CARRIED}, data['returns']
+            )
+        self._cache[day] = (mtime, feature_slice)
+        return feature_slice
+
+    def save(self, feature_slice: FeatureSlice) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{feature_slice.day}.npz"
+        tmp = self.root / f"{feature_slice.day}.{os.getpid()}.tmp"
+        with tmp.open('wb') as f:
+            np.savez_compressed(f, keys=feature_slice.keys, names=feature_slice.names,
+                                returns=feature_slice.returns, **feature_slice.columns)
+        os.replace(tmp, path)
+        return path
+
+    def update(self, snapshot: Optional[Snapshot] = None) -> Optional[FeatureSlice]:
+        """
+        Compute and store the slice for a snapshot's date (the latest snapshot by default).
+
+        A slice is rebuilt from scratch when no earlier slice exists, so the
+        first days after deployment have no returns or growth yet.
+        """
+        snapshot = snapshot or self.snapshots.latest()
+        if snapshot is None:
+            return None
+        day = snapshot.taken_at[:10]
+        earlier = [d for d in self.days() if d < day]
+        previous = self.load(earlier[-1]) if earlier else None
+        feature_slice = compute_slice(snapshot, previous, day)
+        self.save(feature_slice)
+        logger.info(f"Feature slice {day}: {len(feature_slice)} tokens, built on {previous.day if previous else 'no earlier slice'}")
+        return feature_slice
+
+    def backfill(self) -> int:
+        """Rebuild every slice from the stored snapshots (the last snapshot of each day), oldest first."""
+        by_day = {}
+        for name in self.snapshots.names():
+            by_day[datetime.strptime(name, '%Y%m%d-%H%M%S').date().isoformat()] = name
+        for day in sorted(by_day):
+            self.update(self.snapshots.load(by_day[day]))
+        return len(by_day)
+
+    def _match(self, feature_slice: FeatureSlice, token: str) -> np.ndarray:
+        query = token.lower().lstrip('$')
+        keys = np.char.lower(feature_slice.keys.astype(str))
+        names = np.char.lower(feature_slice.names.astype(str))
+        exact = np.flatnonzero((names == query) | (np.char.find(keys, ':' + query) >= 0))
+        if len(exact):
+            return exact
+        return np.flatnonzero(np.char.find(names, query) >= 0)
+
+    def point(self, token: str, day: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Features of the tokens matching `token` (name or address) on a date, the latest by default."""
+        days = self.days()
+        if not days:
+            return []
+        day = day or days[-1]
+        feature_slice = self.load(day)
+        if feature_slice is None:
+            return []
+        return [feature_slice.row(i) for i in self._match(feature_slice, token)]
+
+    def range(self, token: str, start: str, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Daily features of the tokens matching `token` from start to end (inclusive), oldest first."""
+        end = end or date.today().isoformat()
+        rows = []
+        for day in self.days():
+            if start <= day <= end:
+                feature_slice = self.load(day)
+                rows.extend(feature_slice.row(i) for i in self._match(feature_slice, token))
+        return rows
+
+    def top(self, feature: str, day: Optional[str] = None, limit: int = 20, ascending: bool = False) -> List[Dict[str, Any]]:
+        """Tokens ranked by a feature on a date, tokens without a value left out."""
+        if feature not in FEATURES + CARRIED:
+            raise ValueError(f"Unknown feature '{feature}', expected one of {', '.join(FEATURES + CARRIED)}")
+        days = self.days()
+        feature_slice = self.load(day or days[-1]) if days else None
+        if feature_slice is None:
+            return []
+        values = feature_slice.columns[feature]
+        rows = np.flatnonzero(~np.isnan(values))
+        rows = rows[np.argsort(values[rows] if ascending else -values[rows], kind='stable')]
+        return [feature_slice.row(i) for i in rows[:limit]]
@@ -0,0 +1,284 @@
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+import numpy as np
+
+METHODS = ('mean_variance', 'min_variance', 'risk_parity', 'market_cap')
+# Variance at or below which a token is treated as having no price history
+ZERO_VARIANCE = 1e-18
+
+class OptimizationError(Exception):
+    """Raised when the constraint set cannot be satisfied"""
+    pass
+
+@dataclass
+class PortfolioConstraints:
+    max_weight: float = 0.25
+    min_weight: float = 0.0
+    min_liquidity: float = 0.0
+    chains: List[str] = field(default_factory=list)  # e.g. ['base', 'solana']; empty means any chain
+    # For market-cap weighting: a weight may not exceed this multiple of the token's
+    # liquidity expressed as a fraction of the fund (only applied when fund_size is set)
+    liquidity_multiple: float = 0.1
+    fund_size: Optional[float] = None
+
+    def eligible(self, liquidity: np.ndarray, chains: Optional[List[str]] = None) -> np.ndarray:
+        """Boolean mask of tokens passing the liquidity and chain filters."""
+        mask = np.asarray(liquidity, dtype=np.float64) >= self.min_liquidity
+        if self.chains and chains is not None:
+            wanted = {c.lower() for c in self.chains}
+            mask &= np.array([str(c).lower() in wanted for c in chains])
+        return mask
+
+@dataclass
+class OptimizationResult:
+    method: str
+    weights: np.ndarray
+    expected_return: Optional[float] = None
+    volatility: Optional[float] = None
+    risk_contributions: Optional[np.ndarray] = None
+    iterations: int = 0
+
+    def as_dict(self, symbols: List[str]) -> Dict[str, Any]:
+        """Serializable summary keyed by token symbol."""
+        result = {
+            'method': self.method,
+            'weights': {s: float(w) for s, w in zip(symbols, self.weights) if w > 0},
+            'iterations': self.iterations
+        }
+        if self.expected_return is not None:
+            result['expected_return'] = self.expected_return
+        if self.volatility is not None:
+            result['volatility'] = self.volatility
+        if self.risk_contributions is not None:
+            result['risk_contributions'] = {
+                s: float(r) for s, r, w in zip(symbols, self.risk_contributions, self.weights) if w > 0
+            }
+        return result
+
+def sample_covariance(returns: np.ndarray, shrinkage: float = 0.1) -> np.ndarray:
+    """
+    Covariance of a (T, N) return matrix, shrunk towards its diagonal.
+
+    Args:
+        returns: Period returns, one column per token
+        shrinkage: Weight of the diagonal target (0 = sample covariance)
+
+    Returns:
+        (N, N) covariance matrix
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    centered = returns - returns.mean(axis=0)
+    cov = centered.T @ centered / max(returns.shape[0] - 1, 1)
+    return (1 - shrinkage) * cov + shrinkage * np.diag(np.diag(cov))
+
+def project_capped_simplex(v: np.ndarray, lower: np.ndarray, upper: np.ndarray, iterations: int = 64) -> np.ndarray:
+    """
+    Euclidean projection onto {w : sum(w) = 1, lower <= w <= upper}.
+
+    Bisects on the shift tau so that sum(clip(v - tau, lower, upper)) = 1.
+    """
+    lo = np.min(v - upper) - 1.0
+    hi = np.max(v - lower) + 1.0
+    for _ in range(iterations):
+        tau = 0.5 * (lo + hi)
+        if np.clip(v - tau, lower, upper).sum() > 1.0:
+            lo = tau
+        else:
+            hi = tau
+    return np.clip(v - 0.5 * (lo + hi), lower, upper)
+
+def _bounds(constraints: PortfolioConstraints, eligible: np.ndarray):
+    """Per-token weight bounds; ineligible tokens are pinned to zero."""
+    upper = np.where(eligible, constraints.max_weight, 0.0)
+    lower = np.where(eligible, constraints.min_weight, 0.0)
+    if upper.sum() < 1.0 - 1e-9:
+        raise OptimizationError(
+            f"Infeasible constraints: {int(eligible.sum())} eligible tokens with max_weight "
+            f"{constraints.max_weight} cannot sum to 1"
+        )
+    if lower.sum() > 1.0 + 1e-9:
+        raise OptimizationError("Infeasible constraints: min_weight over eligible tokens exceeds 1")
+    return lower, upper
+
+def mean_variance(
+    mu: np.ndarray,
+    cov: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    risk_aversion: float = 1.0,
+    max_iterations: int = 2000,
+    tolerance: float = 1e-10
+) -> OptimizationResult:
+    """
+    Maximize mu'w - (risk_aversion / 2) w'Σw over the capped simplex.
+
+    Uses accelerated projected gradient descent (FISTA) with a 1/L step.
+    """
+    n = cov.shape[0]
+    lipschitz = max(risk_aversion * np.linalg.eigvalsh(cov)[-1], 1e-12)
+    step = 1.0 / lipschitz
+    w = project_capped_simplex(np.full(n, 1.0 / n), lower, upper)
+    y, t = w.copy(), 1.0
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        gradient = risk_aversion * (cov @ y) - mu
+        w_next = project_capped_simplex(y - step * gradient, lower, upper)
+        t_next = 0.5 * (1 + np.sqrt(1 + 4 * t * t))
+        y = w_next + ((t - 1) / t_next) * (w_next - w)
+        converged = np.sum((w_next - w) ** 2) < tolerance
+        w, t = w_next, t_next
+        if converged:
+            break
+    return OptimizationResult(method='mean_variance', weights=w, iterations=iteration)
+
+def risk_parity(
+    cov: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    budgets: Optional[np.ndarray] = None,
+    max_iterations: int = 500,
+    tolerance: float = 1e-12
+) -> OptimizationResult:
+    """
+    Equal (or budgeted) risk contribution weights.
+
+    Solves the convex formulation min ½ y'Σy - Σ b_i log y_i by cyclical
+    coordinate descent (closed-form per coordinate), normalizes, then projects
+    onto the weight bounds. Tokens with a zero upper bound get no budget, nor
+    do tokens with zero variance (no price history), which have no risk to
+    balance; they only receive weight if their lower bound requires it.
+    """
+    diag = np.diag(cov)
+    active = (upper > 0) & (diag > ZERO_VARIANCE)
+    if not active.any():
+        raise OptimizationError("Risk parity needs at least one eligible token with non-zero variance")
+    if budgets is None:
+        budgets = active / active.sum()
+    budgets = np.where(active, budgets, 0.0)
+    y = np.where(active, 1.0 / np.sqrt(np.where(active, diag, 1.0)), 0.0)
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        y_prev = y.copy()
+        for i in np.flatnonzero(active):
+            off_diag = cov[i] @ y - diag[i] * y[i]
+            y[i] = (-off_diag + np.sqrt(off_diag ** 2 + 4 * diag[i] * budgets[i])) / (2 * diag[i])
+        if np.sum((y - y_prev) ** 2) < tolerance * np.sum(y ** 2):
+            break
+    if not np.isfinite(y).all() or y.sum() <= 0:
+        raise OptimizationError("Risk parity did not converge to finite weights")
+    w = project_capped_simplex(y / y.sum(), lower, upper)
+    if not np.isfinite(w).all():
+        raise OptimizationError("Risk parity did not converge to finite weights")
+    return OptimizationResult(method='risk_parity', weights=w, iterations=iteration)
+
+def cap_and_redistribute(weights: np.ndarray, caps: np.ndarray, max_iterations: int = 100) -> np.ndarray:
+    """
+    Cap weights and hand the excess to uncapped tokens pro rata, until nothing exceeds its cap.
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    w = w / w.sum()
+    for _ in range(max_iterations):
+        over = w > caps + 1e-15
+        if not over.any():
+            break
+        excess = np.sum(w[over] - caps[over])
+        w = np.where(over, caps, w)
+        free = (~over) & (w < caps)
+        if not free.any() or w[free].sum() <= 0:
+            raise OptimizationError("Infeasible constraints: caps leave weight that cannot be redistributed")
+        w[free] += excess * w[free] / w[free].sum()
+    return w
+
+def market_cap_weights(
+    market_caps: np.ndarray,
+    liquidity: np.ndarray,
+    eligible: np.ndarray,
+    constraints: PortfolioConstraints
+) -> OptimizationResult:
+    """Market-cap weights capped by max_weight and, if a fund size is set, by token liquidity."""
+    caps = np.where(eligible, constraints.max_weight, 0.0)
+    if constraints.fund_size:
+        caps = np.minimum(caps, constraints.liquidity_multiple * np.asarray(liquidity) / constraints.fund_size)
+    if caps.sum() < 1.0 - 1e-9:
+        raise OptimizationError("Infeasible constraints: liquidity caps cannot hold the whole fund")
+    raw = np.where(eligible, np.maximum(np.asarray(market_caps, dtype=np.float64), 0.0), 0.0)
+    if raw.sum() <= 0:
+        raise OptimizationError("No eligible token has a positive market cap")
+    w = cap_and_redistribute(raw, caps)
+    return OptimizationResult(method='market_cap', weights=w)
+
+def optimize_weights(
+    method: str,
+    constraints: PortfolioConstraints,
+    liquidity: np.ndarray,
+    chains: Optional[List[str]] = None,
+    returns: Optional[np.ndarray] = None,
+    cov: Optional[np.ndarray] = None,
+    mu: Optional[np.ndarray] = None,
+    market_caps: Optional[np.ndarray] = None,
+    risk_aversion: float = 1.0
+) -> OptimizationResult:
+    """
+    Compute index weights that sum to 1 under the given constraints.
+
+    Args:
+        method: One of 'mean_variance', 'min_variance', 'risk_parity', 'market_cap'
+        constraints: Weight bounds and eligibility filters
+        liquidity: Liquidity per token in USD, shape (N,)
+        chains: Chain name per token, used by the chain filter
+        returns: Optional (T, N) period returns used to estimate mu and cov
+        cov: Optional (N, N) covariance (overrides the one estimated from returns)
+        mu: Optional expected returns (overrides the mean of returns)
+        market_caps: Market caps, required for 'market_cap'
+        risk_aversion: Risk aversion for 'mean_variance'
+
+    Returns:
+        OptimizationResult with weights in the input token order
+    """
+    if method not in METHODS:
+        raise OptimizationError(f"Unknown method '{method}', expected one of {', '.join(METHODS)}")
+
+    liquidity = np.asarray(liquidity, dtype=np.float64)
+    eligible = constraints.eligible(liquidity, chains)
+    if not eligible.any():
+        raise OptimizationError("No token passes the liquidity and chain filters")
+
+    if method == 'market_cap':
+        if market_caps is None:
+            raise OptimizationError("market_caps are required for market-cap weighting")
+        result = market_cap_weights(market_caps, liquidity, eligible, constraints)
+    else:
+        if cov is None:
+            if returns is None:
+                raise OptimizationError("Either returns or cov is required for this method")
+            cov = sample_covariance(returns)
+        cov = np.asarray(cov, dtype=np.float64)
+        if mu is None:
+            mu = np.asarray(returns).mean(axis=0) if returns is not None else np.zeros(cov.shape[0])
+        mu = np.asarray(mu, dtype=np.float64)
+        # Missing price history becomes zero returns; such a token would look riskless
+        # and be pushed to max_weight, so it is left out of covariance-based methods
+        priced = np.diag(cov) > ZERO_VARIANCE
+        if not (eligible & priced).any():
+            raise OptimizationError("No eligible token has price history (all have zero variance)")
+        eligible = eligible & priced
+        lower, upper = _bounds(constraints, eligible)
+
+        if method == 'mean_variance':
+            result = mean_variance(mu, cov, lower, upper, risk_aversion)
+        elif method == 'min_variance':
+            result = mean_variance(np.zeros_like(mu), cov, lower, upper)
+            result.method = 'min_variance'
+        else:
+            result = risk_parity(cov, lower, upper)
+
+        w = result.weights
+        variance = float(w @ cov @ w)
+        result.expected_return = float(mu @ w)
+        result.volatility = float(np.sqrt(max(variance, 0.0)))
+        result.risk_contributions = w * (cov @ w) / variance if variance > 0 else np.zeros_like(w)
+
+    # Clean numerical dust so the weights sum to exactly 1
+    w = np.where(result.weights < 1e-8, 0.0, result.weights)
+    result.weights = w / w.sum()
+    return result
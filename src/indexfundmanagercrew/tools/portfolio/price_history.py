@@ -0,0 +1,70 @@
+from typing import List, Optional, Tuple
+from datetime import datetime
+from defillama import DefiLlama
+import numpy as np
+
+PERIOD_SECONDS = {'1h': 3600, '4h': 14400, '1d': 86400, '1w': 604800}
+
+def fetch_price_matrix(
+    coins: List[str],
+    days: int = 90,
+    period: str = '1d',
+    llama: Optional[DefiLlama] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fetch aligned price history for several coins in one DeFi Llama chart request.
+
+    Args:
+        coins: DeFi Llama coin identifiers (e.g. 'base:0x...', 'coingecko:ethereum')
+        days: Number of days of history
+        period: Sampling period ('1h', '4h', '1d' or '1w')
+        llama: Optional DefiLlama client to reuse
+
+    Returns:
+        Tuple of (timestamps, prices) where prices has shape (T, N) in the order of coins.
+        Gaps are forward-filled; leading gaps are back-filled from the first known price.
+    """
+    if llama is None:
+        from ..registry import shared_llama
+        llama = shared_llama()
+    step = PERIOD_SECONDS[period]
+    end = int(datetime.now().timestamp()) // step * step
+    start = end - days * 86400
+    response = llama.get_token_prices_at_intervals(
+        coins=",".join(coins),
+        start=start,
+        end=end,
+        period=period
+    )
+    if not response or 'coins' not in response:
+        raise ValueError("Invalid response format from DeFi Llama")
+
+    timestamps = np.arange(start, end + 1, step, dtype=np.int64)
+    prices = np.full((timestamps.size, len(coins)), np.nan)
+    for j, coin in enumerate(coins):
+        points = response['coins'].get(coin, {}).get('prices', [])
+        if not points:
+            continue
+        ts = np.array([p['timestamp'] for p in points], dtype=np.int64)
+        px = np.array([p['price'] for p in points], dtype=np.float64)
+        idx = np.clip(np.rint((ts - start) / step).astype(np.int64), 0, timestamps.size - 1)
+        prices[idx, j] = px
+
+    return timestamps, fill_gaps(prices)
+
+def fill_gaps(prices: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs column-wise, then back-fill leading NaNs."""
+    prices = np.array(prices, dtype=np.float64)
+    rows = np.arange(prices.shape[0])[:, None]
+    valid = ~np.isnan(prices)
+    last_valid = np.maximum.accumulate(np.where(valid, rows, 0), axis=0)
+    filled = prices[last_valid, np.arange(prices.shape[1])]
+    first_valid = np.where(valid.any(axis=0), valid.argmax(axis=0), 0)
+    leading = rows < first_valid[None, :]
+    return np.where(leading, prices[first_valid, np.arange(prices.shape[1])], filled)
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Period log returns of a (T, N) price matrix, shape (T - 1, N)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(prices), axis=0)
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
@@ -0,0 +1,265 @@
+from typing import Dict, List, Optional, Any, Iterable, TYPE_CHECKING
+from dataclasses import dataclass, field, asdict, fields
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import logging
+import os
+
+if TYPE_CHECKING:
+    # Clients are only needed when the stage runs, not to read a dataset
+    from defillama import DefiLlama
+    from .api.Cookie import CookieAPI
+
+logger = logging.getLogger(__name__)
+
+# Cookie chain IDs -> DeFi Llama chain prefixes
+CHAIN_NAMES = {8453: 'base', -2: 'solana'}
+
+def default_dataset_file() -> Path:
+    workspace_root = Path(__file__).parent.parent
+    return workspace_root / ".cache" / "prefetch" / "token_dataset.json"
+
+@dataclass
+class TokenRecord:
+    name: str
+    chain: str
+    address: str
+    twitter: List[str] = field(default_factory=list)
+    price: Optional[float] = None
+    price_confidence: Optional[float] = None
+    market_cap: Optional[float] = None
+    liquidity: Optional[float] = None
+    volume_24h: Optional[float] = None
+    holders: Optional[int] = None
+    mindshare: Optional[float] = None
+    smart_followers: Optional[int] = None
+    avg_engagements: Optional[float] = None
+    tvl: Optional[float] = None
+    tweet_count: Optional[int] = None
+
+    @property
+    def coin(self) -> str:
+        """DeFi Llama coin identifier."""
+        return f"{self.chain}:{self.address}"
+
+@dataclass
+class TokenDataset:
+    generated_at: str
+    tokens: List[TokenRecord] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def save(self, path: Optional[str] = None) -> Path:
+        """Write the dataset atomically so readers never see a partial file."""
+        path = Path(path) if path else default_dataset_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        with tmp.open('w') as f:
+            json.dump({
+                'generated_at': self.generated_at,
+                'tokens': [asdict(token) for token in self.tokens],
+                'errors': self.errors
+            }, f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional['TokenDataset']:
+        path = Path(path) if path else default_dataset_file()
+        try:
+            with path.open('r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        known = {f.name for f in fields(TokenRecord)}
+        tokens = [TokenRecord(**{k: v for k, v in token.items() if k in known}) for token in data.get('tokens', [])]
+        return cls(generated_at=data.get('generated_at', ''), tokens=tokens, errors=data.get('errors', {}))
+
+    def find(self, query: str) -> List[TokenRecord]:
+        """Tokens whose name, address or Twitter handle contains the query (case-insensitive)."""
+        query = query.lower().lstrip('@')
+        return [
+            token for token in self.tokens
+            if query in token.name.lower() or query in token.address.lower()
+            or any(query in handle.lower() for handle in token.twitter)
+        ]
+
+    def top(self, metric: str = 'market_cap', limit: int = 25, chain: Optional[str] = None) -> List[TokenRecord]:
+        """Tokens ranked by a numeric field, missing values last."""
+        tokens = [t for t in self.tokens if chain is None or t.chain == chain]
+        return sorted(tokens, key=lambda t: (getattr(t, metric) is None, -(getattr(t, metric) or 0)))[:limit]
+
+    def summary(self, limit: int = 40) -> str:
+        """Compact text table of the top tokens by market cap, for prompt injection."""
+        def fmt(value, spec=',.0f'):
+            return '-' if value is None else format(value, spec)
+
+        lines = [
+            f"Pre-fetched token dataset ({self.generated_at}, {len(self.tokens)} tokens, top {min(limit, len(self.tokens))} by market cap):",
+            "name | chain | address | price | mcap | liquidity | vol24h | holders | mindshare | tvl | tweets"
+        ]
+        for t in self.top('market_cap', limit):
+            lines.append(" | ".join([
+                t.name, t.chain, t.address, fmt(t.price, '.6g'), fmt(t.market_cap), fmt(t.liquidity),
+                fmt(t.volume_24h), fmt(t.holders), fmt(t.mindshare, '.2f'), fmt(t.tvl), fmt(t.tweet_count)
+            ]))
+        if self.errors:
+            lines.append("Incomplete sources: " + "; ".join(f"{k}: {v}" for k, v in self.errors.items()))
+        return "\n".join(lines)
+
+def crawl_universe(api: 'CookieAPI', chains: Iterable[int] = (8453, -2), interval: str = '_7Days',
+                   max_workers: int = 8) -> List[TokenRecord]:
+    """
+    Fetch every Cookie agent page concurrently and keep one record per contract on the given chains.
+
+    Args:
+        api: Cookie API client
+        chains: Cookie chain IDs to keep (8453 for Base, -2 for Solana)
+        interval: Metrics interval
+        max_workers: Concurrent page requests
+
+    Returns:
+        TokenRecords with the Cookie metrics filled in
+    """
+    from .api.Cookie import CookieAPIError
+    page_size = 25  # Maximum allowed by API
+    first = api.get_agents_paged(interval=interval, page=1, page_size=page_size)
+    if not first or 'data' not in first:
+        raise CookieAPIError("Unexpected response format from agents listing")
+
+    agents = list(first['data'])
+    pages = range(2, int(first.get('totalPages', 1)) + 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for response in pool.map(lambda page: api.get_agents_paged(interval=interval, page=page, page_size=page_size), pages):
+            agents.extend((response or {}).get('data', []))
+
+    chains = set(chains)
+    records, seen = [], set()
+    for agent in agents:
+        for contract in agent.get('contracts', []):
+            if contract.get('chain') not in chains or not contract.get('contractAddress'):
+                continue
+            record = TokenRecord(
+                name=agent.get('agentName', ''),
+                chain=CHAIN_NAMES[contract['chain']],
+                address=contract['contractAddress'],
+                twitter=list(agent.get('twitterUsernames') or []),
+                price=agent.get('price'),
+                market_cap=agent.get('marketCap'),
+                liquidity=agent.get('liquidity'),
+                volume_24h=agent.get('volume24Hours'),
+                holders=agent.get('holdersCount'),
+                mindshare=agent.get('mindshare'),
+                smart_followers=agent.get('smartFollowersCount'),
+                avg_engagements=agent.get('averageEngagementsCount')
+            )
+            if record.coin.lower() not in seen:
+                seen.add(record.coin.lower())
+                records.append(record)
+    return records
+
+def batch_prices(llama: 'DefiLlama', records: List[TokenRecord], batch_size: int = 100, max_workers: int = 4) -> None:
+    """Fill DeFi Llama prices in place, one comma-joined request per batch of coins."""
+    batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+
+    def fetch(batch: List[TokenRecord]) -> Dict[str, Any]:
+        response = llama.get_token_current_prices(coins=",".join(t.coin for t in batch), searchWidth="4h")
+        return (response or {}).get('coins', {})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch, coins in zip(batches, pool.map(fetch, batches)):
+            # DeFi Llama echoes the identifiers back, but EVM addresses may come back lowercased
+            by_coin = {coin.lower(): data for coin, data in coins.items()}
+            for token in batch:
+                data = by_coin.get(token.coin.lower())
+                if data and data.get('price') is not None:
+                    token.price = data['price']
+                    token.price_confidence = data.get('confidence')
+
+def fill_tvl(llama: 'DefiLlama', records: List[TokenRecord]) -> None:
+    """Fill protocol TVL in place for tokens that back a DeFi Llama-listed protocol (one request)."""
+    by_address = {}
+    for protocol in llama.get_all_protocols() or []:
+        address = protocol.get('address')
+        if address and protocol.get('tvl') is not None:
+            # Listed as 'chain:address', or bare for Ethereum
+            by_address[address.split(':')[-1].lower()] = protocol['tvl']
+    for token in records:
+        token.tvl = by_address.get(token.address.lower(), token.tvl)
+
+def count_tweets(api: 'CookieAPI', records: List[TokenRecord], days: int = 1, limit: int = 50,
+                 max_workers: int = 4) -> None:
+    """
+    Fill tweet counts in place for the `limit` largest tokens by market cap.
+
+    The search endpoint is quota-limited, so smaller tokens are skipped.
+    """
+    to_date = datetime.now().date()
+    from_date = to_date - timedelta(days=days)
+    from .api.Cookie import CookieAPIError
+    targets = sorted(records, key=lambda t: -(t.market_cap or 0))[:limit]
+
+    def search(token: TokenRecord) -> Optional[int]:
+        query = token.twitter[0] if token.twitter else token.name
+        try:
+            response = api.search_tweets(query, from_date.isoformat(), to_date.isoformat())
+        except CookieAPIError as e:
+            logger.debug(f"Tweet search failed for {query}: {e}")
+            return None
+        for key in ('ok', 'data'):
+            if isinstance(response.get(key), list):
+                return len(response[key])
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for token, count in zip(targets, pool.map(search, targets)):
+            token.tweet_count = count
+
+def run_prefetch(
+    api: Optional['CookieAPI'] = None,
+    llama: Optional['DefiLlama'] = None,
+    chains: Iterable[int] = (8453, -2),
+    tweet_limit: int = 50,
+    path: Optional[str] = None
+) -> TokenDataset:
+    """
+    Build the token dataset without any LLM calls and save it.
+
+    The Cookie universe is crawled first; prices, TVL and tweet counts are then
+    fetched concurrently since they only depend on the token list. A failing
+    source leaves its fields empty and is recorded in `errors`.
+
+    Args:
+        api: Cookie API client (a cached production client by default)
+        llama: DefiLlama client
+        chains: Cookie chain IDs to include
+        tweet_limit: Number of tokens (by market cap) to count tweets for
+        path: Dataset file, defaults to .cache/prefetch/token_dataset.json
+
+    Returns:
+        The saved TokenDataset
+    """
+    from .api.Cookie import create_production_instance
+    from .registry import shared_llama
+    api = api or create_production_instance()
+    llama = llama or shared_llama()
+    dataset = TokenDataset(generated_at=datetime.now().isoformat(timespec='seconds'))
+
+    dataset.tokens = crawl_universe(api, chains)
+    stages = {
+        'prices': lambda: batch_prices(llama, dataset.tokens),
+        'tvl': lambda: fill_tvl(llama, dataset.tokens),
+        'tweets': lambda: count_tweets(api, dataset.tokens, limit=tweet_limit),
+    }
+    # Each stage writes disjoint fields, so they can run side by side
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        futures = {name: pool.submit(stage) for name, stage in stages.items()}
+    for name, future in futures.items():
+        if future.exception() is not None:
+            logger.warning(f"Pre-fetch stage '{name}' failed: {future.exception()}")
+            dataset.errors[name] = str(future.exception())
+
+    dataset.save(path)
+    logger.info(f"Pre-fetched {len(dataset.tokens)} tokens")
+    return dataset
@@ -0,0 +1,98 @@
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from datetime import timedelta
+import importlib
+import threading
+
+if TYPE_CHECKING:
+    from crewai.tools import BaseTool
+    from defillama import DefiLlama
+    from .api.Cookie import CookieAPI
+
+# Process-wide tool and API-client pool. Tools are created once per name and
+# shared by every crew built in this process, so long-lived processes (the
+# scheduler) keep their HTTP sessions, caches and on-chain ledgers warm.
+# Independent jobs can run concurrently, so a tool that mutates its own state
+# (the holder ledgers) must lock it.
+#
+# Tool modules are imported on first use, so importing the registry (and the
+# crew) does not pull in every tool's dependencies.
+
+_lock = threading.RLock()
+_tools: Dict[str, 'BaseTool'] = {}
+_clients: Dict[str, object] = {}
+
+def _client(name: str, factory: Callable[[], object]) -> object:
+    with _lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+def shared_cookie_api() -> 'CookieAPI':
+    """Shared Cookie API client with response caching."""
+    def create() -> 'CookieAPI':
+        from .api.Cookie import APICache, create_production_instance
+        api = create_production_instance()
+        api.use_cache = True
+        api.cache = APICache(cache_duration=timedelta(hours=1))
+        return api
+    return _client('cookie', create)
+
+def shared_llama() -> 'DefiLlama':
+    """Shared DeFi Llama client (one requests session), its calls traced as HTTP spans."""
+    def create() -> 'DefiLlama':
+        from defillama import DefiLlama
+        from indexfundmanagercrew.tracing import trace_calls
+        return trace_calls(DefiLlama(), 'defillama')
+    return _client('defillama', create)
+
+_SHARED_CLIENTS: Dict[str, Callable[[], object]] = {
+    'api': shared_cookie_api,
+    'llama': shared_llama,
+}
+
+# Tool name -> (module:class relative to this package, shared client keyword argument or None)
+TOOL_PATHS: Dict[str, Tuple[str, Optional[str]]] = {
+    'lookup_token_dataset': ('research_tools.dataset_tool:DatasetLookupTool', None),
+    'filter_cookie_data': ('research_tools.cookie_tool:CookieFilterTool', 'api'),
+    'get_agent_details': ('research_tools.cookie_tool:AgentDetailTool', 'api'),
+    'search_tweets': ('research_tools.cookie_tool:TweetSearchTool', 'api'),
+    'fetch_defi_prices': ('research_tools.defillama_tool:PriceFetcherAgent', 'llama'),
+    'get_protocol_info': ('research_tools.defillama_tool:ProtocolInfoTool', 'llama'),
+    'get_tvl_metrics': ('research_tools.defillama_tool:TVLMetricsTool', 'llama'),
+    'get_holder_distribution': ('research_tools.holder_tool:HolderDistributionTool', None),
+    'check_fill_capacity': ('research_tools.liquidity_tool:FillCapacityTool', 'llama'),
+    'optimize_index_weights': ('research_tools.portfolio_tool:WeightOptimizerTool', 'llama'),
+    'backtest_index_compositions': ('research_tools.portfolio_tool:BacktestTool', 'llama'),
+    'simulate_portfolio_risk': ('research_tools.portfolio_tool:RiskSimulationTool', 'llama'),
+    'get_report_detail': ('research_tools.report_tool:ReportDetailTool', None),
+    'get_universe_changes': ('research_tools.snapshot_tool:UniverseChangesTool', None),
+    'get_token_features': ('research_tools.feature_tool:TokenFeaturesTool', None),
+    'screen_red_flags': ('research_tools.screening_tool:RedFlagScreenTool', None),
+}
+
+def _create(name: str) -> 'BaseTool':
+    path, client = TOOL_PATHS[name]
+    module_name, class_name = path.split(':')
+    # Relative import, so this works whether the package is loaded as tools.* or indexfundmanagercrew.tools.*
+    tool_class = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+    if client is None:
+        return tool_class()
+    return tool_class(**{client: _SHARED_CLIENTS[client]()})
+
+def get_tool(name: str) -> 'BaseTool':
+    """Get the pooled instance of a tool, importing and creating it on first use."""
+    with _lock:
+        if name not in _tools:
+            if name not in TOOL_PATHS:
+                raise KeyError(f"Unknown tool: {name}")
+            _tools[name] = _create(name)
+        return _tools[name]
+
+def get_tools(*names: str) -> List['BaseTool']:
+    return [get_tool(name) for name in names]
+
+def reset() -> None:
+    """Drop every pooled tool and client; they are recreated on next use."""
+    with _lock:
+        _tools.clear()
+        _clients.clear()
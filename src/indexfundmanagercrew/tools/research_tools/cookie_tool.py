@@ -1,6 +1,7 @@
 from typing import Type, ClassVar, List, Optional, Dict, Any
 from datetime import timedelta
 from crewai.tools import BaseTool
+from ..run_cache import memoize_run
 from pydantic import BaseModel, Field, ConfigDict
 from ..api.Cookie import (
     CookieAPI,
@@ -27,19 +28,22 @@ class CookieFilterTool(BaseTool):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
-    def __init__(self, api_key: Optional[str] = None, cache_duration: timedelta = timedelta(hours=1), max_pages: int = 10):
+    def __init__(self, api_key: Optional[str] = None, cache_duration: timedelta = timedelta(hours=1), max_pages: int = 10,
+                 api: Optional[CookieAPI] = None):
         super().__init__()
-        if api_key is None:
-            load_dotenv()
-            api_key = os.getenv('COOKIE_API_KEY')
-            if not api_key:
-                raise ValueError("COOKIE_API_KEY not found in environment variables")
-                
-        self.api = CookieAPI(api_key)
-        self.api.use_cache = True
-        self.api.cache = APICache(cache_duration=cache_duration)
+        if api is None:
+            if api_key is None:
+                load_dotenv()
+                api_key = os.getenv('COOKIE_API_KEY')
+                if not api_key:
+                    raise ValueError("COOKIE_API_KEY not found in environment variables")
+            api = CookieAPI(api_key)
+            api.use_cache = True
+            api.cache = APICache(cache_duration=cache_duration)
+        self.api = api
         self.max_pages = max_pages
 
+    @memoize_run(ttl=600, max_entries=16)
     def _run(self, filters: Dict[str, Any], sort_order: str = "desc") -> str:
         try:
             data = self.api.get_data()
@@ -60,15 +64,18 @@ class AgentDetailTool(BaseTool):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api: Optional[CookieAPI] = None):
         super().__init__()
-        if api_key is None:
-            load_dotenv()
-            api_key = os.getenv('COOKIE_API_KEY')
-            if not api_key:
-                raise ValueError("COOKIE_API_KEY not found in environment variables")
-        self.api = CookieAPI(api_key)
-
+        if api is None:
+            if api_key is None:
+                load_dotenv()
+                api_key = os.getenv('COOKIE_API_KEY')
+                if not api_key:
+                    raise ValueError("COOKIE_API_KEY not found in environment variables")
+            api = CookieAPI(api_key)
+        self.api = api
+
+    @memoize_run(ttl=600, max_entries=256)
     def _run(self, contract_address: str, interval: str = "_7Days") -> str:
         try:
             data = self.api.get_agent_by_contract_address(contract_address, interval)
@@ -89,15 +96,18 @@ class TweetSearchTool(BaseTool):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api: Optional[CookieAPI] = None):
         super().__init__()
-        if api_key is None:
-            load_dotenv()
-            api_key = os.getenv('COOKIE_API_KEY')
-            if not api_key:
-                raise ValueError("COOKIE_API_KEY not found in environment variables")
-        self.api = CookieAPI(api_key)
-
+        if api is None:
+            if api_key is None:
+                load_dotenv()
+                api_key = os.getenv('COOKIE_API_KEY')
+                if not api_key:
+                    raise ValueError("COOKIE_API_KEY not found in environment variables")
+            api = CookieAPI(api_key)
+        self.api = api
+
+    @memoize_run(ttl=600, max_entries=128)
     def _run(self, query: str, from_date: str, to_date: str) -> str:
         try:
             data = self.api.search_tweets(query, from_date, to_date)
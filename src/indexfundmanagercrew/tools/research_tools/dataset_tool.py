@@ -0,0 +1,61 @@
+from typing import Type, Optional
+from dataclasses import asdict
+from pydantic import BaseModel, Field, ConfigDict
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from ..prefetch import TokenDataset, default_dataset_file
+from pathlib import Path
+import json
+
+class DatasetLookupInput(BaseModel):
+    query: Optional[str] = Field(default=None, description="Token name, Twitter handle or contract address to look up; omit to rank the whole universe")
+    sort_by: str = Field(default="market_cap", description="Field to rank by: market_cap, liquidity, volume_24h, holders, mindshare, tvl, tweet_count")
+    chain: Optional[str] = Field(default=None, description="Restrict to one chain ('base' or 'solana')")
+    limit: int = Field(default=20, description="Maximum number of tokens to return")
+
+class DatasetLookupTool(BaseTool):
+    name: str = "lookup_token_dataset"
+    description: str = (
+        "Look up the pre-fetched token dataset (Cookie metrics, DeFi Llama prices, TVL and tweet counts "
+        "for every Base and Solana agent token). Use this before calling individual data tools"
+    )
+    args_schema: Type[BaseModel] = DatasetLookupInput
+    path: str = ""
+    dataset: Optional[TokenDataset] = None
+    loaded_mtime: float = 0.0
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = str(path or default_dataset_file())
+
+    def _load(self) -> Optional[TokenDataset]:
+        """Reload only when the pre-fetch stage has written a new file."""
+        try:
+            mtime = Path(self.path).stat().st_mtime
+        except OSError:
+            return None
+        if self.dataset is None or mtime != self.loaded_mtime:
+            self.dataset = TokenDataset.load(self.path)
+            self.loaded_mtime = mtime
+        return self.dataset
+
+    @memoize_run(ttl=60, max_entries=64)
+    def _run(self, query: Optional[str] = None, sort_by: str = "market_cap", chain: Optional[str] = None,
+             limit: int = 20) -> str:
+        try:
+            dataset = self._load()
+            if dataset is None:
+                return "Error looking up token dataset: no pre-fetched dataset available yet"
+            if query:
+                tokens = [t for t in dataset.find(query) if chain is None or t.chain == chain][:limit]
+            else:
+                tokens = dataset.top(sort_by, limit, chain)
+            return json.dumps({
+                'generated_at': dataset.generated_at,
+                'count': len(tokens),
+                'tokens': [asdict(t) for t in tokens]
+            }, indent=2)
+        except Exception as e:
+            return f"Error looking up token dataset: {str(e)}"
@@ -1,8 +1,12 @@
 from typing import Type, Optional, Dict, Any, List
 from pydantic import BaseModel, Field, ConfigDict
 from crewai.tools import BaseTool
+from ..run_cache import memoize_run
 from defillama import DefiLlama
 from datetime import datetime
+from ..api.health import is_upstream_down
+
+LLAMA_DOWN_MESSAGE = "Error: DeFi Llama is marked down by the latest health check, try again later"
 
 class PriceFetcherInput(BaseModel):
     chain: str = Field(description="The blockchain chain (e.g., 'ethereum', 'binance-smart-chain')")
@@ -17,11 +21,14 @@ class PriceFetcherAgent(BaseTool):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def __init__(self):
+    def __init__(self, llama: Optional[DefiLlama] = None):
         super().__init__()
-        self.llama = DefiLlama()
+        self.llama = llama or DefiLlama()
 
+    @memoize_run(ttl=60, max_entries=256)
     def _run(self, chain: str, token_address: str, timestamp: Optional[int] = None) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
         try:
             # Format the coin identifier
             coin_id = f"{chain}:{token_address}"
@@ -65,11 +72,14 @@ class ProtocolInfoTool(BaseTool):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def __init__(self):
+    def __init__(self, llama: Optional[DefiLlama] = None):
         super().__init__()
-        self.llama = DefiLlama()
+        self.llama = llama or DefiLlama()
 
+    @memoize_run(ttl=600, max_entries=64)
     def _run(self, protocol_name: str) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
         try:
             response = self.llama.get_protocol(protocol_name)
             
@@ -106,11 +116,14 @@ class TVLMetricsTool(BaseTool):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def __init__(self):
+    def __init__(self, llama: Optional[DefiLlama] = None):
         super().__init__()
-        self.llama = DefiLlama()
+        self.llama = llama or DefiLlama()
 
+    @memoize_run(ttl=600, max_entries=32)
     def _run(self, chain: Optional[str] = None) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
         try:
             if chain:
                 response = self.llama.get_historical_tvl_chain(chain)
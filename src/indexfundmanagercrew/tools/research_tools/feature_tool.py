@@ -0,0 +1,47 @@
+from typing import Type, Optional
+from pydantic import BaseModel, Field, ConfigDict
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from ..features import FeatureStore, FEATURES
+import json
+
+class TokenFeaturesInput(BaseModel):
+    token: Optional[str] = Field(default=None, description="Token name or contract address; omit to rank all tokens by sort_by")
+    date: Optional[str] = Field(default=None, description="Date (YYYY-MM-DD) to look up, or the start of a range with end_date; defaults to the latest day")
+    end_date: Optional[str] = Field(default=None, description="End of a date range (YYYY-MM-DD, inclusive); returns one row per token per day")
+    sort_by: str = Field(default="mindshare_momentum", description=f"Feature to rank by when no token is given: {', '.join(FEATURES)}")
+    limit: int = Field(default=20, description="Maximum number of rows to return")
+
+class TokenFeaturesTool(BaseTool):
+    name: str = "get_token_features"
+    description: str = (
+        "Get precomputed daily features per token: mindshare momentum (vs. its 7-day EMA), 24h volume/liquidity "
+        "ratio, 7-day volatility of daily log returns, daily holder growth and daily price return. Look up one token "
+        "on a date or over a date range, or rank every token by a feature. Use this instead of computing these from raw data"
+    )
+    args_schema: Type[BaseModel] = TokenFeaturesInput
+    store: Optional[FeatureStore] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, store: Optional[FeatureStore] = None):
+        super().__init__()
+        self.store = store or FeatureStore()
+
+    @memoize_run(ttl=300, max_entries=64)
+    def _run(self, token: Optional[str] = None, date: Optional[str] = None, end_date: Optional[str] = None,
+             sort_by: str = "mindshare_momentum", limit: int = 20) -> str:
+        try:
+            if not self.store.days():
+                return "Error getting token features: no features computed yet"
+            if token is None:
+                rows = self.store.top(sort_by, date, limit)
+            elif end_date:
+                rows = self.store.range(token, date or end_date, end_date)[-limit:]
+            else:
+                rows = self.store.point(token, date)[:limit]
+            if not rows:
+                return f"No features found for {token or sort_by} on {date or 'the latest day'}"
+            return json.dumps({'count': len(rows), 'rows': rows}, indent=2)
+        except Exception as e:
+            return f"Error getting token features: {str(e)}"
@@ -0,0 +1,74 @@
+from typing import Type, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+import json
+import os
+import threading
+
+class HolderDistributionInput(BaseModel):
+    token_address: str = Field(description="The Base chain (8453) token contract address")
+    top_n: int = Field(default=10, description="Number of largest holders to report")
+    start_block: Optional[int] = Field(default=None, description="Token deployment block; required the first time a token is indexed")
+
+class HolderDistributionTool(BaseTool):
+    name: str = "get_holder_distribution"
+    description: str = (
+        "Get on-chain holder concentration for a Base chain token: holder count, Gini coefficient, "
+        "top-N supply share, largest holders and recent whale movements"
+    )
+    args_schema: Type[BaseModel] = HolderDistributionInput
+    rpc_url: str = ""
+    ledgers: Dict[str, Any] = {}  # HolderLedger per token
+    # Blocks scanned per call (~1 day of Base blocks); a token further behind catches up over several calls
+    max_blocks_per_call: int = 50_000
+    # The tool is pooled process-wide and jobs run concurrently; a ledger is synced by one call at a time
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _ledger_locks: Dict[str, threading.Lock] = PrivateAttr(default_factory=dict)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, rpc_url: Optional[str] = None):
+        super().__init__()
+        self.rpc_url = rpc_url or os.getenv('BASE_RPC', 'https://mainnet.base.org')
+        self.ledgers = {}
+
+    @memoize_run(ttl=300, max_entries=64)
+    def _run(self, token_address: str, top_n: int = 10, start_block: Optional[int] = None) -> str:
+        try:
+            key = token_address.lower()
+            with self._ledger_lock(key):
+                return self._summary(key, token_address, top_n, start_block)
+        except Exception as e:
+            return f"Error building holder distribution: {str(e)}"
+
+    def _ledger_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._ledger_locks.setdefault(key, threading.Lock())
+
+    def _summary(self, key: str, token_address: str, top_n: int, start_block: Optional[int]) -> str:
+        ledger = self.ledgers.get(key)
+        if ledger is None:
+            # web3 is only imported once the tool is actually used
+            from ..web3.holder_ledger import HolderLedger
+            ledger = HolderLedger(self.rpc_url, token_address, start_block=start_block)
+            if not ledger.indexed:
+                # Without a checkpoint or deploy block the scan would start at genesis
+                return (
+                    f"Error building holder distribution: {token_address} is not indexed yet; "
+                    "call again with start_block set to the token's deployment block"
+                )
+            self.ledgers[key] = ledger
+
+        head = ledger.w3.eth.block_number
+        ledger.sync(head, max_blocks=self.max_blocks_per_call)
+        if ledger.last_block < head:
+            return (
+                f"Error building holder distribution: still indexing {token_address} "
+                f"(at block {ledger.last_block:,}, {head - ledger.last_block:,} blocks behind); "
+                "progress is saved, call again to continue"
+            )
+        summary = ledger.distribution_summary(top_ns=(top_n, 50, 100))
+        summary['top_holders'] = ledger.top_holders(top_n)
+        summary['recent_whale_movements'] = ledger.recent_whale_movements()[:10]
+        return json.dumps(summary)
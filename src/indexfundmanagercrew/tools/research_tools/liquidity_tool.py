@@ -0,0 +1,55 @@
+from typing import Type, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from defillama import DefiLlama
+from ..api.health import is_upstream_down
+from .defillama_tool import LLAMA_DOWN_MESSAGE
+import json
+import os
+
+class FillCapacityInput(BaseModel):
+    weights: Dict[str, float] = Field(description="Candidate index weights keyed by Base chain token address")
+    fund_size_usd: float = Field(description="Total fund size in USD")
+    max_impact: float = Field(default=0.02, description="Maximum acceptable average price impact (0.02 = 2%)")
+
+class FillCapacityTool(BaseTool):
+    name: str = "check_fill_capacity"
+    description: str = (
+        "Check whether each candidate index weight can be bought at the given fund size, "
+        "using price impact across every Uniswap pool of each token on Base chain. "
+        "When exceeds_window is true, max_size_usd is only a lower bound: liquidity beyond the ticks read is not counted"
+    )
+    args_schema: Type[BaseModel] = FillCapacityInput
+    rpc_url: str = ""
+    engine: Optional[Any] = None  # LiquidityDepthEngine, created on first use
+    llama: DefiLlama = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, rpc_url: Optional[str] = None, llama: Optional[DefiLlama] = None):
+        super().__init__()
+        self.rpc_url = rpc_url or os.getenv('BASE_RPC', 'https://mainnet.base.org')
+        self.llama = llama or DefiLlama()
+
+    @memoize_run(ttl=300, max_entries=32)
+    def _run(self, weights: Dict[str, float], fund_size_usd: float, max_impact: float = 0.02) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
+        try:
+            # web3 is only imported once the tool is actually used
+            from ..web3.liquidity_depth import LiquidityDepthEngine, DEFAULT_QUOTES
+            if self.engine is None:
+                self.engine = LiquidityDepthEngine(self.rpc_url)
+            coins = ",".join(f"base:{quote}" for quote in DEFAULT_QUOTES)
+            response = self.llama.get_token_current_prices(coins=coins, searchWidth="4h")
+            if not response or 'coins' not in response:
+                return "Error: Invalid response format from DeFi Llama"
+            quote_prices = {
+                quote: response['coins'][f"base:{quote}"]['price']
+                for quote in DEFAULT_QUOTES if f"base:{quote}" in response['coins']
+            }
+            report = self.engine.check_fillability(weights, fund_size_usd, quote_prices, max_impact)
+            return json.dumps(report)
+        except Exception as e:
+            return f"Error checking fill capacity: {str(e)}"
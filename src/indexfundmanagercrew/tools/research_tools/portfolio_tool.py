@@ -0,0 +1,200 @@
+from typing import Type, Optional, Dict, Any, List
+from pydantic import BaseModel, Field, ConfigDict
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from defillama import DefiLlama
+from ..portfolio.optimizer import PortfolioConstraints, OptimizationError, optimize_weights
+from ..portfolio.price_history import fetch_price_matrix, log_returns
+from ..portfolio.backtest import BacktestConfig, run_backtest_sweep
+from ..portfolio.risk import SimulationConfig, simulate_portfolio_risk
+from ..api.health import is_upstream_down
+from .defillama_tool import LLAMA_DOWN_MESSAGE
+import numpy as np
+import json
+
+class WeightOptimizerInput(BaseModel):
+    tokens: List[Dict[str, Any]] = Field(
+        description=(
+            "Candidate tokens, each with 'symbol', 'coin' (DeFi Llama id such as 'base:0x...'), "
+            "'chain', 'market_cap' and 'liquidity' (USD)"
+        )
+    )
+    method: str = Field(default="risk_parity", description="mean_variance, min_variance, risk_parity or market_cap")
+    max_weight: float = Field(default=0.25, description="Maximum weight per token")
+    min_liquidity: float = Field(default=0.0, description="Minimum token liquidity in USD to be eligible")
+    chains: List[str] = Field(default_factory=list, description="Only include tokens on these chains (empty = any)")
+    lookback_days: int = Field(default=90, description="Days of daily price history used for covariance")
+    fund_size: Optional[float] = Field(default=None, description="Fund size in USD, used to cap market-cap weights by liquidity")
+    risk_aversion: float = Field(default=1.0, description="Risk aversion for mean_variance")
+
+class WeightOptimizerTool(BaseTool):
+    name: str = "optimize_index_weights"
+    description: str = (
+        "Compute index weights that sum to 1 for a set of candidate tokens using mean-variance, "
+        "minimum-variance, risk-parity or liquidity-capped market-cap weighting"
+    )
+    args_schema: Type[BaseModel] = WeightOptimizerInput
+    llama: DefiLlama = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, llama: Optional[DefiLlama] = None):
+        super().__init__()
+        self.llama = llama or DefiLlama()
+
+    @memoize_run(ttl=3600, max_entries=16)
+    def _run(
+        self,
+        tokens: List[Dict[str, Any]],
+        method: str = "risk_parity",
+        max_weight: float = 0.25,
+        min_liquidity: float = 0.0,
+        chains: Optional[List[str]] = None,
+        lookback_days: int = 90,
+        fund_size: Optional[float] = None,
+        risk_aversion: float = 1.0
+    ) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
+        try:
+            if not tokens:
+                return "Error optimizing weights: no candidate tokens given"
+            symbols = [t.get('symbol') or t.get('coin') for t in tokens]
+            constraints = PortfolioConstraints(
+                max_weight=max_weight,
+                min_liquidity=min_liquidity,
+                chains=chains or [],
+                fund_size=fund_size
+            )
+            liquidity = np.array([float(t.get('liquidity') or 0) for t in tokens])
+            token_chains = [t.get('chain', '') for t in tokens]
+
+            returns = None
+            if method != 'market_cap':
+                _, prices = fetch_price_matrix([t['coin'] for t in tokens], days=lookback_days, llama=self.llama)
+                returns = log_returns(prices)
+
+            result = optimize_weights(
+                method,
+                constraints,
+                liquidity,
+                chains=token_chains,
+                returns=returns,
+                market_caps=np.array([float(t.get('market_cap') or 0) for t in tokens]),
+                risk_aversion=risk_aversion
+            )
+            return json.dumps(result.as_dict(symbols))
+        except OptimizationError as e:
+            return (
+                f"Error optimizing weights: {str(e)}. Loosen max_weight, min_liquidity or chains, "
+                "or add candidates with price history"
+            )
+        except Exception as e:
+            return f"Error optimizing weights: {str(e)}"
+
+class BacktestInput(BaseModel):
+    portfolios: Dict[str, Dict[str, float]] = Field(
+        description="Candidate compositions: name -> {DeFi Llama coin id (e.g. 'base:0x...'): weight}"
+    )
+    lookback_days: int = Field(default=90, description="Days of daily price history to backtest over")
+    rebalance_every: List[int] = Field(default_factory=lambda: [7], description="Rebalance intervals in days to sweep (0 = buy and hold)")
+    fee_bps: float = Field(default=10.0, description="Trading fee in basis points")
+    slippage_bps: float = Field(default=20.0, description="Slippage in basis points")
+
+class BacktestTool(BaseTool):
+    name: str = "backtest_index_compositions"
+    description: str = (
+        "Backtest many candidate index compositions at once over historical prices with periodic "
+        "rebalancing, fees and slippage; returns return, volatility, drawdown and turnover per composition"
+    )
+    args_schema: Type[BaseModel] = BacktestInput
+    llama: DefiLlama = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, llama: Optional[DefiLlama] = None):
+        super().__init__()
+        self.llama = llama or DefiLlama()
+
+    @memoize_run(ttl=3600, max_entries=16)
+    def _run(
+        self,
+        portfolios: Dict[str, Dict[str, float]],
+        lookback_days: int = 90,
+        rebalance_every: Optional[List[int]] = None,
+        fee_bps: float = 10.0,
+        slippage_bps: float = 20.0
+    ) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
+        try:
+            if not portfolios:
+                return "Error running backtest: no portfolios given"
+            coins = sorted({coin for weights in portfolios.values() for coin in weights})
+            column = {coin: j for j, coin in enumerate(coins)}
+            labels = list(portfolios)
+            weights = np.zeros((len(labels), len(coins)))
+            for i, label in enumerate(labels):
+                for coin, weight in portfolios[label].items():
+                    weights[i, column[coin]] = weight
+
+            _, prices = fetch_price_matrix(coins, days=lookback_days, llama=self.llama)
+            configs = [
+                BacktestConfig(rebalance_every=k, fee_bps=fee_bps, slippage_bps=slippage_bps)
+                for k in (rebalance_every or [7])
+            ]
+            rows = run_backtest_sweep(prices, weights, configs, labels=labels)
+            return json.dumps(rows)
+        except Exception as e:
+            return f"Error running backtest: {str(e)}"
+
+class RiskSimulationInput(BaseModel):
+    weights: Dict[str, float] = Field(description="Proposed composition: DeFi Llama coin id (e.g. 'base:0x...') -> weight")
+    method: str = Field(default="bootstrap", description="bootstrap, normal or t (Student-t)")
+    n_paths: int = Field(default=100_000, description="Number of simulated paths")
+    horizon_days: int = Field(default=7, description="Simulation horizon in days")
+    lookback_days: int = Field(default=180, description="Days of daily price history the simulation is calibrated on")
+    drawdown_threshold: float = Field(default=0.2, description="Drawdown level for the probability-of-drawdown estimate")
+
+class RiskSimulationTool(BaseTool):
+    name: str = "simulate_portfolio_risk"
+    description: str = (
+        "Run a Monte Carlo simulation of a proposed index composition and return VaR, CVaR and the "
+        "probability of a drawdown beyond a threshold over the horizon"
+    )
+    args_schema: Type[BaseModel] = RiskSimulationInput
+    llama: DefiLlama = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, llama: Optional[DefiLlama] = None):
+        super().__init__()
+        self.llama = llama or DefiLlama()
+
+    @memoize_run(ttl=3600, max_entries=16)
+    def _run(
+        self,
+        weights: Dict[str, float],
+        method: str = "bootstrap",
+        n_paths: int = 100_000,
+        horizon_days: int = 7,
+        lookback_days: int = 180,
+        drawdown_threshold: float = 0.2
+    ) -> str:
+        if is_upstream_down('defillama'):
+            return LLAMA_DOWN_MESSAGE
+        try:
+            if not weights:
+                return "Error simulating risk: no weights given"
+            coins = list(weights)
+            _, prices = fetch_price_matrix(coins, days=lookback_days, llama=self.llama)
+            config = SimulationConfig(
+                n_paths=n_paths,
+                horizon=horizon_days,
+                method=method,
+                drawdown_threshold=drawdown_threshold
+            )
+            report = simulate_portfolio_risk(np.array([weights[c] for c in coins]), log_returns(prices), config)
+            return json.dumps(report.as_dict())
+        except Exception as e:
+            return f"Error simulating risk: {str(e)}"
@@ -0,0 +1,27 @@
+from typing import Type, Optional
+from pydantic import BaseModel, Field
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from indexfundmanagercrew.compaction import report_detail
+from indexfundmanagercrew.memory_store import MemoryStore
+
+class ReportDetailInput(BaseModel):
+    date: str = Field(description="Report date (YYYY-MM-DD)")
+    token: Optional[str] = Field(default=None, description="Token name or $TICKER; returns only the passages about it")
+
+class ReportDetailTool(BaseTool):
+    name: str = "get_report_detail"
+    description: str = (
+        "Get the full daily analysis report for a date, or only the passages about one token. "
+        "The weekly context only carries summaries; use this to check the details behind them"
+    )
+    args_schema: Type[BaseModel] = ReportDetailInput
+    days: int = 14
+
+    @memoize_run(ttl=600, max_entries=64)
+    def _run(self, date: str, token: Optional[str] = None) -> str:
+        try:
+            history = MemoryStore().get_recent_history('daily_analysis_result', days=self.days, latest_per_day=True)
+            return report_detail(history, date.strip(), token)
+        except Exception as e:
+            return f"Error getting report detail: {str(e)}"
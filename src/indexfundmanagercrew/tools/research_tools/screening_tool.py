@@ -0,0 +1,43 @@
+from typing import Type, Optional
+from pydantic import BaseModel, Field, ConfigDict
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from ..features import FeatureStore
+from ..screening import screen
+import json
+
+class RedFlagScreenInput(BaseModel):
+    chain: Optional[str] = Field(default=None, description="Restrict to one chain ('base' or 'solana')")
+    min_score: float = Field(default=1.0, description="Smallest score to report; each triggered rule adds 1-5")
+    limit: int = Field(default=25, description="Maximum number of flagged tokens to return")
+    days: int = Field(default=14, description="Trailing days the rolling statistics are computed over")
+
+class RedFlagScreenTool(BaseTool):
+    name: str = "screen_red_flags"
+    description: str = (
+        "Screen every token in the universe for red flags in one call: volume spikes into thin liquidity, "
+        "mindshare pumps not backed by new holders, holder collapses, thin liquidity against market cap, price "
+        "crashes and sustained shifts (CUSUM change points) in mindshare, holders and price. Returns flagged "
+        "tokens ranked by score with the reasons. Use this instead of inspecting tokens one by one"
+    )
+    args_schema: Type[BaseModel] = RedFlagScreenInput
+    store: Optional[FeatureStore] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, store: Optional[FeatureStore] = None):
+        super().__init__()
+        self.store = store or FeatureStore()
+
+    @memoize_run(ttl=300, max_entries=32)
+    def _run(self, chain: Optional[str] = None, min_score: float = 1.0, limit: int = 25, days: int = 14) -> str:
+        try:
+            if not self.store.days():
+                return "Error screening tokens: no features computed yet"
+            flagged = [
+                result for result in screen(self.store, days=days)
+                if result['score'] >= min_score and (chain is None or result['key'].startswith(f"{chain.lower()}:"))
+            ]
+            return json.dumps({'flagged': len(flagged), 'tokens': flagged[:limit]}, indent=2)
+        except Exception as e:
+            return f"Error screening tokens: {str(e)}"
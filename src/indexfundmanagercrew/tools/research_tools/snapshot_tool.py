@@ -0,0 +1,45 @@
+from typing import Type, Optional
+from pydantic import BaseModel, Field, ConfigDict
+from crewai.tools import BaseTool
+from ..run_cache import memoize_run
+from ..snapshots import SnapshotStore, diff_snapshots
+import json
+
+class UniverseChangesInput(BaseModel):
+    since: Optional[str] = Field(default=None, description="Compare against the universe as of this date (YYYY-MM-DD); defaults to the previous gathering run")
+    min_rank_change: int = Field(default=5, description="Smallest market cap rank move to report")
+    min_change_pct: float = Field(default=25.0, description="Smallest metric change to report, in percent")
+    limit: int = Field(default=15, description="Maximum tokens per list")
+
+class UniverseChangesTool(BaseTool):
+    name: str = "get_universe_changes"
+    description: str = (
+        "Get what changed in the AI agent token universe since the previous gathering run (or a given date): "
+        "new entrants, dropouts, market cap rank moves and large metric changes. Returns only the deltas, "
+        "so use this instead of re-reading the whole universe to find what is new"
+    )
+    args_schema: Type[BaseModel] = UniverseChangesInput
+    store: Optional[SnapshotStore] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, store: Optional[SnapshotStore] = None):
+        super().__init__()
+        self.store = store or SnapshotStore()
+
+    @memoize_run(ttl=300, max_entries=32)
+    def _run(self, since: Optional[str] = None, min_rank_change: int = 5, min_change_pct: float = 25.0,
+             limit: int = 15) -> str:
+        try:
+            names = self.store.names()
+            if not names:
+                return "Error getting universe changes: no universe snapshots recorded yet"
+            new = self.store.load(names[-1])
+            old = self.store.before(names[-1], since)
+            if old is None:
+                return f"Only one universe snapshot ({new.taken_at}) recorded so far; there is nothing to compare yet"
+            diff = diff_snapshots(old, new, min_rank_change=min_rank_change,
+                                  min_relative_change=min_change_pct / 100, limit=limit)
+            return json.dumps(diff.as_dict(), indent=2)
+        except Exception as e:
+            return f"Error getting universe changes: {str(e)}"
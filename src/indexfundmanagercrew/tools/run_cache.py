@@ -0,0 +1,134 @@
+from typing import Any, Callable, Dict, Optional
+from collections import OrderedDict
+from contextvars import ContextVar
+import functools
+import inspect
+import json
+import threading
+import time
+
+from indexfundmanagercrew.tracing import span
+
+# Memoization of tool results within one crew kickoff. Agents (and the
+# manager) often call the same tool with the same arguments several times in
+# one run; inside a run those calls return the first result instead of going
+# back to the network. Outside a run (no active RunCache) tools are uncached.
+
+class RunCache:
+    """Tool results for one kickoff, with per-tool LRU limits and TTLs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, OrderedDict] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.token = None
+
+    def get(self, tool: str, key: str, ttl: float):
+        with self._lock:
+            stats = self.stats.setdefault(tool, {'hits': 0, 'misses': 0})
+            entries = self._entries.get(tool)
+            if entries is not None and key in entries:
+                stored_at, value = entries[key]
+                if time.monotonic() - stored_at <= ttl:
+                    entries.move_to_end(key)
+                    stats['hits'] += 1
+                    return True, value
+                del entries[key]
+            stats['misses'] += 1
+            return False, None
+
+    def put(self, tool: str, key: str, value: Any, max_entries: int) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(tool, OrderedDict())
+            entries[key] = (time.monotonic(), value)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    @property
+    def hits(self) -> int:
+        return sum(s['hits'] for s in self.stats.values())
+
+    @property
+    def misses(self) -> int:
+        return sum(s['misses'] for s in self.stats.values())
+
+_current: ContextVar[Optional[RunCache]] = ContextVar('tool_run_cache', default=None)
+
+def start_run() -> RunCache:
+    """Activate a fresh run cache in the current context."""
+    cache = RunCache()
+    cache.token = _current.set(cache)
+    return cache
+
+def end_run() -> Optional[RunCache]:
+    """Deactivate the current run cache and return it for its stats."""
+    cache = _current.get()
+    if cache is not None and cache.token is not None:
+        try:
+            _current.reset(cache.token)
+        except ValueError:
+            # Ended from a different context than it was started in
+            _current.set(None)
+    return cache
+
+def current_run() -> Optional[RunCache]:
+    return _current.get()
+
+def _normalize(value: Any) -> Any:
+    """Canonical form of an argument: trimmed strings, lowercased hex addresses, sorted mappings."""
+    if isinstance(value, str):
+        value = value.strip()
+        return value.lower() if value.startswith('0x') else value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+def memoize_run(ttl: float = 300, max_entries: int = 128) -> Callable:
+    """
+    Memoize a BaseTool._run method within the active kickoff.
+
+    The key is the tool name plus the normalized arguments, with defaults
+    applied, so positional and keyword calls share entries. Error strings are
+    never cached. Each call is recorded as a tool span when tracing is on.
+
+    Args:
+        ttl: Seconds a result stays valid within the run
+        max_entries: Per-tool limit; least recently used entries are dropped
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with span(self.name, kind='tool') as tool_span:
+                value, cache_hit = lookup(self, *args, **kwargs)
+                tool_span.set_attribute('cache_hit', cache_hit)
+                if isinstance(value, str) and value.startswith('Error'):
+                    tool_span.set_status('error', value[:200])
+                return value
+
+        def lookup(self, *args, **kwargs):
+            cache = _current.get()
+            if cache is None:
+                return func(self, *args, **kwargs), False
+            try:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                arguments = dict(bound.arguments)
+                arguments.pop('self', None)
+                key = json.dumps(_normalize(arguments), sort_keys=True, default=str)
+            except (TypeError, ValueError):
+                return func(self, *args, **kwargs), False
+
+            found, value = cache.get(self.name, key, ttl)
+            if found:
+                return value, True
+            value = func(self, *args, **kwargs)
+            if not (isinstance(value, str) and value.startswith('Error')):
+                cache.put(self.name, key, value, max_entries)
+            return value, False
+        return wrapper
+    return decorator
@@ -0,0 +1,220 @@
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+import numpy as np
+
+from .features import FeatureStore, FeatureSlice
+from .snapshots import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Rule thresholds; override per call with screen(thresholds={...})
+THRESHOLDS = {
+    'zscore': 3.0,  # Rolling z-score of today's value against the trailing window
+    'volume_liquidity': 5.0,  # 24h volume over pool liquidity
+    'liquidity_market_cap': 0.01,  # Pool liquidity over market cap
+    'mindshare_momentum': 1.0,  # Mindshare vs. its EMA (1.0 = doubled)
+    'holder_growth': 0.01,  # Holder growth below which a mindshare jump is not backed by new holders
+    'holder_drop': -0.05,  # Daily holder change
+    'price_drop': -0.3,  # Daily log return
+    'cusum': 4.0,  # CUSUM decision interval, in baseline standard deviations
+}
+# CUSUM allowance: shifts smaller than this many standard deviations are ignored
+CUSUM_DRIFT = 1.0
+# Smallest standard deviation each series is standardized by, as (absolute, share of
+# |baseline mean|), so a steady series with a tiny spread cannot turn small moves into
+# large z-scores or CUSUM shifts
+SCALE_FLOORS = {
+    'volume_24h': (0.0, 0.10),
+    'mindshare': (0.0, 0.05),
+    'holder_growth': (0.01, 0.0),  # 1 point of daily holder growth
+    'price_return': (0.02, 0.0),  # 2% daily move
+}
+# Largest score a single rule adds
+MAX_SEVERITY = 5.0
+# Fewest earlier observations a z-score or CUSUM baseline is computed from
+MIN_HISTORY = 4
+
+def _nan_mean_std(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row-wise mean, sample standard deviation and count of the non-NaN values."""
+    observed = ~np.isnan(values)
+    count = observed.sum(axis=1)
+    mean = np.where(observed, values, 0).sum(axis=1) / np.maximum(count, 1)
+    variance = np.where(observed, (values - mean[:, None]) ** 2, 0).sum(axis=1) / np.maximum(count - 1, 1)
+    return mean, np.sqrt(variance), count
+
+def _floored(std: np.ndarray, mean: np.ndarray, floor: Tuple[float, float]) -> np.ndarray:
+    absolute, relative = floor
+    return np.maximum(std, np.maximum(absolute, relative * np.abs(mean)))
+
+def rolling_zscore(panel: np.ndarray, floor: Tuple[float, float] = (0.0, 0.0)) -> np.ndarray:
+    """
+    Z-score of each row's last value against the row's earlier values; NaN without enough history.
+
+    Args:
+        panel: (tokens, days) matrix, oldest day first
+        floor: Smallest standard deviation, as (absolute, share of |mean|)
+    """
+    if panel.shape[1] < 2:
+        return np.full(panel.shape[0], np.nan)
+    mean, std, count = _nan_mean_std(panel[:, :-1])
+    std = _floored(std, mean, floor)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (panel[:, -1] - mean) / std
+    return np.where((count >= MIN_HISTORY) & (std > 0) & np.isfinite(z), z, np.nan)
+
+def cusum(panel: np.ndarray, drift: Optional[float] = None,
+          floor: Tuple[float, float] = (0.0, 0.0)) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two-sided CUSUM of the second half of each row against the mean of its
+    first half, in units of the whole row's standard deviation. The wider
+    scale makes a shift harder to detect but keeps a handful of quiet
+    baseline days from flagging ordinary noise; the floor keeps near-constant
+    rows from turning tiny steady drifts into large standardized shifts.
+
+    Args:
+        panel: (tokens, days) matrix, oldest day first
+        drift: Allowance in standard deviations; CUSUM_DRIFT by default
+        floor: Smallest standard deviation, as (absolute, share of |baseline mean|)
+
+    Returns:
+        Final upward and downward CUSUM statistics per row (0 without enough baseline)
+    """
+    drift = CUSUM_DRIFT if drift is None else drift
+    tokens, days = panel.shape
+    split = days // 2
+    mean, _, count = _nan_mean_std(panel[:, :split])
+    _, std, _ = _nan_mean_std(panel)
+    std = _floored(std, mean, floor)
+    valid = (count >= MIN_HISTORY // 2) & (std > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        standardized = (panel[:, split:] - mean[:, None]) / std[:, None]
+    standardized[~valid] = 0
+    standardized = np.nan_to_num(standardized, nan=0.0, posinf=0.0, neginf=0.0)
+    up, down = np.zeros(tokens), np.zeros(tokens)
+    for t in range(standardized.shape[1]):
+        up = np.maximum(0, up + standardized[:, t] - drift)
+        down = np.maximum(0, down - standardized[:, t] - drift)
+    return up, down
+
+def load_panel(features: FeatureStore, columns: Tuple[str, ...], days: int = 14,
+               end: Optional[str] = None) -> Tuple[Optional[FeatureSlice], Dict[str, np.ndarray]]:
+    """
+    The last `days` feature slices up to `end`, aligned to the tokens of the latest one.
+
+    Returns:
+        Latest slice and, per column, a (tokens, days) matrix, oldest day first, NaN where missing
+    """
+    available = [d for d in features.days() if end is None or d <= end][-days:]
+    if not available:
+        return None, {}
+    slices = [features.load(d) for d in available]
+    latest = slices[-1]
+    panel = {name: np.full((len(latest), len(slices)), np.nan) for name in columns}
+    for t, feature_slice in enumerate(slices):
+        rows = np.arange(len(latest)) if feature_slice is latest else feature_slice.index(latest.keys)
+        present = rows >= 0
+        for name in columns:
+            panel[name][present, t] = feature_slice.columns[name][rows[present]]
+    return latest, panel
+
+def _align(snapshot: Optional[Snapshot], keys: np.ndarray, metric: str) -> np.ndarray:
+    out = np.full(len(keys), np.nan)
+    if snapshot is None:
+        return out
+    _, snap_idx, key_idx = np.intersect1d(snapshot.keys, keys, assume_unique=True, return_indices=True)
+    out[key_idx] = snapshot.metrics[metric][snap_idx]
+    return out
+
+def screen(features: Optional[FeatureStore] = None, snapshot: Optional[Snapshot] = None, days: int = 14,
+           thresholds: Optional[Dict[str, float]] = None, day: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Screen every token for red flags in one vectorized pass.
+
+    Rules: volume spikes into thin liquidity, mindshare pumps that new holders
+    do not back, holder collapses, thin liquidity against market cap, price
+    crashes, and sustained CUSUM shifts in mindshare, holders and price.
+
+    Args:
+        features: Feature store providing the daily time series
+        snapshot: Universe snapshot for market caps; the latest by default
+        days: Trailing days the z-scores and CUSUM are computed over
+        thresholds: Overrides of THRESHOLDS
+        day: Screen as of this date (YYYY-MM-DD); the latest by default
+
+    Returns:
+        Flagged tokens, highest score first, each with the reasons it was flagged
+    """
+    limits = {**THRESHOLDS, **(thresholds or {})}
+    features = features or FeatureStore()
+    latest, panel = load_panel(features, ('volume_24h', 'mindshare', 'holders', 'price_return', 'holder_growth'), days, day)
+    if latest is None:
+        return []
+    if snapshot is None:
+        snapshot = features.snapshots.latest()
+    c = latest.columns
+    market_cap = _align(snapshot, latest.keys, 'market_cap')
+
+    volume_z = rolling_zscore(panel['volume_24h'], SCALE_FLOORS['volume_24h'])
+    mindshare_z = rolling_zscore(panel['mindshare'], SCALE_FLOORS['mindshare'])
+    mindshare_up, _ = cusum(panel['mindshare'], floor=SCALE_FLOORS['mindshare'])
+    _, holders_down = cusum(panel['holder_growth'], floor=SCALE_FLOORS['holder_growth'])
+    _, price_down = cusum(panel['price_return'], floor=SCALE_FLOORS['price_return'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        liquidity_ratio = c['liquidity'] / market_cap
+
+    # NaN compares False, so a missing reading never triggers a rule on its own
+    rules = [
+        ('volume_spike_thin_liquidity',
+         (volume_z >= limits['zscore']) & (c['volume_liquidity'] >= limits['volume_liquidity']),
+         volume_z / limits['zscore'],
+         lambda i: f"24h volume {volume_z[i]:.1f} sd above its {days}-day mean at {c['volume_liquidity'][i]:.1f}x liquidity"),
+        ('mindshare_pump',
+         ((mindshare_z >= limits['zscore']) | (c['mindshare_momentum'] >= limits['mindshare_momentum']))
+         & ~(c['holder_growth'] >= limits['holder_growth']),
+         np.fmax(mindshare_z / limits['zscore'], c['mindshare_momentum'] / limits['mindshare_momentum']),
+         lambda i: f"mindshare {c['mindshare_momentum'][i]:+.0%} vs its EMA (z {mindshare_z[i]:.1f}) "
+                   f"while holders changed {c['holder_growth'][i]:+.1%}"),
+        ('holder_collapse',
+         c['holder_growth'] <= limits['holder_drop'],
+         c['holder_growth'] / limits['holder_drop'],
+         lambda i: f"holders {c['holder_growth'][i]:+.1%} in a day"),
+        ('thin_liquidity',
+         liquidity_ratio < limits['liquidity_market_cap'],
+         limits['liquidity_market_cap'] / np.maximum(liquidity_ratio, 1e-9),
+         lambda i: f"liquidity only {liquidity_ratio[i]:.2%} of market cap"),
+        ('price_crash',
+         c['price_return'] <= limits['price_drop'],
+         c['price_return'] / limits['price_drop'],
+         lambda i: f"price {np.expm1(c['price_return'][i]):+.0%} in a day"),
+        ('mindshare_shift_up',
+         mindshare_up >= limits['cusum'],
+         mindshare_up / limits['cusum'],
+         lambda i: f"sustained mindshare rise (CUSUM {mindshare_up[i]:.1f})"),
+        ('holder_shift_down',
+         holders_down >= limits['cusum'],
+         holders_down / limits['cusum'],
+         lambda i: f"sustained slowdown in holder growth (CUSUM {holders_down[i]:.1f})"),
+        ('price_shift_down',
+         price_down >= limits['cusum'],
+         price_down / limits['cusum'],
+         lambda i: f"sustained price decline (CUSUM {price_down[i]:.1f})"),
+    ]
+
+    # Each rule adds its severity (multiples of its threshold), capped so one extreme reading does not swamp the rest
+    score = np.zeros(len(latest))
+    for _, mask, severity, _ in rules:
+        score += np.where(mask, np.clip(np.nan_to_num(severity, nan=1.0), 1.0, MAX_SEVERITY), 0)
+    flagged = np.flatnonzero(score > 0)
+    flagged = flagged[np.argsort(-score[flagged], kind='stable')]
+
+    results = []
+    for i in flagged:
+        results.append({
+            'name': str(latest.names[i]),
+            'key': str(latest.keys[i]),
+            'score': round(float(score[i]), 2),
+            'flags': [{'rule': name, 'reason': reason(i)} for name, mask, _, reason in rules if mask[i]],
+        })
+    logger.info(f"Screened {len(latest)} tokens as of {latest.day}: {len(results)} flagged")
+    return results
@@ -0,0 +1,212 @@
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+import logging
+import os
+
+import numpy as np
+
+from .prefetch import TokenDataset
+
+logger = logging.getLogger(__name__)
+
+# Numeric TokenRecord fields kept in each snapshot; missing values are NaN
+METRICS = (
+    'price', 'market_cap', 'liquidity', 'volume_24h', 'holders', 'mindshare',
+    'smart_followers', 'avg_engagements', 'tvl', 'tweet_count'
+)
+
+def default_snapshot_dir() -> Path:
+    workspace_root = Path(__file__).parent.parent
+    return workspace_root / ".cache" / "snapshots"
+
+@dataclass
+class Snapshot:
+    """
+    Columnar copy of one token dataset: one array per field, one row per
+    token, rows keyed by lowercased 'chain:address'.
+    """
+    taken_at: str
+    keys: np.ndarray
+    names: np.ndarray
+    chains: np.ndarray
+    addresses: np.ndarray
+    ranks: np.ndarray  # 1-based market cap rank, tokens without a market cap last
+    metrics: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_dataset(cls, dataset: TokenDataset) -> 'Snapshot':
+        tokens = dataset.tokens
+        metrics = {
+            name: np.array([np.nan if getattr(t, name) is None else getattr(t, name) for t in tokens], dtype=np.float64)
+            for name in METRICS
+        }
+        order = np.argsort(-np.nan_to_num(metrics['market_cap'], nan=-np.inf), kind='stable')
+        ranks = np.empty(len(tokens), dtype=np.int32)
+        ranks[order] = np.arange(1, len(tokens) + 1)
+        return cls(
+            taken_at=dataset.generated_at or datetime.now().isoformat(timespec='seconds'),
+            keys=np.array([t.coin.lower() for t in tokens], dtype=str),
+            names=np.array([t.name for t in tokens], dtype=str),
+            chains=np.array([t.chain for t in tokens], dtype=str),
+            addresses=np.array([t.address for t in tokens], dtype=str),
+            ranks=ranks,
+            metrics=metrics
+        )
+
+    def row(self, i: int) -> Dict[str, Any]:
+        return {'name': str(self.names[i]), 'chain': str(self.chains[i]), 'address': str(self.addresses[i]),
+                'rank': int(self.ranks[i])}
+
+class SnapshotStore:
+    """
+    One compressed .npz snapshot of the token universe per gathering run.
+
+    Snapshots hold plain numeric and string arrays only, so they load without
+    pickle, and a month of daily snapshots of ~1000 tokens takes a few MB.
+    """
+
+    def __init__(self, root: Optional[str] = None, keep: int = 365):
+        self.root = Path(root) if root else default_snapshot_dir()
+        self.keep = keep
+
+    def names(self) -> List[str]:
+        """Stored snapshot names (their timestamps), oldest first."""
+        if not self.root.exists():
+            return []
+        return sorted(path.stem for path in self.root.glob('*.npz'))
+
+    def save(self, snapshot: Snapshot) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = datetime.fromisoformat(snapshot.taken_at).strftime('%Y%m%d-%H%M%S')
+        path = self.root / f"{name}.npz"
+        tmp = self.root / f"{name}.{os.getpid()}.tmp"
+        with tmp.open('wb') as f:
+            np.savez_compressed(
+                f, taken_at=np.array(snapshot.taken_at), keys=snapshot.keys, names=snapshot.names,
+                chains=snapshot.chains, addresses=snapshot.addresses, ranks=snapshot.ranks,
+                **{f"metric_{name}": values for name, values in snapshot.metrics.items()}
+            )
+        os.replace(tmp, path)
+        for old in self.names()[:-self.keep]:
+            (self.root / f"{old}.npz").unlink(missing_ok=True)
+        return path
+
+    def record(self, dataset: TokenDataset) -> Optional[Path]:
+        """Snapshot a token dataset; empty datasets (a failed crawl) are skipped."""
+        if not dataset.tokens:
+            return None
+        return self.save(Snapshot.from_dataset(dataset))
+
+    def load(self, name: str) -> Snapshot:
+        with np.load(self.root / f"{name}.npz", allow_pickle=False) as data:
+            return Snapshot(
+                taken_at=str(data['taken_at']),
+                keys=data['keys'], names=data['names'], chains=data['chains'],
+                addresses=data['addresses'], ranks=data['ranks'],
+                metrics={key[len('metric_'):]: data[key] for key in data.files if key.startswith('metric_')}
+            )
+
+    def latest(self) -> Optional[Snapshot]:
+        names = self.names()
+        return self.load(names[-1]) if names else None
+
+    def before(self, name: str, since: Optional[str] = None) -> Optional[Snapshot]:
+        """
+        Baseline to compare snapshot `name` against: the one just before it, or
+        with `since` (YYYY-MM-DD), the last one taken on or before that date.
+        """
+        names = [n for n in self.names() if n < name]
+        if since:
+            cutoff = since.replace('-', '') + '-999999'
+            names = [n for n in names if n <= cutoff] or names[:1]
+        return self.load(names[-1]) if names else None
+
+@dataclass
+class SnapshotDiff:
+    old_taken_at: str
+    new_taken_at: str
+    entrants: List[Dict[str, Any]]
+    dropouts: List[Dict[str, Any]]
+    rank_changes: List[Dict[str, Any]]
+    metric_changes: Dict[str, List[Dict[str, Any]]]
+    counts: Dict[str, int]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'from': self.old_taken_at,
+            'to': self.new_taken_at,
+            'counts': self.counts,
+            'new_entrants': self.entrants,
+            'dropouts': self.dropouts,
+            'rank_changes': self.rank_changes,
+            'metric_changes': self.metric_changes,
+        }
+
+def _value(x: float) -> Optional[float]:
+    return None if np.isnan(x) else float(x)
+
+def diff_snapshots(old: Snapshot, new: Snapshot, metrics=('market_cap', 'liquidity', 'volume_24h', 'holders', 'mindshare'),
+                   min_rank_change: int = 5, min_relative_change: float = 0.25, limit: int = 15) -> SnapshotDiff:
+    """
+    Changes between two snapshots, joined on contract address.
+
+    Args:
+        old: Baseline snapshot
+        new: Current snapshot
+        metrics: Metrics to report changes for
+        min_rank_change: Smallest market cap rank move to report
+        min_relative_change: Smallest relative metric change to report (0.25 = 25%)
+        limit: Maximum entries per list; entrants and dropouts by market cap, changes by size
+
+    Returns:
+        SnapshotDiff with totals in `counts` and the largest changes listed
+    """
+    _, old_idx, new_idx = np.intersect1d(old.keys, new.keys, assume_unique=True, return_indices=True)
+    entered = np.flatnonzero(~np.isin(new.keys, old.keys, assume_unique=True))
+    dropped = np.flatnonzero(~np.isin(old.keys, new.keys, assume_unique=True))
+    entered = entered[np.argsort(new.ranks[entered], kind='stable')]
+    dropped = dropped[np.argsort(old.ranks[dropped], kind='stable')]
+
+    def listing(snapshot: Snapshot, rows: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {**snapshot.row(i), **{m: _value(snapshot.metrics[m][i]) for m in metrics if m in snapshot.metrics}}
+            for i in rows[:limit]
+        ]
+
+    # Positive moves are up the ranking
+    rank_delta = old.ranks[old_idx].astype(np.int64) - new.ranks[new_idx]
+    moved = np.flatnonzero(np.abs(rank_delta) >= min_rank_change)
+    moved = moved[np.argsort(-np.abs(rank_delta[moved]), kind='stable')]
+    rank_changes = [
+        {**new.row(new_idx[j]), 'previous_rank': int(old.ranks[old_idx[j]]), 'change': int(rank_delta[j])}
+        for j in moved[:limit]
+    ]
+
+    metric_changes, counts = {}, {}
+    for m in metrics:
+        if m not in old.metrics or m not in new.metrics:
+            continue
+        before, after = old.metrics[m][old_idx], new.metrics[m][new_idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = (after - before) / np.abs(before)
+        significant = np.flatnonzero(np.isfinite(relative) & (np.abs(relative) >= min_relative_change))
+        significant = significant[np.argsort(-np.abs(relative[significant]), kind='stable')]
+        counts[f"{m}_changes"] = int(len(significant))
+        if len(significant):
+            metric_changes[m] = [
+                {**new.row(new_idx[j]), 'before': float(before[j]), 'after': float(after[j]),
+                 'change_pct': round(float(relative[j]) * 100, 1)}
+                for j in significant[:limit]
+            ]
+
+    counts = {
+        'tokens_before': len(old), 'tokens_after': len(new), 'new_entrants': int(len(entered)),
+        'dropouts': int(len(dropped)), 'rank_changes': int(len(moved)), **counts
+    }
+    return SnapshotDiff(old.taken_at, new.taken_at, listing(new, entered), listing(old, dropped),
+                        rank_changes, metric_changes, counts)
@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional, Callable, Any, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+
+from .api.Cookie import CookieAPIError
+from .prefetch import TokenDataset, TokenRecord, run_prefetch
+
+if TYPE_CHECKING:
+    from defillama import DefiLlama
+    from .api.Cookie import CookieAPI
+
+logger = logging.getLogger(__name__)
+
+# Date windows the agents search tweets over, in days back from today
+TWEET_WINDOWS = (1, 7)
+
+class RateBudgetExhausted(CookieAPIError):
+    """Raised once a background job has used up its share of the rate limit."""
+
+class RateBudget:
+    """
+    Low-priority share of the Cookie rate limit for background jobs.
+
+    Network requests are spaced to `requests_per_minute`, and stop altogether
+    once the remaining quota reported in the X-RateLimit headers falls below
+    `reserve` of the limit, leaving the rest for the crew at peak time.
+    Installed as CookieAPI.throttle, so cache hits cost nothing.
+    """
+
+    def __init__(self, api: 'CookieAPI', requests_per_minute: float = 20, reserve: float = 0.5,
+                 max_requests: Optional[int] = None):
+        self.api = api
+        self.interval = 60.0 / requests_per_minute
+        self.reserve = reserve
+        self.max_requests = max_requests
+        self.used = 0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def _remaining_share(self) -> Optional[float]:
+        limits = getattr(self.api, 'rate_limit', None) or {}
+        try:
+            return int(limits['remaining']) / int(limits['limit'])
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            return None
+
+    def __call__(self) -> None:
+        with self._lock:
+            share = self._remaining_share()
+            if share is not None and share < self.reserve:
+                raise RateBudgetExhausted(f"Only {share:.0%} of the rate limit left, reserved for the crew")
+            if self.max_requests is not None and self.used >= self.max_requests:
+                raise RateBudgetExhausted(f"Warm-up request budget of {self.max_requests} used")
+            wait = self._next_slot - time.monotonic()
+            self._next_slot = max(self._next_slot, time.monotonic()) + self.interval
+            self.used += 1
+        if wait > 0:
+            time.sleep(wait)
+
+def _warm(calls: List[Callable[[], Any]], max_workers: int) -> Dict[str, int]:
+    """Run cache-filling calls, counting successes and failures."""
+    stats = {'targets': len(calls), 'warmed': 0, 'failed': 0}
+
+    def attempt(call: Callable[[], Any]) -> bool:
+        try:
+            call()
+            return True
+        except CookieAPIError as e:
+            logger.debug(f"Warm-up call failed: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for ok in pool.map(attempt, calls):
+            stats['warmed' if ok else 'failed'] += 1
+    return stats
+
+def warm_agent_details(api: 'CookieAPI', candidates: List[TokenRecord], interval: str = '_7Days',
+                       max_workers: int = 4) -> Dict[str, int]:
+    """Cache get_agent_details responses for the candidate tokens."""
+    return _warm([
+        (lambda token=token: api.get_agent_by_contract_address(token.address, interval))
+        for token in candidates
+    ], max_workers)
+
+def warm_tweet_searches(api: 'CookieAPI', candidates: List[TokenRecord], windows=TWEET_WINDOWS,
+                        max_workers: int = 4) -> Dict[str, int]:
+    """Cache tweet searches for the candidates over the date windows agents ask for."""
+    today = datetime.now().date()
+    calls = []
+    for token in candidates:
+        query = token.twitter[0] if token.twitter else token.name
+        for days in windows:
+            from_date = (today - timedelta(days=days)).isoformat()
+            calls.append(lambda query=query, from_date=from_date: api.search_tweets(query, from_date, today.isoformat()))
+    return _warm(calls, max_workers)
+
+def warm_caches(
+    api: Optional['CookieAPI'] = None,
+    llama: Optional['DefiLlama'] = None,
+    candidate_limit: int = 40,
+    refresh_after: timedelta = timedelta(minutes=20),
+    requests_per_minute: float = 20,
+    reserve: float = 0.5,
+    max_requests: Optional[int] = 400
+) -> Dict[str, Any]:
+    """
+    Refresh the Cookie response cache and the token dataset ahead of a heavy job.
+
+    Cached responses younger than `refresh_after` are kept; older ones are
+    fetched again, so they stay valid through the following hour. Every network
+    request goes through a RateBudget.
+
+    Args:
+        api: Cookie API client; a production client on the shared disk cache by default
+        llama: DefiLlama client
+        candidate_limit: Largest tokens by market cap to warm details and tweet searches for
+        refresh_after: Age after which a cached response is refreshed
+        requests_per_minute: Request rate allowed to the warm-up
+        reserve: Share of the rate limit left untouched
+        max_requests: Hard cap on warm-up network requests
+
+    Returns:
+        Coverage statistics per cache
+    """
+    from .api.Cookie import APICache, create_production_instance
+    if api is None:
+        api = create_production_instance()
+        api.use_cache = True
+        # Entries older than refresh_after read as expired and are rewritten
+        api.cache = APICache(cache_duration=refresh_after)
+    budget = RateBudget(api, requests_per_minute, reserve, max_requests)
+    api.throttle = budget
+    started = time.perf_counter()
+
+    stats: Dict[str, Any] = {}
+    try:
+        # Universe pages, prices, TVL and one-day tweet counts
+        try:
+            dataset = run_prefetch(api=api, llama=llama, tweet_limit=candidate_limit)
+        except Exception as e:
+            # Still warm the candidates from the last dataset
+            logger.warning(f"Warm-up pre-fetch failed: {e}")
+            dataset = TokenDataset.load() or TokenDataset(generated_at='', errors={'universe': str(e)})
+        priced = sum(1 for t in dataset.tokens if t.price is not None)
+        stats['universe'] = {'tokens': len(dataset.tokens), 'priced': priced, 'errors': dataset.errors}
+
+        candidates = dataset.top('market_cap', candidate_limit)
+        stats['agent_details'] = warm_agent_details(api, candidates)
+        stats['tweet_searches'] = warm_tweet_searches(api, candidates)
+    finally:
+        api.throttle = None
+
+    stats['requests'] = budget.used
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+def format_coverage(stats: Dict[str, Any]) -> str:
+    universe = stats.get('universe', {})
+    parts = [f"universe {universe.get('tokens', 0)} tokens ({universe.get('priced', 0)} priced)"]
+    for name in ('agent_details', 'tweet_searches'):
+        s = stats.get(name)
+        if s:
+            coverage = s['warmed'] / s['targets'] if s['targets'] else 1.0
+            parts.append(f"{name} {s['warmed']}/{s['targets']} ({coverage:.0%})")
+    return f"{', '.join(parts)}; {stats.get('requests', 0)} requests in {stats.get('seconds', 0):.0f}s"
@@ -0,0 +1,362 @@
+from web3 import Web3
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, asdict
+from collections import deque
+from pathlib import Path
+import numpy as np
+
+from indexfundmanagercrew.tracing import span
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+ERC20_DECIMALS_ABI = [{
+    "constant": True,
+    "inputs": [],
+    "name": "decimals",
+    "outputs": [{"name": "", "type": "uint8"}],
+    "type": "function"
+}]
+
+@dataclass
+class WhaleMovement:
+    block_number: int
+    sender: str
+    recipient: str
+    amount: float
+    supply_share: float
+
+class HolderLedger:
+    """
+    Holder-balance ledger for an ERC-20 token on Base chain (chain_id: 8453),
+    built incrementally from Transfer logs.
+
+    Balances live in a dense float64 array indexed by address id, so
+    concentration queries are single NumPy passes instead of replays from
+    genesis. Amounts are kept in whole-token units; the ledger is meant for
+    distribution analytics, not for exact accounting.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        token_address: str,
+        start_block: Optional[int] = None,
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_interval: int = 50_000,
+        max_checkpoints: int = 3,
+        block_chunk_size: int = 5_000,
+        whale_threshold: float = 0.005
+    ):
+        """
+        Initialize the ledger, resuming from the latest checkpoint if one exists.
+
+        Args:
+            rpc_url: RPC endpoint for Base chain
+            token_address: Address of the ERC-20 token
+            start_block: Block to start from when there is no checkpoint (ideally the token deployment block);
+                without either the ledger is not indexed and will not sync
+            checkpoint_dir: Directory for balance checkpoints
+            checkpoint_interval: Number of blocks between checkpoints
+            max_checkpoints: Number of checkpoints to keep on disk
+            block_chunk_size: Initial block range for each eth_getLogs request
+            whale_threshold: Share of supply above which a transfer is recorded as a whale movement
+        """
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.chain_id = 8453  # Base chain
+        self.token_address = Web3.to_checksum_address(token_address)
+
+        if checkpoint_dir is None:
+            workspace_root = Path(__file__).parent.parent.parent
+            checkpoint_dir = workspace_root / ".cache" / "holder_ledger" / self.token_address.lower()
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        self.block_chunk_size = block_chunk_size
+        self.whale_threshold = whale_threshold
+
+        self._decimals: Optional[int] = None
+        self._address_ids: Dict[str, int] = {}
+        self._addresses: List[str] = []
+        self._balances = np.zeros(1024, dtype=np.float64)
+        self.total_supply = 0.0
+        self.last_block = -1 if start_block is None else start_block - 1
+        self._indexed = start_block is not None
+        self._last_checkpoint_block = self.last_block
+        self.whale_movements: deque = deque(maxlen=1000)
+
+        self._load_latest_checkpoint()
+
+    @property
+    def decimals(self) -> int:
+        """Token decimals, read once from the contract."""
+        if self._decimals is None:
+            contract = self.w3.eth.contract(address=self.token_address, abi=ERC20_DECIMALS_ABI)
+            self._decimals = contract.functions.decimals().call()
+        return self._decimals
+
+    @property
+    def balances(self) -> np.ndarray:
+        """View of the balance table, one entry per known address id."""
+        return self._balances[:len(self._addresses)]
+
+    def _address_id(self, address: str) -> int:
+        """Get the id for an address, growing the balance table as needed."""
+        address_id = self._address_ids.get(address)
+        if address_id is None:
+            address_id = len(self._addresses)
+            self._address_ids[address] = address_id
+            self._addresses.append(address)
+            if address_id >= len(self._balances):
+                grown = np.zeros(len(self._balances) * 2, dtype=np.float64)
+                grown[:len(self._balances)] = self._balances
+                self._balances = grown
+        return address_id
+
+    def apply_transfers(self, transfers: List[Dict[str, Any]]) -> None:
+        """
+        Apply a batch of decoded transfers to the balance table.
+
+        Args:
+            transfers: Dicts with 'block_number', 'from', 'to' and 'value' (raw integer amount),
+                in chain order
+        """
+        if not transfers:
+            return
+
+        scale = 10 ** self.decimals
+        amounts = np.array([t['value'] / scale for t in transfers], dtype=np.float64)
+        senders = [t['from'] for t in transfers]
+        recipients = [t['to'] for t in transfers]
+
+        mints = np.array([s == ZERO_ADDRESS for s in senders])
+        burns = np.array([r == ZERO_ADDRESS for r in recipients])
+        sender_ids = np.array([self._address_id(s) for s in senders], dtype=np.int64)
+        recipient_ids = np.array([self._address_id(r) for r in recipients], dtype=np.int64)
+
+        # The zero address is tracked through total_supply, not as a holder
+        np.subtract.at(self._balances, sender_ids[~mints], amounts[~mints])
+        np.add.at(self._balances, recipient_ids[~burns], amounts[~burns])
+        self.total_supply += float(amounts[mints].sum() - amounts[burns].sum())
+
+        if self.total_supply > 0:
+            shares = amounts / self.total_supply
+            for i in np.flatnonzero(shares >= self.whale_threshold):
+                self.whale_movements.append(WhaleMovement(
+                    block_number=transfers[i]['block_number'],
+                    sender=senders[i],
+                    recipient=recipients[i],
+                    amount=float(amounts[i]),
+                    supply_share=float(shares[i])
+                ))
+
+    def _decode_log(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Decode a raw Transfer log; returns None for non-standard (e.g. ERC-721) logs."""
+        topics = log['topics']
+        if len(topics) != 3:
+            return None
+        data = log['data']
+        data = data.hex() if isinstance(data, (bytes, bytearray)) else data
+        return {
+            'block_number': log['blockNumber'],
+            'from': Web3.to_checksum_address("0x" + bytes(topics[1])[-20:].hex()),
+            'to': Web3.to_checksum_address("0x" + bytes(topics[2])[-20:].hex()),
+            'value': int(data, 16) if data not in ("", "0x") else 0
+        }
+
+    def _fetch_transfers(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """Fetch and decode Transfer logs for a block range, splitting it if the node refuses."""
+        try:
+            with span('eth_getLogs Transfer', kind='rpc', from_block=from_block, to_block=to_block):
+                logs = self.w3.eth.get_logs({
+                    'fromBlock': from_block,
+                    'toBlock': to_block,
+                    'address': self.token_address,
+                    'topics': [TRANSFER_TOPIC]
+                })
+        except Exception:
+            if to_block <= from_block:
+                raise
+            # Most providers cap the number of results per request
+            middle = (from_block + to_block) // 2
+            self.block_chunk_size = max(1, (to_block - from_block + 1) // 2)
+            return self._fetch_transfers(from_block, middle) + self._fetch_transfers(middle + 1, to_block)
+
+        transfers = [self._decode_log(log) for log in logs]
+        return [t for t in transfers if t is not None]
+
+    @property
+    def indexed(self) -> bool:
+        """Whether the ledger has a starting point: a checkpoint or an explicit start block."""
+        return self._indexed
+
+    def sync(self, to_block: Optional[int] = None, max_blocks: Optional[int] = None) -> int:
+        """
+        Bring the ledger up to date with the chain.
+
+        Args:
+            to_block: Last block to include (defaults to the latest block)
+            max_blocks: Scan at most this many blocks in this call; progress is
+                checkpointed so the next call continues where this one stopped
+
+        Returns:
+            The last block applied to the ledger
+        """
+        if not self.indexed:
+            raise ValueError(f"No checkpoint or start block to index {self.token_address} from")
+        if to_block is None:
+            to_block = self.w3.eth.block_number
+
+        from_block = self.last_block + 1
+        capped = max_blocks is not None and to_block - from_block + 1 > max_blocks
+        if capped:
+            to_block = from_block + max_blocks - 1
+        while from_block <= to_block:
+            chunk_end = min(from_block + self.block_chunk_size - 1, to_block)
+            self.apply_transfers(self._fetch_transfers(from_block, chunk_end))
+            self.last_block = chunk_end
+            from_block = chunk_end + 1
+
+            if self.last_block - self._last_checkpoint_block >= self.checkpoint_interval:
+                self.save_checkpoint()
+
+        if capped and self.last_block > self._last_checkpoint_block:
+            self.save_checkpoint()
+        return self.last_block
+
+    def save_checkpoint(self) -> Path:
+        """Persist the balance table and whale movement history, and prune old checkpoints."""
+        path = self.checkpoint_dir / f"{self.last_block:012d}.npz"
+        movements = list(self.whale_movements)
+        np.savez_compressed(
+            path,
+            addresses=np.array(self._addresses, dtype='<U42'),
+            balances=self.balances,
+            meta=np.array([self.last_block, self.total_supply, self.decimals], dtype=np.float64),
+            whale_blocks=np.array([m.block_number for m in movements], dtype=np.int64),
+            whale_senders=np.array([m.sender for m in movements], dtype='<U42'),
+            whale_recipients=np.array([m.recipient for m in movements], dtype='<U42'),
+            whale_amounts=np.array([m.amount for m in movements], dtype=np.float64),
+            whale_shares=np.array([m.supply_share for m in movements], dtype=np.float64)
+        )
+        self._last_checkpoint_block = self.last_block
+
+        checkpoints = sorted(self.checkpoint_dir.glob('*.npz'))
+        for old in checkpoints[:-self.max_checkpoints]:
+            old.unlink()
+        return path
+
+    def _load_latest_checkpoint(self) -> None:
+        """Restore state from the newest checkpoint on disk, if any."""
+        checkpoints = sorted(self.checkpoint_dir.glob('*.npz'))
+        if not checkpoints:
+            return
+
+        with np.load(checkpoints[-1]) as checkpoint:
+            addresses = [str(a) for a in checkpoint['addresses']]
+            balances = checkpoint['balances']
+            last_block, total_supply, decimals = checkpoint['meta']
+            # Checkpoints written before whale movements were persisted have none
+            if 'whale_blocks' in checkpoint.files:
+                self.whale_movements.extend(
+                    WhaleMovement(int(block), str(sender), str(recipient), float(amount), float(share))
+                    for block, sender, recipient, amount, share in zip(
+                        checkpoint['whale_blocks'], checkpoint['whale_senders'], checkpoint['whale_recipients'],
+                        checkpoint['whale_amounts'], checkpoint['whale_shares']
+                    )
+                )
+
+        self._addresses = addresses
+        self._address_ids = {address: i for i, address in enumerate(addresses)}
+        self._balances = np.zeros(max(1024, len(addresses) * 2), dtype=np.float64)
+        self._balances[:len(addresses)] = balances
+        self.total_supply = float(total_supply)
+        self._decimals = int(decimals)
+        self.last_block = int(last_block)
+        self._last_checkpoint_block = self.last_block
+        self._indexed = True
+
+    def _holder_balances(self, min_balance: float = 0.0) -> np.ndarray:
+        """Positive balances above a dust threshold."""
+        balances = self.balances
+        return balances[balances > max(min_balance, 1e-12)]
+
+    def holder_count(self, min_balance: float = 0.0) -> int:
+        """Number of addresses holding more than min_balance tokens."""
+        return int(self._holder_balances(min_balance).size)
+
+    def top_n_share(self, n: int = 10) -> float:
+        """
+        Share of the held supply owned by the n largest holders.
+
+        Args:
+            n: Number of top holders
+
+        Returns:
+            Share between 0 and 1
+        """
+        balances = self._holder_balances()
+        total = balances.sum()
+        if total <= 0:
+            return 0.0
+        if n < balances.size:
+            balances = np.partition(balances, balances.size - n)[-n:]
+        return float(balances.sum() / total)
+
+    def gini(self) -> float:
+        """Gini coefficient of holder balances (0 = equal, 1 = one holder owns everything)."""
+        balances = np.sort(self._holder_balances())
+        n = balances.size
+        if n == 0 or balances.sum() <= 0:
+            return 0.0
+        ranks = np.arange(1, n + 1, dtype=np.float64)
+        return float((2.0 * np.dot(ranks, balances)) / (n * balances.sum()) - (n + 1.0) / n)
+
+    def top_holders(self, n: int = 10) -> List[Dict[str, Any]]:
+        """The n largest holders with their balances and supply shares."""
+        balances = self.balances
+        n = min(n, balances.size)
+        if n == 0:
+            return []
+        top_ids = np.argpartition(balances, balances.size - n)[-n:]
+        top_ids = top_ids[np.argsort(balances[top_ids])[::-1]]
+        held = self._holder_balances().sum()
+        return [
+            {
+                'address': self._addresses[i],
+                'balance': float(balances[i]),
+                'share': float(balances[i] / held) if held > 0 else 0.0
+            }
+            for i in top_ids if balances[i] > 0
+        ]
+
+    def recent_whale_movements(self, since_block: Optional[int] = None, min_share: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Whale-sized transfers recorded while syncing.
+
+        Args:
+            since_block: Only include movements at or after this block
+            min_share: Only include movements of at least this share of supply
+
+        Returns:
+            List of movements, most recent first
+        """
+        movements = [
+            m for m in self.whale_movements
+            if (since_block is None or m.block_number >= since_block)
+            and (min_share is None or m.supply_share >= min_share)
+        ]
+        return [asdict(m) for m in reversed(movements)]
+
+    def distribution_summary(self, top_ns: tuple = (10, 50, 100)) -> Dict[str, Any]:
+        """Concentration metrics used for the index risk screen."""
+        return {
+            'token_address': self.token_address,
+            'last_block': self.last_block,
+            'holders': self.holder_count(),
+            'gini': self.gini(),
+            'top_shares': {f"top_{n}": self.top_n_share(n) for n in top_ns},
+            'whale_movements': len(self.whale_movements)
+        }
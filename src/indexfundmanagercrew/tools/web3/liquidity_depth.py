@@ -0,0 +1,513 @@
+from web3 import Web3
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+from dataclasses import dataclass, field
+import numpy as np
+
+from indexfundmanagercrew.tracing import span
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Quote assets on Base chain used for pool discovery
+WETH_ADDRESS = "0x4200000000000000000000000000000000000006"
+USDC_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+DEFAULT_QUOTES = [WETH_ADDRESS, USDC_ADDRESS]
+
+# Uniswap-style factories on Base chain
+V2_FACTORIES = {
+    'uniswap_v2': ("0x8909Dc15e40173Ff4699343b6eB8132c65e18eC6", 0.003),
+}
+V3_FACTORIES = {
+    'uniswap_v3': ("0x33128a8fC17869897dcE68Ed026d694621f6FDfD", (100, 500, 3000, 10000)),
+}
+
+# Fractional price moves at which every pool's depth is evaluated
+PRICE_MOVE_GRID = np.concatenate(([0.0], np.geomspace(1e-6, 20.0, 400)))
+
+@dataclass
+class PoolSnapshot:
+    """
+    Liquidity of a single pool expressed as sqrt-price segments.
+
+    A constant-product (V2) pool is one segment covering (0, inf); a
+    concentrated-liquidity (V3) pool has one segment per initialized-tick
+    interval that was read. Prices are in raw token1-per-token0 units.
+    """
+    address: str
+    protocol: str
+    token0: str
+    token1: str
+    fee: float
+    sqrt_price: float
+    seg_lo: np.ndarray
+    seg_hi: np.ndarray
+    seg_liquidity: np.ndarray
+
+    def amounts_to_sqrt_price(self, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Raw token amounts traded (before fees) to move the pool to each target sqrt price.
+
+        Args:
+            targets: Target sqrt prices, shape (M,)
+
+        Returns:
+            Tuple of (amount0, amount1) absolute deltas, each shape (M,)
+        """
+        targets = np.asarray(targets, dtype=np.float64)[:, None]
+        low = np.minimum(targets, self.sqrt_price)
+        high = np.maximum(targets, self.sqrt_price)
+        lo_eff = np.maximum(self.seg_lo[None, :], low)
+        hi_eff = np.minimum(self.seg_hi[None, :], high)
+        overlap = hi_eff > lo_eff
+        lo_eff = np.where(overlap, lo_eff, 1.0)
+        hi_eff = np.where(overlap, hi_eff, 1.0)
+        liquidity = self.seg_liquidity[None, :]
+        amount0 = np.sum(liquidity * (1.0 / lo_eff - 1.0 / hi_eff), axis=1)
+        amount1 = np.sum(liquidity * (hi_eff - lo_eff), axis=1)
+        return amount0, amount1
+
+@dataclass
+class TokenDepth:
+    """Aggregated depth curve for one token across all of its pools."""
+    token: str
+    side: str
+    reference_price: float
+    pools: List[str] = field(default_factory=list)
+    notional_usd: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    tokens: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    @property
+    def average_impact(self) -> np.ndarray:
+        """Average execution-price impact at every point of the curve."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.side == 'buy':
+                impact = self.notional_usd / (self.tokens * self.reference_price) - 1.0
+            else:
+                impact = 1.0 - self.notional_usd / (self.tokens * self.reference_price)
+        impact[0] = 0.0
+        return np.nan_to_num(impact, nan=0.0)
+
+    def price_impact(self, trade_sizes_usd: Sequence[float]) -> np.ndarray:
+        """
+        Price impact for a vector of trade sizes, routed optimally across pools.
+
+        Args:
+            trade_sizes_usd: Trade sizes in USD
+
+        Returns:
+            Impact per trade size as a fraction of the reference price; inf where the
+            known liquidity cannot fill the trade
+        """
+        sizes = np.asarray(trade_sizes_usd, dtype=np.float64)
+        if self.reference_price <= 0:
+            return np.full(sizes.shape, np.inf)
+        if self.side == 'buy':
+            max_size = self.notional_usd[-1]
+            tokens = np.interp(sizes, self.notional_usd, self.tokens)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                impact = sizes / (tokens * self.reference_price) - 1.0
+        else:
+            # Sell sizes are notional at the reference price
+            token_in = sizes / self.reference_price
+            max_size = self.tokens[-1] * self.reference_price
+            received = np.interp(token_in, self.tokens, self.notional_usd)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                impact = 1.0 - received / sizes
+        impact = np.where(sizes <= 0, 0.0, impact)
+        return np.where(sizes > max_size, np.inf, impact)
+
+    def max_size_for_impact(self, max_impact: float) -> Tuple[float, bool]:
+        """
+        Largest trade (USD) whose average impact stays within max_impact.
+
+        Returns:
+            Tuple of (size, exceeds_window). When the curve never reaches
+            max_impact, the size is the whole known depth and only a lower
+            bound (V3 liquidity beyond the ticks read is not counted), and
+            exceeds_window is True
+        """
+        if self.reference_price <= 0:
+            return 0.0, False
+        impact = np.maximum.accumulate(self.average_impact)
+        if self.side == 'buy':
+            sizes = self.notional_usd
+        else:
+            sizes = self.tokens * self.reference_price
+        if impact[-1] < max_impact:
+            return float(sizes[-1]), True
+        return float(np.interp(max_impact, impact, sizes)), False
+
+class LiquidityDepthEngine:
+    """
+    Snapshots pool liquidity on Base chain (chain_id: 8453) through Multicall3
+    and computes price impact for whole vectors of trade sizes with NumPy.
+
+    Every read stage (pool discovery, pool state, tick bitmaps, tick
+    liquidity) is a single batched multicall over the whole token universe.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        quote_tokens: Optional[List[str]] = None,
+        tick_words: int = 1,
+        batch_size: int = 500
+    ):
+        """
+        Initialize the depth engine.
+
+        Args:
+            rpc_url: RPC endpoint for Base chain
+            quote_tokens: Quote assets pools are discovered against (defaults to WETH and USDC)
+            tick_words: Tick-bitmap words read on each side of the current V3 tick
+            batch_size: Maximum number of calls per multicall request
+        """
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.chain_id = 8453  # Base chain
+        self.quote_tokens = [Web3.to_checksum_address(q) for q in (quote_tokens or DEFAULT_QUOTES)]
+        self.tick_words = tick_words
+        self.batch_size = batch_size
+        self._decimals: Dict[str, int] = {}
+
+    def _calldata(self, signature: str, arg_types: List[str] = (), args: List[Any] = ()) -> bytes:
+        """ABI-encode a call from its function signature."""
+        selector = Web3.keccak(text=signature)[:4]
+        return selector + (self.w3.codec.encode(list(arg_types), list(args)) if arg_types else b"")
+
+    def _multicall(self, calls: List[Tuple[str, bytes, List[str]]]) -> List[Optional[tuple]]:
+        """
+        Execute calls through Multicall3.aggregate3, allowing individual failures.
+
+        Args:
+            calls: (target, calldata, output_types) tuples
+
+        Returns:
+            Decoded outputs in call order, None for failed calls
+        """
+        results: List[Optional[tuple]] = []
+        for start in range(0, len(calls), self.batch_size):
+            batch = calls[start:start + self.batch_size]
+            data = self._calldata(
+                "aggregate3((address,bool,bytes)[])",
+                ["(address,bool,bytes)[]"],
+                [[(target, True, calldata) for target, calldata, _ in batch]]
+            )
+            with span('eth_call multicall3', kind='rpc', calls=len(batch)):
+                raw = self.w3.eth.call({'to': MULTICALL3_ADDRESS, 'data': data})
+            (returned,) = self.w3.codec.decode(["(bool,bytes)[]"], raw)
+            for (success, payload), (_, _, output_types) in zip(returned, batch):
+                if not success or not payload:
+                    results.append(None)
+                    continue
+                try:
+                    results.append(self.w3.codec.decode(output_types, payload))
+                except Exception:
+                    results.append(None)
+        return results
+
+    def _load_decimals(self, tokens: List[str]) -> None:
+        """Read decimals for any tokens not seen before."""
+        missing = [t for t in dict.fromkeys(tokens) if t not in self._decimals]
+        if not missing:
+            return
+        results = self._multicall([(t, self._calldata("decimals()"), ["uint8"]) for t in missing])
+        for token, result in zip(missing, results):
+            self._decimals[token] = result[0] if result else 18
+
+    def discover_pools(self, tokens: List[str]) -> Dict[str, List[Tuple[str, str, float]]]:
+        """
+        Find every V2/V3 pool pairing each token with a quote asset.
+
+        Args:
+            tokens: Token addresses
+
+        Returns:
+            Mapping of token address to (pool address, protocol, fee) tuples
+        """
+        tokens = [Web3.to_checksum_address(t) for t in tokens]
+        calls, keys = [], []
+        for token in tokens:
+            for quote in self.quote_tokens:
+                if token == quote:
+                    continue
+                for protocol, (factory, fee) in V2_FACTORIES.items():
+                    calls.append((factory, self._calldata("getPair(address,address)", ["address", "address"], [token, quote]), ["address"]))
+                    keys.append((token, 'v2', protocol, fee))
+                for protocol, (factory, fee_tiers) in V3_FACTORIES.items():
+                    for tier in fee_tiers:
+                        calls.append((factory, self._calldata("getPool(address,address,uint24)", ["address", "address", "uint24"], [token, quote, tier]), ["address"]))
+                        keys.append((token, 'v3', protocol, tier / 1_000_000))
+
+        pools: Dict[str, List[Tuple[str, str, float]]] = {token: [] for token in tokens}
+        for (token, kind, protocol, fee), result in zip(keys, self._multicall(calls)):
+            if result and int(result[0], 16) != 0:
+                pools[token].append((Web3.to_checksum_address(result[0]), f"{protocol}:{kind}", fee))
+        return pools
+
+    def snapshot(self, tokens: List[str]) -> Dict[str, List[PoolSnapshot]]:
+        """
+        Snapshot reserves and tick liquidity for every pool of every token.
+
+        Args:
+            tokens: Token addresses
+
+        Returns:
+            Mapping of token address to its pool snapshots
+        """
+        discovered = self.discover_pools(tokens)
+        pools = [(token, *pool) for token, token_pools in discovered.items() for pool in token_pools]
+
+        # Stage 1: pool state
+        calls, layout = [], []
+        for _, address, protocol, _ in pools:
+            calls.append((address, self._calldata("token0()"), ["address"]))
+            calls.append((address, self._calldata("token1()"), ["address"]))
+            if protocol.endswith(':v2'):
+                calls.append((address, self._calldata("getReserves()"), ["uint112", "uint112", "uint32"]))
+                layout.append(3)
+            else:
+                calls.append((address, self._calldata("slot0()"), ["uint160", "int24", "uint16", "uint16", "uint16", "uint8", "bool"]))
+                calls.append((address, self._calldata("liquidity()"), ["uint128"]))
+                calls.append((address, self._calldata("tickSpacing()"), ["int24"]))
+                layout.append(5)
+        results = self._multicall(calls)
+
+        states, offset = [], 0
+        for (token, address, protocol, fee), width in zip(pools, layout):
+            state = results[offset:offset + width]
+            offset += width
+            if any(r is None for r in state):
+                continue
+            states.append((token, address, protocol, fee, state))
+
+        # Stage 2: tick bitmaps around the current tick of each V3 pool
+        bitmap_calls, bitmap_keys = [], []
+        for i, (_, address, protocol, _, state) in enumerate(states):
+            if protocol.endswith(':v2'):
+                continue
+            tick, spacing = state[2][1], state[4][0]
+            word = (tick // spacing) >> 8
+            for word_pos in range(word - self.tick_words, word + self.tick_words + 1):
+                bitmap_calls.append((address, self._calldata("tickBitmap(int16)", ["int16"], [word_pos]), ["uint256"]))
+                bitmap_keys.append((i, word_pos))
+        bitmaps = self._multicall(bitmap_calls)
+
+        initialized: Dict[int, List[int]] = {}
+        for (i, word_pos), result in zip(bitmap_keys, bitmaps):
+            if not result or result[0] == 0:
+                continue
+            spacing = states[i][4][4][0]
+            bits = result[0]
+            for bit in range(256):
+                if bits >> bit & 1:
+                    initialized.setdefault(i, []).append(((word_pos << 8) + bit) * spacing)
+
+        # Stage 3: net liquidity of every initialized tick
+        tick_calls, tick_keys = [], []
+        for i, ticks in initialized.items():
+            for tick in ticks:
+                tick_calls.append((states[i][1], self._calldata("ticks(int24)", ["int24"], [tick]), ["uint128", "int128"]))
+                tick_keys.append((i, tick))
+        tick_results = self._multicall(tick_calls)
+        liquidity_net: Dict[int, Dict[int, int]] = {}
+        for (i, tick), result in zip(tick_keys, tick_results):
+            if result:
+                liquidity_net.setdefault(i, {})[tick] = result[1]
+
+        self._load_decimals([t for _, _, _, _, s in states for t in (s[0][0], s[1][0])])
+
+        snapshots: Dict[str, List[PoolSnapshot]] = {Web3.to_checksum_address(t): [] for t in tokens}
+        for i, (token, address, protocol, fee, state) in enumerate(states):
+            token0, token1 = Web3.to_checksum_address(state[0][0]), Web3.to_checksum_address(state[1][0])
+            if protocol.endswith(':v2'):
+                reserve0, reserve1 = float(state[2][0]), float(state[2][1])
+                if reserve0 <= 0 or reserve1 <= 0:
+                    continue
+                snapshot = PoolSnapshot(
+                    address=address, protocol=protocol, token0=token0, token1=token1, fee=fee,
+                    sqrt_price=np.sqrt(reserve1 / reserve0),
+                    seg_lo=np.array([0.0]), seg_hi=np.array([np.inf]),
+                    seg_liquidity=np.array([np.sqrt(reserve0 * reserve1)])
+                )
+            else:
+                sqrt_price = state[2][0] / 2 ** 96
+                tick, spacing = state[2][1], state[4][0]
+                word = (tick // spacing) >> 8
+                window = (
+                    (word - self.tick_words) * 256 * spacing,
+                    (word + self.tick_words + 1) * 256 * spacing
+                )
+                snapshot = self._v3_snapshot(
+                    address, protocol, token0, token1, fee, sqrt_price, tick,
+                    float(state[3][0]), liquidity_net.get(i, {}), window
+                )
+            snapshots[token].append(snapshot)
+        return snapshots
+
+    @staticmethod
+    def _v3_snapshot(
+        address: str,
+        protocol: str,
+        token0: str,
+        token1: str,
+        fee: float,
+        sqrt_price: float,
+        tick: int,
+        liquidity: float,
+        liquidity_net: Dict[int, int],
+        window: Tuple[int, int]
+    ) -> PoolSnapshot:
+        """Build sqrt-price segments from the active liquidity and the initialized ticks read."""
+        def tick_sqrt(t: int) -> float:
+            return 1.0001 ** (t / 2)
+
+        lo, hi, liq = [], [], []
+
+        # Walking up: crossing tick t adds its net liquidity
+        current, boundary = liquidity, sqrt_price
+        for t in sorted(t for t in liquidity_net if t > tick):
+            lo.append(boundary); hi.append(tick_sqrt(t)); liq.append(current)
+            current += liquidity_net[t]
+            boundary = tick_sqrt(t)
+        lo.append(boundary); hi.append(max(boundary, tick_sqrt(window[1]))); liq.append(current)
+
+        # Walking down: crossing tick t removes its net liquidity
+        current, boundary = liquidity, sqrt_price
+        for t in sorted((t for t in liquidity_net if t <= tick), reverse=True):
+            lo.append(tick_sqrt(t)); hi.append(boundary); liq.append(current)
+            current -= liquidity_net[t]
+            boundary = tick_sqrt(t)
+        lo.append(min(boundary, tick_sqrt(window[0]))); hi.append(boundary); liq.append(current)
+
+        # Liquidity outside the window read is unknown and treated as absent
+        return PoolSnapshot(
+            address=address, protocol=protocol, token0=token0, token1=token1, fee=fee,
+            sqrt_price=sqrt_price,
+            seg_lo=np.array(lo, dtype=np.float64),
+            seg_hi=np.array(hi, dtype=np.float64),
+            seg_liquidity=np.maximum(np.array(liq, dtype=np.float64), 0.0)
+        )
+
+    def depth_curve(
+        self,
+        token: str,
+        pools: List[PoolSnapshot],
+        quote_prices_usd: Dict[str, float],
+        side: str = 'buy'
+    ) -> TokenDepth:
+        """
+        Aggregate the depth of all pools of a token into one curve.
+
+        Every pool is pushed to the same effective marginal price (fee included),
+        which is the optimal split of an order across constant-function pools.
+
+        Args:
+            token: Token address
+            pools: Pool snapshots for the token
+            quote_prices_usd: USD price of each quote asset
+            side: 'buy' (spend quote for token) or 'sell' (sell token for quote)
+
+        Returns:
+            Aggregated depth curve
+        """
+        token = Web3.to_checksum_address(token)
+        usable = []
+        for pool in pools:
+            quote = pool.token1 if pool.token0 == token else pool.token0
+            quote_usd = quote_prices_usd.get(quote)
+            if not quote_usd:
+                continue
+            token_is_0 = pool.token0 == token
+            scale = 10 ** (self._decimals.get(pool.token0, 18) - self._decimals.get(pool.token1, 18))
+            # Human price of token0 in token1
+            price_01 = pool.sqrt_price ** 2 * scale
+            spot_usd = (price_01 if token_is_0 else 1.0 / price_01) * quote_usd
+            effective = spot_usd / (1 - pool.fee) if side == 'buy' else spot_usd * (1 - pool.fee)
+            usable.append((pool, token_is_0, scale, quote_usd, effective))
+
+        if not usable:
+            return TokenDepth(token=token, side=side, reference_price=0.0)
+
+        effective_prices = [u[4] for u in usable]
+        reference = min(effective_prices) if side == 'buy' else max(effective_prices)
+        multipliers = 1.0 + PRICE_MOVE_GRID if side == 'buy' else 1.0 / (1.0 + PRICE_MOVE_GRID)
+
+        total_usd = np.zeros_like(multipliers)
+        total_tokens = np.zeros_like(multipliers)
+        for pool, token_is_0, scale, quote_usd, effective in usable:
+            # Pool (pre-fee) USD price each marginal target corresponds to, clamped at the pool's own spot
+            target_usd = reference * multipliers
+            target_usd = target_usd * (1 - pool.fee) if side == 'buy' else target_usd / (1 - pool.fee)
+            spot_usd = effective * (1 - pool.fee) if side == 'buy' else effective / (1 - pool.fee)
+            target_usd = np.maximum(target_usd, spot_usd) if side == 'buy' else np.minimum(target_usd, spot_usd)
+
+            price_quote = target_usd / quote_usd
+            price_01 = price_quote if token_is_0 else 1.0 / price_quote
+            amount0, amount1 = pool.amounts_to_sqrt_price(np.sqrt(price_01 / scale))
+
+            token_amount = (amount0 if token_is_0 else amount1) / 10 ** self._decimals.get(pool.token0 if token_is_0 else pool.token1, 18)
+            quote_amount = (amount1 if token_is_0 else amount0) / 10 ** self._decimals.get(pool.token1 if token_is_0 else pool.token0, 18)
+            if side == 'buy':
+                total_usd += quote_amount / (1 - pool.fee) * quote_usd
+                total_tokens += token_amount
+            else:
+                total_usd += quote_amount * quote_usd
+                total_tokens += token_amount / (1 - pool.fee)
+
+        return TokenDepth(
+            token=token,
+            side=side,
+            reference_price=reference,
+            pools=[u[0].address for u in usable],
+            notional_usd=total_usd,
+            tokens=total_tokens
+        )
+
+    def universe_depth(
+        self,
+        tokens: List[str],
+        quote_prices_usd: Dict[str, float],
+        side: str = 'buy'
+    ) -> Dict[str, TokenDepth]:
+        """Snapshot every pool for the universe and build a depth curve per token."""
+        quote_prices = {Web3.to_checksum_address(k): v for k, v in quote_prices_usd.items()}
+        snapshots = self.snapshot(tokens)
+        return {
+            token: self.depth_curve(token, pools, quote_prices, side)
+            for token, pools in snapshots.items()
+        }
+
+    def check_fillability(
+        self,
+        weights: Dict[str, float],
+        fund_size_usd: float,
+        quote_prices_usd: Dict[str, float],
+        max_impact: float = 0.02
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Check whether each candidate weight can be bought at the given fund size.
+
+        Args:
+            weights: Token address to portfolio weight
+            fund_size_usd: Total fund size in USD
+            quote_prices_usd: USD price of each quote asset
+            max_impact: Maximum acceptable average price impact
+
+        Returns:
+            Per token: required size, expected impact, max size within max_impact (a lower
+            bound when exceeds_window is set) and a fillable flag
+        """
+        depths = self.universe_depth(list(weights), quote_prices_usd, side='buy')
+        report = {}
+        for token, weight in weights.items():
+            depth = depths[Web3.to_checksum_address(token)]
+            required = weight * fund_size_usd
+            impact = float(depth.price_impact([required])[0])
+            max_size, exceeds_window = depth.max_size_for_impact(max_impact)
+            report[token] = {
+                'required_usd': required,
+                'impact': impact,
+                'max_size_usd': max_size,
+                'exceeds_window': exceeds_window,
+                'fillable': impact <= max_impact
+            }
+        return report
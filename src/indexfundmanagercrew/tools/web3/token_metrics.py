@@ -1,6 +1,8 @@
 from web3 import Web3
 from typing import Dict, List, Optional
 from decimal import Decimal
+from defillama import DefiLlama
+from .liquidity_depth import LiquidityDepthEngine, DEFAULT_QUOTES
 
 class TokenMetricsAnalyzer:
     """
@@ -10,22 +12,65 @@ class TokenMetricsAnalyzer:
     def __init__(self, rpc_url: str):
         self.w3 = Web3(Web3.HTTPProvider(rpc_url))
         self.chain_id = 8453  # Base chain
+        self.depth_engine = LiquidityDepthEngine(rpc_url)
+        self.llama = DefiLlama()
+
+    def _quote_prices_usd(self) -> Dict[str, float]:
+        """Current USD prices of the quote assets pools are discovered against."""
+        coins = ",".join(f"base:{quote}" for quote in DEFAULT_QUOTES)
+        response = self.llama.get_token_current_prices(coins=coins, searchWidth="4h")
+        prices = response.get('coins', {}) if response else {}
+        return {
+            quote: prices[f"base:{quote}"]['price']
+            for quote in DEFAULT_QUOTES if f"base:{quote}" in prices
+        }
         
     async def get_token_liquidity(
         self,
-        token_address: str
+        token_address: str,
+        max_impact: float = 0.02
     ) -> Decimal:
         """
         Gets the liquidity depth for a token
         
         Args:
             token_address: Address of the token
+            max_impact: Price impact the depth is measured at (default 2%)
             
         Returns:
-            Liquidity depth in USD
+            Liquidity depth in USD: the largest buy that stays within max_impact
+            across all of the token's pools (a lower bound when the impact is not
+            reached within the V3 ticks read)
         """
-        # TODO: Implement liquidity calculation
-        pass
+        depth = self.depth_engine.universe_depth([token_address], self._quote_prices_usd())
+        curve = next(iter(depth.values()))
+        if curve.reference_price <= 0:
+            return Decimal(0)
+        size, _ = curve.max_size_for_impact(max_impact)
+        return Decimal(str(size))
+
+    async def get_price_impact(
+        self,
+        token_addresses: List[str],
+        trade_sizes_usd: List[float],
+        side: str = "buy"
+    ) -> Dict[str, List[float]]:
+        """
+        Gets price impact for a vector of trade sizes for every token in one batched snapshot
+        
+        Args:
+            token_addresses: Addresses of the tokens
+            trade_sizes_usd: Trade sizes in USD
+            side: "buy" or "sell"
+            
+        Returns:
+            Dictionary mapping token addresses to the impact of each trade size
+        """
+        depths = self.depth_engine.universe_depth(token_addresses, self._quote_prices_usd(), side=side)
+        return {
+            token: depth.price_impact(trade_sizes_usd).tolist()
+            for token, depth in depths.items()
+        }
         
     async def get_token_tvl(
         self,
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+"""
+Nested spans for scheduler jobs, crew kickoffs, tasks, agent steps, tool
+calls, HTTP/RPC requests (Cookie, DefiLlama, Base RPC) and LLM calls.
+
+Tracing is off unless TRACE_ENABLED=1 (or TRACE_FILE is set). When off,
+span() returns a shared no-op object and traced() returns the function
+unchanged. Finished spans are appended as JSON lines whose fields follow
+OpenTelemetry naming (traceId, spanId, parentSpanId, startTimeUnixNano, ...).
+
+Usage: trace_summary [trace file] [--trace TRACE_ID]
+"""
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+
+
+def tracing_enabled():
+    return os.getenv('TRACE_ENABLED', '').lower() in ('1', 'true', 'yes') or bool(os.getenv('TRACE_FILE'))
+
+
+def default_trace_file():
+    trace_dir = os.path.join(os.path.dirname(__file__), '.cache', 'traces')
+    return os.path.join(trace_dir, f"trace-{datetime.now():%Y%m%d}.jsonl")
+
+
+class _Exporter:
+    """Appends finished spans to a JSONL file, one line per span."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def export(self, record):
+        path = os.getenv('TRACE_FILE') or default_trace_file()
+        line = json.dumps(record, default=str) + "\n"
+        with self.lock:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'a') as f:
+                f.write(line)
+
+
+class Span:
+    def __init__(self, name, kind='internal', parent=None, attributes=None, start_ns=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.status = 'ok'
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_status(self, status, message=None):
+        self.status = status
+        if message:
+            self.attributes['status_message'] = message
+
+    def end(self, end_ns=None):
+        end_ns = end_ns or time.time_ns()
+        EXPORTER.export({
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': end_ns,
+            'durationMs': (end_ns - self.start_ns) / 1e6,
+            'status': self.status,
+            'attributes': self.attributes,
+        })
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.set_status('error', f"{exc_type.__name__}: {exc}")
+        _current.reset(self._token)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    name = kind = trace_id = span_id = parent_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_status(self, status, message=None):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+EXPORTER = _Exporter()
+NOOP_SPAN = _NoopSpan()
+_current = ContextVar('trace_span', default=None)
+
+
+def current_span():
+    return _current.get()
+
+
+def span(name, kind='internal', **attributes):
+    """Context manager for a child of the current span (or a new trace)."""
+    if not tracing_enabled():
+        return NOOP_SPAN
+    return Span(name, kind, _current.get(), attributes)
+
+
+def start_span(name, kind='internal', activate=True, **attributes):
+    """Start a span that is ended explicitly, e.g. across before/after kickoff hooks."""
+    if not tracing_enabled():
+        return NOOP_SPAN
+    new_span = Span(name, kind, _current.get(), attributes)
+    if activate:
+        new_span._token = _current.set(new_span)
+    return new_span
+
+
+def end_span(active_span):
+    """End a span from start_span() and restore its parent as the current span."""
+    if active_span is NOOP_SPAN or active_span is None:
+        return
+    if active_span._token is not None:
+        try:
+            _current.reset(active_span._token)
+        except ValueError:
+            # Ended from a different context than it was started in
+            _current.set(None)
+    active_span.end()
+
+
+def traced(name=None, kind='internal'):
+    """Decorator running the function inside a span; returns it unchanged when tracing is off."""
+    def decorator(func):
+        if not tracing_enabled():
+            return func
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind) as active:
+                    result = await func(*args, **kwargs)
+                    if result is False:
+                        active.set_status('error')
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind) as active:
+                result = func(*args, **kwargs)
+                # Scheduler jobs report failure by returning False
+                if result is False:
+                    active.set_status('error')
+                return result
+        return wrapper
+    return decorator
+
+
+def trace_calls(client, upstream, kind='http'):
+    """
+    Record each call of a client's public methods as a span, for HTTP clients
+    whose requests are made inside a third-party library (DefiLlama). The
+    methods are wrapped on the instance, so the client keeps its type.
+    Returns the client unchanged when tracing is off.
+    """
+    if not tracing_enabled():
+        return client
+    for attr in dir(client):
+        method = getattr(client, attr)
+        if not attr.startswith('_') and inspect.ismethod(method):
+            setattr(client, attr, _traced_method(method, f"{upstream} {attr}", kind, upstream))
+    return client
+
+
+def _traced_method(method, name, kind, upstream):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with span(name, kind, upstream=upstream):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+class CrewTracer:
+    """
+    Task and agent-step spans for one kickoff, driven by crewAI's task_callback
+    and step_callback. Each task span starts where the previous one ended and
+    is the current span while it runs, so tool calls nest under it.
+    """
+
+    def __init__(self, kickoff_span):
+        self.kickoff_span = kickoff_span
+        self.task_index = 0
+        self.task_span = None
+        self.step_start = time.time_ns()
+        self._open_task()
+
+    def _open_task(self):
+        self.task_index += 1
+        self.task_span = Span(f"task {self.task_index}", 'task', self.kickoff_span)
+        self.task_span._token = _current.set(self.task_span)
+
+    def step_callback(self, step):
+        now = time.time_ns()
+        step_span = Span('agent_step', 'agent', self.task_span, start_ns=self.step_start)
+        tool = getattr(step, 'tool', None)
+        if tool:
+            step_span.set_attribute('tool', tool)
+        step_span.set_attribute('step_type', type(step).__name__)
+        step_span.end(now)
+        self.step_start = now
+
+    def task_callback(self, output):
+        for attr in ('name', 'agent'):
+            value = getattr(output, attr, None)
+            if value:
+                self.task_span.set_attribute(attr, str(value))
+        description = getattr(output, 'description', '')
+        if description:
+            self.task_span.name = f"task: {description[:60]}"
+        end_span(self.task_span)
+        self.step_start = time.time_ns()
+        self._open_task()
+
+    def close(self):
+        """Drop the task span opened after the last task; it never ran."""
+        if self.task_span is not None and self.task_span._token is not None:
+            try:
+                _current.reset(self.task_span._token)
+            except ValueError:
+                _current.set(self.kickoff_span)
+        self.task_span = None
+
+
+
+# Summary CLI
+
+def load_spans(path):
+    spans = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def critical_path(spans, root):
+    """Follow, from the root, the child that finishes last at each level."""
+    children = {}
+    for s in spans:
+        children.setdefault(s['parentSpanId'], []).append(s)
+    path = [root]
+    while children.get(path[-1]['spanId']):
+        path.append(max(children[path[-1]['spanId']], key=lambda s: s['endTimeUnixNano']))
+    return path, children
+
+
+def self_times(spans, children):
+    """Duration of each span minus the union of its children's durations."""
+    result = []
+    for s in spans:
+        intervals = sorted((c['startTimeUnixNano'], c['endTimeUnixNano']) for c in children.get(s['spanId'], []))
+        covered, cursor = 0, s['startTimeUnixNano']
+        for start, end in intervals:
+            start, end = max(start, cursor), min(end, s['endTimeUnixNano'])
+            if end > start:
+                covered += end - start
+                cursor = end
+        result.append(((s['endTimeUnixNano'] - s['startTimeUnixNano'] - covered) / 1e6, s))
+    return sorted(result, key=lambda item: item[0], reverse=True)
+
+
+def summarize(spans, trace_id=None):
+    if trace_id is None:
+        roots = [s for s in spans if s['parentSpanId'] is None]
+        if not roots:
+            return "No complete traces found."
+        trace_id = max(roots, key=lambda s: s['startTimeUnixNano'])['traceId']
+    trace = [s for s in spans if s['traceId'] == trace_id]
+    roots = [s for s in trace if s['parentSpanId'] is None]
+    if not roots:
+        return f"Trace {trace_id} has no root span."
+    root = roots[0]
+
+    path, children = critical_path(trace, root)
+    lines = [
+        f"Trace {trace_id}: {root['name']} ({root['kind']}), {root['durationMs'] / 1000:.1f}s, "
+        f"{len(trace)} spans, status {root['status']}",
+        "",
+        "Critical path:",
+    ]
+    for depth, s in enumerate(path):
+        share = s['durationMs'] / root['durationMs'] * 100 if root['durationMs'] else 0
+        lines.append(f"  {'  ' * depth}{s['name']} [{s['kind']}] {s['durationMs'] / 1000:.2f}s ({share:.0f}%)")
+
+    lines += ["", "Largest self times:"]
+    for ms, s in self_times(trace, children)[:10]:
+        lines.append(f"  {ms / 1000:8.2f}s  {s['name']} [{s['kind']}]")
+
+    llm = [s for s in trace if s['kind'] == 'llm']
+    if llm:
+        tokens = sum(s['attributes'].get('estimated_total_tokens', 0) for s in llm)
+        lines += ["", f"LLM calls: {len(llm)}, {sum(s['durationMs'] for s in llm) / 1000:.1f}s, ~{tokens} tokens"]
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    trace_id = None
+    if '--trace' in args:
+        index = args.index('--trace')
+        trace_id = args[index + 1]
+        del args[index:index + 2]
+    path = args[0] if args else (os.getenv('TRACE_FILE') or default_trace_file())
+    print(summarize(load_spans(path), trace_id))
+
+
+if __name__ == '__main__':
+    main()
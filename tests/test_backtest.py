@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from indexfundmanagercrew.tools.portfolio.backtest import BacktestConfig, run_backtest, run_backtest_sweep
+
+
+def test_buy_and_hold_tracks_prices_less_entry_costs():
+    prices = np.array([[1.0, 1.0], [2.0, 1.0], [4.0, 1.0]])
+    result = run_backtest(prices, [[0.5, 0.5]], BacktestConfig(rebalance_every=0, fee_bps=10, slippage_bps=0))
+    # Half the fund quadruples, the other half is flat; buying in costs 10 bps
+    assert result.total_return[0] == pytest.approx((0.5 * 4 + 0.5) * 0.999 - 1)
+    assert result.turnover[0] == 0
+
+
+def test_rebalancing_trades_back_to_target():
+    prices = np.array([[1.0, 1.0], [2.0, 1.0], [2.0, 1.0]])
+    result = run_backtest(prices, [[0.5, 0.5]], BacktestConfig(rebalance_every=1, fee_bps=0, slippage_bps=0))
+    assert result.total_return[0] == pytest.approx(0.5)
+    assert result.turnover[0] > 0
+
+
+def test_sweep_does_not_depend_on_the_worker_count():
+    rng = np.random.default_rng(5)
+    prices = np.exp(np.cumsum(rng.normal(0, 0.03, (120, 4)), axis=0))
+    weights = rng.dirichlet(np.ones(4), size=40)
+    configs = [BacktestConfig(rebalance_every=k) for k in (0, 7, 30)]
+    serial = run_backtest_sweep(prices, weights, configs, max_workers=1, chunk_size=16)
+    parallel = run_backtest_sweep(prices, weights, configs, max_workers=2, chunk_size=16)
+    assert serial == parallel
+    assert len(serial) == 40 * 3
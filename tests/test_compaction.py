@@ -0,0 +1,16 @@
+from indexfundmanagercrew.compaction import SummaryCache, weekly_context
+
+
+def entry(timestamp, text):
+    return {'timestamp': timestamp, 'value': {'raw': text}}
+
+
+def test_weekly_context_uses_only_the_latest_report_of_a_day(tmp_path):
+    entries = [
+        entry('2099-01-01T08:00:00', "We recommend buying $ALPHA as liquidity improves."),
+        entry('2099-01-01T20:00:00', "We recommend buying $BETA after the re-run."),
+        entry('2099-01-02T08:00:00', "Risk flag on $GAMMA liquidity."),
+    ]
+    text = weekly_context(entries, cache=SummaryCache(str(tmp_path)))
+    assert text.count('- 2099-01-01:') == text.count('- 2099-01-02:') == 1
+    assert '$BETA' in text and '$ALPHA' not in text
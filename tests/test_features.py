@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from indexfundmanagercrew.tools.features import MINDSHARE_SPAN, VOLATILITY_WINDOW, FeatureStore, compute_slice
+from indexfundmanagercrew.tools.prefetch import TokenDataset, TokenRecord
+from indexfundmanagercrew.tools.snapshots import Snapshot, SnapshotStore
+
+
+def token(name, price, holders=None, mindshare=None, **metrics):
+    return TokenRecord(name=name, chain='base', address=f"0x{name}", price=price, holders=holders,
+                       mindshare=mindshare, market_cap=price, **metrics)
+
+
+def snapshot(day, tokens):
+    return Snapshot.from_dataset(TokenDataset(generated_at=f"{day}T12:00:00", tokens=tokens))
+
+
+def value(feature_slice, name, column):
+    return feature_slice.columns[column][feature_slice.index(np.array([f"base:0x{name}"]))[0]]
+
+
+def test_first_slice_has_no_carried_features():
+    first = compute_slice(snapshot('2099-01-01', [token('a', 1.0, holders=100, mindshare=0.1)]), None)
+    assert np.isnan(value(first, 'a', 'price_return'))
+    assert np.isnan(value(first, 'a', 'holder_growth'))
+    assert np.isnan(value(first, 'a', 'mindshare_momentum'))
+    assert value(first, 'a', 'mindshare_ema') == pytest.approx(0.1)
+
+
+def test_returns_growth_and_momentum_build_on_the_previous_slice():
+    first = compute_slice(snapshot('2099-01-01', [token('a', 1.0, holders=100, mindshare=0.1)]), None)
+    second = compute_slice(snapshot('2099-01-02', [token('a', 2.0, holders=110, mindshare=0.2)]), first)
+    assert value(second, 'a', 'price_return') == pytest.approx(np.log(2.0))
+    assert value(second, 'a', 'holder_growth') == pytest.approx(0.1)
+    assert value(second, 'a', 'mindshare_momentum') == pytest.approx(1.0)
+    alpha = 2 / (MINDSHARE_SPAN + 1)
+    assert value(second, 'a', 'mindshare_ema') == pytest.approx(alpha * 0.2 + (1 - alpha) * 0.1)
+
+
+def test_missing_mindshare_keeps_the_previous_ema():
+    first = compute_slice(snapshot('2099-01-01', [token('a', 1.0, mindshare=0.1)]), None)
+    second = compute_slice(snapshot('2099-01-02', [token('a', 1.0)]), first)
+    assert value(second, 'a', 'mindshare_ema') == pytest.approx(0.1)
+
+
+def test_trailing_returns_shift_and_new_tokens_start_empty():
+    feature_slice = None
+    prices = [1.0, 1.1, 1.0, 1.2, 1.1, 1.3, 1.2, 1.4, 1.5]
+    for day, price in enumerate(prices, start=1):
+        tokens = [token('a', price)] + ([token('new', 5.0)] if day == len(prices) else [])
+        feature_slice = compute_slice(snapshot(f"2099-01-{day:02d}", tokens), feature_slice)
+    row = feature_slice.index(np.array(['base:0xa']))[0]
+    expected = np.diff(np.log(prices))[-VOLATILITY_WINDOW:]
+    np.testing.assert_allclose(feature_slice.returns[row], expected)
+    assert value(feature_slice, 'a', 'volatility_7d') == pytest.approx(np.std(expected, ddof=1))
+    new = feature_slice.index(np.array(['base:0xnew']))[0]
+    assert np.isnan(feature_slice.returns[new]).all()
+    assert np.isnan(value(feature_slice, 'new', 'volatility_7d'))
+
+
+def test_store_update_matches_backfill(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path / 'snapshots'))
+    incremental = FeatureStore(str(tmp_path / 'incremental'), snapshots)
+    for day, (price, holders) in enumerate([(1.0, 100), (1.5, 120), (1.2, 90)], start=1):
+        snapshots.save(snapshot(f"2099-01-0{day}", [token('a', price, holders=holders, mindshare=0.1 * day)]))
+        incremental.update()
+
+    rebuilt = FeatureStore(str(tmp_path / 'rebuilt'), snapshots)
+    assert rebuilt.backfill() == 3
+    assert incremental.days() == rebuilt.days() == ['2099-01-01', '2099-01-02', '2099-01-03']
+    assert incremental.range('a', '2099-01-01', '2099-01-03') == rebuilt.range('a', '2099-01-01', '2099-01-03')
+    assert [row['holder_growth'] for row in rebuilt.range('a', '2099-01-01', '2099-01-03')] == [None, 0.2, -0.25]
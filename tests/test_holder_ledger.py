@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+pytest.importorskip("web3")
+from indexfundmanagercrew.tools.web3 import holder_ledger
+from indexfundmanagercrew.tools.web3.holder_ledger import HolderLedger, ZERO_ADDRESS
+
+TOKEN = "0x4200000000000000000000000000000000000006"
+ALICE = "0x00000000000000000000000000000000000000a1"
+BOB = "0x00000000000000000000000000000000000000b2"
+
+
+def make_ledger(tmp_path, start_block=None):
+    ledger = HolderLedger("http://localhost:8545", TOKEN, start_block=start_block, checkpoint_dir=tmp_path)
+    ledger._decimals = 18
+    return ledger
+
+
+def transfer(block, sender, recipient, amount):
+    return {'block_number': block, 'from': sender, 'to': recipient, 'value': int(amount * 10 ** 18)}
+
+
+def test_ledger_without_start_block_or_checkpoint_is_not_indexed(tmp_path):
+    ledger = make_ledger(tmp_path)
+    assert not ledger.indexed
+    with pytest.raises(ValueError):
+        ledger.sync(100)
+
+
+def test_start_block_zero_is_indexed_from_genesis(tmp_path, monkeypatch):
+    ledger = make_ledger(tmp_path, start_block=0)
+    scanned = []
+    monkeypatch.setattr(ledger, '_fetch_transfers', lambda start, end: scanned.append((start, end)) or [])
+    assert ledger.indexed
+    assert ledger.sync(9) == 9
+    assert scanned[0][0] == 0
+
+
+def test_capped_sync_checkpoints_balances_and_whale_movements(tmp_path, monkeypatch):
+    ledger = make_ledger(tmp_path, start_block=100)
+    transfers = {100: [transfer(100, ZERO_ADDRESS, ALICE, 1000)], 101: [transfer(101, ALICE, BOB, 400)]}
+    monkeypatch.setattr(ledger, 'block_chunk_size', 1)
+    monkeypatch.setattr(ledger, '_fetch_transfers', lambda start, end: transfers.get(start, []))
+
+    assert ledger.sync(500, max_blocks=2) == 101
+
+    resumed = make_ledger(tmp_path)
+    assert resumed.indexed
+    assert resumed.last_block == 101
+    assert resumed.holder_count() == 2
+    assert [m['block_number'] for m in resumed.recent_whale_movements()] == [101, 100]
+
+
+class FakeLedger:
+    """Stands in for HolderLedger in the tool tests, with a chain at block 10."""
+
+    def __init__(self, rpc_url, token_address, start_block=None):
+        self.start_block = start_block
+        self.indexed = start_block is not None
+        self.last_block = -1 if start_block is None else start_block - 1
+        self.w3 = type('W3', (), {'eth': type('Eth', (), {'block_number': 10})()})()
+
+    def sync(self, to_block, max_blocks=None):
+        self.last_block = min(to_block, self.last_block + max_blocks)
+        return self.last_block
+
+    def distribution_summary(self, top_ns):
+        return {'start_block': self.start_block, 'last_block': self.last_block}
+
+    def top_holders(self, n):
+        return []
+
+    def recent_whale_movements(self):
+        return []
+
+
+@pytest.fixture
+def holder_tool(monkeypatch):
+    pytest.importorskip("crewai")
+    from indexfundmanagercrew.tools.research_tools.holder_tool import HolderDistributionTool
+    monkeypatch.setattr(holder_ledger, 'HolderLedger', FakeLedger)
+    return HolderDistributionTool(rpc_url="http://localhost:8545")
+
+
+def test_tool_refuses_unindexed_token_without_start_block(holder_tool):
+    result = holder_tool._run(TOKEN)
+    assert result.startswith("Error")
+    assert "start_block" in result
+    assert not holder_tool.ledgers
+
+
+def test_tool_indexes_from_explicit_start_block_zero(holder_tool):
+    summary = json.loads(holder_tool._run(TOKEN, start_block=0))
+    assert summary['start_block'] == 0
+    assert summary['last_block'] == 10
+
+
+def test_tool_reports_progress_while_behind_the_chain_head(holder_tool):
+    holder_tool.max_blocks_per_call = 4
+    assert "still indexing" in holder_tool._run(TOKEN, start_block=0)
+    assert "still indexing" in holder_tool._run(TOKEN)
+    assert json.loads(holder_tool._run(TOKEN))['last_block'] == 10
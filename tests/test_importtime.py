@@ -0,0 +1,14 @@
+import importlib.util
+
+import pytest
+
+from indexfundmanagercrew.importtime import CHECKS, check
+
+
+@pytest.mark.parametrize('module', list(CHECKS))
+def test_import_stays_within_budget_and_lazy(module):
+    if module == 'indexfundmanagercrew.crew' and importlib.util.find_spec('crewai') is None:
+        pytest.skip("crewai is not installed")
+    forbidden, budget_ms = CHECKS[module]
+    best, failures = check(module, forbidden, budget_ms)
+    assert not failures, f"{module}: {'; '.join(failures)}"
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("web3")
+from indexfundmanagercrew.tools.web3.liquidity_depth import (
+    LiquidityDepthEngine, PoolSnapshot, WETH_ADDRESS, USDC_ADDRESS
+)
+
+# Token is token0 and trades 1:1 against a $1 quote; both have 18 decimals
+TOKEN, QUOTE = WETH_ADDRESS, USDC_ADDRESS
+RESERVE = 1_000.0
+LIQUIDITY = RESERVE * 10 ** 18
+FEE = 0.003
+
+
+@pytest.fixture
+def engine():
+    engine = LiquidityDepthEngine("http://localhost:8545")
+    engine._decimals = {TOKEN: 18, QUOTE: 18}
+    return engine
+
+
+def v2_pool():
+    return PoolSnapshot(
+        address="v2", protocol="uniswap_v2", token0=TOKEN, token1=QUOTE, fee=FEE, sqrt_price=1.0,
+        seg_lo=np.array([0.0]), seg_hi=np.array([np.inf]), seg_liquidity=np.array([LIQUIDITY])
+    )
+
+
+def v3_pool(window):
+    return LiquidityDepthEngine._v3_snapshot("v3", "uniswap_v3", TOKEN, QUOTE, FEE, 1.0, 0, LIQUIDITY, {}, window)
+
+
+def test_v2_buy_impact_matches_constant_product(engine):
+    depth = engine.depth_curve(TOKEN, [v2_pool()], {QUOTE: 1.0})
+    sizes = np.array([1.0, 10.0, 100.0])
+    # Spending x (fee included) on x*y=k moves the average price by x(1-fee)/reserve
+    expected = sizes * (1 - FEE) / RESERVE
+    np.testing.assert_allclose(depth.price_impact(sizes), expected, rtol=1e-3)
+
+
+def test_v2_sell_impact_matches_constant_product(engine):
+    depth = engine.depth_curve(TOKEN, [v2_pool()], {QUOTE: 1.0}, side='sell')
+    sizes = np.array([1.0, 10.0, 100.0])
+    tokens_in = sizes / depth.reference_price
+    received = RESERVE * tokens_in * (1 - FEE) / (RESERVE + tokens_in * (1 - FEE))
+    np.testing.assert_allclose(depth.price_impact(sizes), 1 - received / sizes, rtol=1e-3)
+
+
+def test_v3_single_range_matches_v2_inside_the_window(engine):
+    v2 = engine.depth_curve(TOKEN, [v2_pool()], {QUOTE: 1.0})
+    v3 = engine.depth_curve(TOKEN, [v3_pool((-6000, 6000))], {QUOTE: 1.0})
+    sizes = np.array([1.0, 10.0, 50.0])
+    np.testing.assert_allclose(v3.price_impact(sizes), v2.price_impact(sizes), rtol=1e-3)
+
+
+def test_max_size_within_reached_impact_is_exact(engine):
+    depth = engine.depth_curve(TOKEN, [v2_pool()], {QUOTE: 1.0})
+    size, exceeds_window = depth.max_size_for_impact(0.01)
+    assert not exceeds_window
+    assert size == pytest.approx(0.01 * RESERVE / (1 - FEE), rel=1e-3)
+
+
+def test_max_size_beyond_ticks_read_is_flagged_lower_bound(engine):
+    depth = engine.depth_curve(TOKEN, [v3_pool((-600, 600))], {QUOTE: 1.0})
+    size, exceeds_window = depth.max_size_for_impact(0.10)
+    assert exceeds_window
+    # The whole known depth: the quote needed to push the price to the window edge
+    known = RESERVE * (1.0001 ** 300 - 1) / (1 - FEE)
+    assert size == pytest.approx(known, rel=1e-3)
+    assert not depth.max_size_for_impact(0.01)[1]
+
+
+def test_fill_report_marks_window_truncation(engine, monkeypatch):
+    monkeypatch.setattr(engine, 'universe_depth', lambda tokens, prices, side='buy': {
+        TOKEN: engine.depth_curve(TOKEN, [v3_pool((-600, 600))], prices, side)
+    })
+    report = engine.check_fillability({TOKEN: 1.0}, 5.0, {QUOTE: 1.0}, max_impact=0.10)
+    assert report[TOKEN]['exceeds_window'] is True
+    assert report[TOKEN]['fillable'] is True
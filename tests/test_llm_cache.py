@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("crewai")
+from crewai.utilities.llm_utils import create_llm
+from indexfundmanagercrew.llm_cache import CachingLLM, LLMResponseCache, build_llm
+
+
+@pytest.fixture(autouse=True)
+def default_model(monkeypatch, tmp_path):
+    monkeypatch.setenv('MODEL', 'gpt-4o-mini')
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.delenv('LLM_CACHE_MODE', raising=False)
+    monkeypatch.delenv('TRACE_ENABLED', raising=False)
+    monkeypatch.delenv('TRACE_FILE', raising=False)
+    monkeypatch.setattr(LLMResponseCache.__init__, '__defaults__', (str(tmp_path / 'responses.db'), 20_000))
+
+
+def test_no_wrapper_when_cache_and_tracing_are_off():
+    assert build_llm() is None
+
+
+@pytest.mark.parametrize('cache_mode, trace', [('replay', None), ('off', '1')])
+def test_wrapper_runs_the_model_crewai_would_resolve(monkeypatch, cache_mode, trace):
+    if trace:
+        monkeypatch.setenv('TRACE_ENABLED', trace)
+    llm = build_llm(cache_mode)
+    default = create_llm(None)
+    assert isinstance(llm, CachingLLM)
+    assert llm.model == default.model
+    assert llm.api_key == default.api_key
+    assert llm.cache_mode == cache_mode
+
+
+def test_traced_calls_report_token_counts_as_estimates(monkeypatch, tmp_path):
+    import crewai
+    from indexfundmanagercrew.tracing import load_spans
+    trace_file = tmp_path / 'trace.jsonl'
+    monkeypatch.setenv('TRACE_FILE', str(trace_file))
+    monkeypatch.setattr(crewai.LLM, 'call', lambda self, messages, **kwargs: 'x' * 40)
+
+    build_llm().call([{'role': 'user', 'content': 'hello'}])
+
+    (llm_span,) = load_spans(trace_file)
+    assert llm_span['attributes']['estimated_completion_tokens'] == 10
+    assert 'total_tokens' not in llm_span['attributes']
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from indexfundmanagercrew.memory_store import MemoryStore
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'memory_store.db')
+
+
+def write_from_another_process(db, key, value):
+    code = f"from indexfundmanagercrew.memory_store import MemoryStore; MemoryStore({db!r}).update_memory({key!r}, {value!r})"
+    subprocess.run([sys.executable, '-c', code], check=True, env={'PYTHONPATH': str(SRC)})
+
+
+def test_instances_share_one_connection_per_thread(db):
+    assert MemoryStore(db)._connection() is MemoryStore(db)._connection()
+    other = []
+    thread = threading.Thread(target=lambda: other.append(MemoryStore(db)._connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not MemoryStore(db)._connection()
+
+
+def test_new_instance_reads_from_the_warm_cache(db):
+    MemoryStore(db).update_memory('daily_analysis_result', {'top': ['A']})
+    MemoryStore(db).get_memory('daily_analysis_result')
+    store = MemoryStore(db)
+    assert store.get_memory('daily_analysis_result') == {'top': ['A']}
+    assert 'daily_analysis_result' in store._store.values
+
+
+def test_write_through_one_instance_is_seen_by_another(db):
+    first, second = MemoryStore(db), MemoryStore(db)
+    first.update_memory('key', 1)
+    assert second.get_memory('key') == 1
+    second.update_memory('key', 2)
+    assert first.get_memory('key') == 2
+
+
+def test_write_from_another_process_invalidates_the_cache(db):
+    store = MemoryStore(db)
+    store.update_memory('key', 'old')
+    assert store.get_memory('key') == 'old'
+    write_from_another_process(db, 'key', 'new')
+    assert MemoryStore(db).get_memory('key') == 'new'
+
+
+def test_backfilled_timestamps_do_not_overwrite_newer_values(db):
+    store = MemoryStore(db)
+    store.update_memory('key', 'current')
+    store.update_memory('key', 'backfilled', timestamp=0)
+    assert store.get_memory('key') == 'current'
+    store.update_memory('key', 'older', timestamp='2024-01-01T00:00:00')
+    assert MemoryStore(db).get_memory('key') == 'current'
+
+
+def test_history_is_returned_oldest_first(db):
+    store = MemoryStore(db)
+    for day, value in enumerate(['a', 'b', 'c'], start=1):
+        store.update_memory('key', value, timestamp=f'2099-01-0{day}T12:00:00')
+    assert [e['value'] for e in store.get_history('key')] == ['a', 'b', 'c']
+    assert [e['value'] for e in store.get_history('key', limit=2)] == ['b', 'c']
+
+
+def test_latest_per_day_keeps_the_last_version_of_each_day(db):
+    store = MemoryStore(db)
+    store.update_memory('key', 'first run', timestamp='2099-01-01T08:00:00')
+    store.update_memory('key', 're-run', timestamp='2099-01-01T20:00:00')
+    store.update_memory('key', 'next day', timestamp='2099-01-02T08:00:00')
+    assert len(store.get_history('key')) == 3
+    assert [e['value'] for e in store.get_history('key', latest_per_day=True)] == ['re-run', 'next day']
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from indexfundmanagercrew.tools.portfolio.optimizer import (
+    METHODS, OptimizationError, PortfolioConstraints, optimize_weights
+)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(7)
+    return rng.normal(0.001, [0.02, 0.04, 0.06, 0.03, 0.05, 0.08], size=(120, 6))
+
+
+def optimize(method, returns, max_weight=0.3, **kwargs):
+    n = returns.shape[1]
+    return optimize_weights(
+        method, PortfolioConstraints(max_weight=max_weight), np.full(n, 1e6),
+        returns=returns, market_caps=np.arange(1, n + 1) * 1e7, **kwargs
+    )
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_weights_sum_to_one_within_bounds(method, returns):
+    weights = optimize(method, returns).weights
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights.min() >= 0
+    assert weights.max() <= 0.3 + 1e-9
+
+
+@pytest.mark.parametrize('method', ['mean_variance', 'min_variance', 'risk_parity'])
+def test_tokens_without_price_history_get_no_weight(method, returns):
+    # A missing price column becomes zero returns, i.e. a riskless-looking token
+    returns[:, 2] = 0.0
+    weights = optimize(method, returns).weights
+    assert np.isfinite(weights).all()
+    assert weights[2] == 0
+    assert weights.sum() == pytest.approx(1.0)
+
+
+def test_zero_variance_tokens_do_not_count_towards_feasibility(returns):
+    returns[:, :3] = 0.0
+    with pytest.raises(OptimizationError):
+        optimize('min_variance', returns, max_weight=0.3)
+
+
+def test_no_price_history_at_all_is_an_optimization_error(returns):
+    with pytest.raises(OptimizationError):
+        optimize('mean_variance', np.zeros_like(returns))
+
+
+def test_min_variance_prefers_the_least_volatile_tokens(returns):
+    weights = optimize('min_variance', returns, max_weight=0.5).weights
+    assert weights[0] == pytest.approx(0.5, abs=0.05)
+    assert weights[5] < weights[0]
+
+
+def test_infeasible_max_weight_raises(returns):
+    with pytest.raises(OptimizationError):
+        optimize('risk_parity', returns, max_weight=0.1)
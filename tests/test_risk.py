@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from indexfundmanagercrew.tools.portfolio.risk import SimulationConfig, simulate_portfolio_risk
+
+
+@pytest.fixture
+def returns():
+    return np.random.default_rng(3).normal(0.0, [0.02, 0.05, 0.08], size=(90, 3))
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 't'])
+def test_results_do_not_depend_on_the_worker_count(returns, method):
+    def run(workers):
+        config = SimulationConfig(n_paths=20_000, chunk_size=5_000, method=method, seed=11, max_workers=workers)
+        return simulate_portfolio_risk(np.array([0.5, 0.3, 0.2]), returns, config).as_dict()
+
+    assert run(1) == run(2)
+
+
+def test_cvar_is_at_least_var(returns):
+    report = simulate_portfolio_risk(np.ones(3), returns, SimulationConfig(n_paths=20_000, method='normal'))
+    for level in ('0.95', '0.99'):
+        assert report.cvar[level] >= report.var[level] > 0
+    assert report.var['0.99'] >= report.var['0.95']
+
+
+def test_riskless_portfolio_has_no_loss():
+    report = simulate_portfolio_risk(np.ones(2), np.zeros((30, 2)), SimulationConfig(n_paths=1_000))
+    assert report.var['0.99'] == pytest.approx(0.0, abs=1e-9)
+    assert report.prob_drawdown == 0.0
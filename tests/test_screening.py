@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from indexfundmanagercrew.tools.features import FeatureStore
+from indexfundmanagercrew.tools.prefetch import TokenDataset, TokenRecord
+from indexfundmanagercrew.tools.screening import screen
+from indexfundmanagercrew.tools.snapshots import Snapshot, SnapshotStore
+
+DAYS = 14
+STEADY = 60
+
+
+def steady_series(rng):
+    """Per-day metrics of a quiet token: small noise around slowly growing levels."""
+    price = 1.0 * np.exp(np.cumsum(rng.normal(0, 0.01, DAYS)))
+    return {
+        'price': price,
+        'market_cap': price * 1e6,
+        'liquidity': np.full(DAYS, 1e5) * (1 + rng.normal(0, 0.02, DAYS)),
+        'volume_24h': 5e4 * (1 + rng.normal(0, 0.05, DAYS)),
+        'holders': np.round(1000 * 1.005 ** np.arange(DAYS) + rng.integers(-1, 2, DAYS)),
+        'mindshare': 0.01 * (1 + rng.normal(0, 0.03, DAYS)),
+    }
+
+
+def build_store(tmp_path, series):
+    snapshots = SnapshotStore(str(tmp_path / 'snapshots'))
+    store = FeatureStore(str(tmp_path / 'features'), snapshots)
+    for day in range(DAYS):
+        tokens = [
+            TokenRecord(name=name, chain='base', address=f"0x{name}",
+                        **{metric: float(values[day]) for metric, values in metrics.items()})
+            for name, metrics in series.items()
+        ]
+        snapshots.save(Snapshot.from_dataset(TokenDataset(generated_at=f"2099-01-{day + 1:02d}T12:00:00", tokens=tokens)))
+        store.update()
+    return store
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    return {f"steady{i}": steady_series(rng) for i in range(STEADY)}
+
+
+def test_steady_series_raise_no_flags(tmp_path, series):
+    assert screen(build_store(tmp_path, series)) == []
+
+
+def test_planted_anomalies_are_flagged_and_steady_tokens_are_not(tmp_path, series):
+    rng = np.random.default_rng(11)
+    pump, crash, rug, thin, drift = (steady_series(rng) for _ in range(5))
+    pump['volume_24h'][-1] = 1e6  # 10x liquidity, far outside its history
+    crash['price'][-1] *= 0.5
+    rug['holders'][-1] = rug['holders'][-2] * 0.8
+    thin['liquidity'][:] = 1e3  # 0.1% of market cap
+    thin['volume_24h'][:] = 1e3
+    drift['mindshare'][DAYS // 2:] *= np.linspace(2, 4, DAYS - DAYS // 2)
+    series.update({'pump': pump, 'crash': crash, 'rug': rug, 'thin': thin, 'drift': drift})
+
+    flagged = {result['name']: {flag['rule'] for flag in result['flags']} for result in screen(build_store(tmp_path, series))}
+    assert set(flagged) == {'pump', 'crash', 'rug', 'thin', 'drift'}
+    assert 'volume_spike_thin_liquidity' in flagged['pump']
+    assert 'price_crash' in flagged['crash']
+    assert 'holder_collapse' in flagged['rug']
+    assert 'thin_liquidity' in flagged['thin']
+    assert 'mindshare_shift_up' in flagged['drift']
@@ -0,0 +1,65 @@
+import pytest
+
+from indexfundmanagercrew.tools.prefetch import TokenDataset, TokenRecord
+from indexfundmanagercrew.tools.snapshots import Snapshot, SnapshotStore, diff_snapshots
+
+
+def token(name, market_cap, **metrics):
+    return TokenRecord(name=name, chain='base', address=f"0x{name}", market_cap=market_cap, **metrics)
+
+
+def snapshot(taken_at, tokens):
+    return Snapshot.from_dataset(TokenDataset(generated_at=taken_at, tokens=tokens))
+
+
+@pytest.fixture
+def old():
+    return snapshot('2099-01-01T00:00:00', [
+        token('a', 1000.0, holders=100), token('b', 900.0, holders=100), token('c', 800.0),
+        token('d', 700.0), token('e', 600.0), token('f', 500.0, holders=100), token('gone', 400.0),
+    ])
+
+
+@pytest.fixture
+def new():
+    return snapshot('2099-01-02T00:00:00', [
+        token('f', 5000.0, holders=200), token('a', 1000.0, holders=100), token('b', 950.0, holders=50),
+        token('c', 800.0), token('d', 700.0), token('e', 600.0), token('fresh', 300.0),
+    ])
+
+
+def test_diff_lists_entrants_and_dropouts(old, new):
+    diff = diff_snapshots(old, new)
+    assert [t['name'] for t in diff.entrants] == ['fresh']
+    assert [t['name'] for t in diff.dropouts] == ['gone']
+    assert diff.counts['tokens_before'] == diff.counts['tokens_after'] == 7
+
+
+def test_diff_reports_rank_moves_above_the_threshold(old, new):
+    diff = diff_snapshots(old, new, min_rank_change=5)
+    assert [(t['name'], t['previous_rank'], t['rank'], t['change']) for t in diff.rank_changes] == [('f', 6, 1, 5)]
+    # a, b, c, d and e each moved down one rank
+    assert diff_snapshots(old, new, min_rank_change=1).counts['rank_changes'] == 6
+
+
+def test_diff_reports_relative_metric_changes_largest_first(old, new):
+    diff = diff_snapshots(old, new, min_relative_change=0.25)
+    assert [(t['name'], t['change_pct']) for t in diff.metric_changes['market_cap']] == [('f', 900.0)]
+    assert [(t['name'], t['change_pct']) for t in diff.metric_changes['holders']] == [('f', 100.0), ('b', -50.0)]
+    # Missing values on either side are not changes
+    assert diff.counts['holders_changes'] == 2
+
+
+def test_diff_of_identical_snapshots_is_empty(old):
+    diff = diff_snapshots(old, old)
+    assert not diff.entrants and not diff.dropouts and not diff.rank_changes and not diff.metric_changes
+
+
+def test_store_round_trip_and_baseline_lookup(tmp_path, old, new):
+    store = SnapshotStore(str(tmp_path))
+    store.save(old)
+    store.save(new)
+    assert store.names() == ['20990101-000000', '20990102-000000']
+    loaded = store.latest()
+    assert loaded.taken_at == new.taken_at
+    assert diff_snapshots(store.before(store.names()[-1]), loaded).as_dict() == diff_snapshots(old, new).as_dict()
@@ -0,0 +1,31 @@
+import json
+
+from indexfundmanagercrew.tracing import load_spans, span, trace_calls
+
+
+class PriceClient:
+    def get_prices(self, coins):
+        return {'coins': coins}
+
+
+def test_trace_calls_records_an_http_span_per_call(monkeypatch, tmp_path):
+    trace_file = tmp_path / 'trace.jsonl'
+    monkeypatch.setenv('TRACE_FILE', str(trace_file))
+    client = trace_calls(PriceClient(), 'defillama')
+
+    with span('job'):
+        assert client.get_prices('base:0x1') == {'coins': 'base:0x1'}
+
+    spans = {s['name']: s for s in load_spans(trace_file)}
+    call = spans['defillama get_prices']
+    assert isinstance(client, PriceClient)
+    assert call['kind'] == 'http'
+    assert call['attributes']['upstream'] == 'defillama'
+    assert call['parentSpanId'] == spans['job']['spanId']
+
+
+def test_trace_calls_leaves_the_client_alone_when_tracing_is_off(monkeypatch):
+    monkeypatch.delenv('TRACE_ENABLED', raising=False)
+    monkeypatch.delenv('TRACE_FILE', raising=False)
+    client = trace_calls(PriceClient(), 'defillama')
+    assert 'get_prices' not in vars(client)